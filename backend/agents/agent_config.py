@@ -26,6 +26,10 @@ class AgentConfig:
     # Dry run mode settings
     DRY_RUN_MODE = os.getenv("AGENT_DRY_RUN", "false").lower() == "true"
     
+    # Backend access: "in_process" calls the database directly, "http" talks to a remote API
+    BACKEND_MODE = os.getenv("AGENT_BACKEND_MODE", "in_process").lower()
+    BACKEND_API_URL = os.getenv("AGENT_BACKEND_URL", "http://localhost:8000")
+    
     @classmethod
     def get_agent_limits(cls, agent_name: str) -> Dict[str, Any]:
         """Get cost limits for specific agent"""
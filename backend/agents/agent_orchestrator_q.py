@@ -1,63 +1,95 @@
 import asyncio
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from agents.ingest_agent import IngestAgent
 from agents.curriculum_architect_agent import CurriculumArchitectAgent
 from agents.assessment_generator_agent import AssessmentGeneratorAgent
 from agents.agent_config import AgentConfig
+from agents.backend_gateway import get_backend_gateway
+from agents.pipeline_store import PipelineStateStore, pipeline_id_for
+from agents.usage_meter import metered_run, flushes_usage, BudgetExceededError
 
 class AmazonQAgentOrchestrator:
     """Orchestrator for Amazon Q agent pipeline"""
     
     def __init__(self):
-        self.ingest_agent = IngestAgent()
-        self.curriculum_agent = CurriculumArchitectAgent()
-        self.assessment_agent = AssessmentGeneratorAgent()
+        # One gateway shared by every stage keeps a single connection pool / session factory
+        self.gateway = get_backend_gateway()
+        self.ingest_agent = IngestAgent(gateway=self.gateway)
+        self.curriculum_agent = CurriculumArchitectAgent(gateway=self.gateway)
+        self.assessment_agent = AssessmentGeneratorAgent(gateway=self.gateway)
         self.config = AgentConfig()
+        self.store = PipelineStateStore()
     
-    async def process_complete_pipeline(self, s3_key: str, teacher_id: int, generation_schema: Dict) -> Dict[str, Any]:
-        """Complete pipeline: S3 -> Ingest -> Curriculum -> Assessment"""
+    @flushes_usage
+    async def process_complete_pipeline(self, s3_key: str, teacher_id: int, generation_schema: Dict,
+                                        resume: bool = True) -> Dict[str, Any]:
+        """Complete pipeline: S3 -> Ingest -> Curriculum -> Assessment
+        
+        Each stage is checkpointed in the pipeline store; on resume, stages that
+        already completed are served from the store instead of being re-run.
+        """
+        
+        pipeline_id = pipeline_id_for(s3_key, teacher_id, generation_schema)
+        run = self.store.start_run(pipeline_id, s3_key, teacher_id, generation_schema, resume=resume)
+        stages = run["stages"]
         
         pipeline_result = {
-            "pipeline_id": f"pipeline_{s3_key}_{teacher_id}",
+            "pipeline_id": pipeline_id,
             "stages": {},
+            "resumed_stages": [],
+            "usage": {},
             "success": False,
             "errors": []
         }
         
+        current_stage = None
         try:
             # Stage 1: Ingest
-            print("🔄 Stage 1: Content Ingestion")
-            ingest_result = await self.ingest_agent.process_s3_object(s3_key, teacher_id)
+            current_stage = "ingest"
+            ingest_result = self._checkpointed_output(stages, current_stage)
+            if ingest_result is None:
+                print("🔄 Stage 1: Content Ingestion")
+                self.store.mark_stage_running(pipeline_id, current_stage)
+                ingest_result = await self._run_metered(
+                    "ingest_agent", "content_ingest", teacher_id, pipeline_result,
+                    self.ingest_agent.process_s3_object(s3_key, teacher_id)
+                )
+                
+                if not ingest_result.get("success"):
+                    raise Exception(f"Ingest failed: {ingest_result.get('error')}")
+                self.store.complete_stage(pipeline_id, current_stage, ingest_result)
+            else:
+                pipeline_result["resumed_stages"].append(current_stage)
             pipeline_result["stages"]["ingest"] = ingest_result
             
-            if not ingest_result.get("success"):
-                raise Exception(f"Ingest failed: {ingest_result.get('error')}")
-            
             resource_id = ingest_result["resource_id"]
             
             # Stage 2: Curriculum Generation
-            print("🔄 Stage 2: Curriculum Architecture")
-            curriculum_result = await self.curriculum_agent.generate_curriculum_from_resource(
-                resource_id, generation_schema
-            )
+            current_stage = "curriculum"
+            curriculum_result = self._checkpointed_output(stages, current_stage)
+            if curriculum_result is None:
+                print("🔄 Stage 2: Curriculum Architecture")
+                self.store.mark_stage_running(pipeline_id, current_stage)
+                curriculum_result = await self._run_metered(
+                    "curriculum_architect", "curriculum_gen", teacher_id, pipeline_result,
+                    self.curriculum_agent.generate_curriculum_from_resource(resource_id, generation_schema, teacher_id)
+                )
+                
+                if not curriculum_result.get("success"):
+                    raise Exception(f"Curriculum generation failed: {curriculum_result.get('error')}")
+                self.store.complete_stage(pipeline_id, current_stage, curriculum_result)
+            else:
+                pipeline_result["resumed_stages"].append(current_stage)
             pipeline_result["stages"]["curriculum"] = curriculum_result
             
-            if not curriculum_result.get("success"):
-                raise Exception(f"Curriculum generation failed: {curriculum_result.get('error')}")
-            
             curriculum_id = curriculum_result["curriculum_id"]
             
             # Stage 3: Assessment Generation
-            print("🔄 Stage 3: Assessment Generation")
-            assessment_results = []
-            
-            for module_id in curriculum_result.get("module_ids", ["module_0"]):
-                assessment_result = await self.assessment_agent.generate_assessment(
-                    curriculum_id, module_id, generation_schema.get("difficulty", "intermediate")
-                )
-                assessment_results.append(assessment_result)
-            
+            current_stage = "assessments"
+            assessment_results = await self._run_assessment_stage(
+                pipeline_id, stages, curriculum_result, generation_schema, teacher_id, pipeline_result
+            )
             pipeline_result["stages"]["assessments"] = assessment_results
             
             # Pipeline success
@@ -70,12 +102,95 @@ class AmazonQAgentOrchestrator:
                 "total_assessments": len([a for a in assessment_results if a.get("success")])
             }
             
+            all_assessed = all(a.get("success") for a in assessment_results)
+            self.store.finish_run(
+                pipeline_id,
+                "completed" if all_assessed else "partial",
+                final_outputs=pipeline_result["final_outputs"]
+            )
+            
         except Exception as e:
             pipeline_result["errors"].append(str(e))
             pipeline_result["success"] = False
+            
+            if current_stage and current_stage != "assessments":
+                self.store.fail_stage(pipeline_id, current_stage, str(e))
+            self.store.finish_run(pipeline_id, "failed", errors=pipeline_result["errors"])
         
         return pipeline_result
     
+    async def _run_assessment_stage(self, pipeline_id: str, stages: Dict[str, Any], curriculum_result: Dict,
+                                    generation_schema: Dict, teacher_id: int, pipeline_result: Dict) -> List[Dict[str, Any]]:
+        """Generate assessments per module, checkpointing each successful module"""
+        
+        stage_state = stages.get("assessments", {})
+        if stage_state.get("status") == "completed":
+            pipeline_result["resumed_stages"].append("assessments")
+            return stage_state.get("output", {}).get("results", [])
+        
+        print("🔄 Stage 3: Assessment Generation")
+        self.store.mark_stage_running(pipeline_id, "assessments")
+        
+        # Successful modules from an earlier attempt are kept, failed ones are retried
+        previous = {
+            r.get("module_id"): r
+            for r in (stage_state.get("output") or {}).get("results", [])
+            if r.get("success")
+        }
+        
+        curriculum_id = curriculum_result["curriculum_id"]
+        assessment_results = []
+        
+        try:
+            for module_id in curriculum_result.get("module_ids", ["module_0"]):
+                if module_id in previous:
+                    assessment_results.append(previous[module_id])
+                    continue
+                
+                assessment_result = await self._run_metered(
+                    "assessment_generator", "assessment_gen", teacher_id, pipeline_result,
+                    self.assessment_agent.generate_assessment(
+                        curriculum_id, module_id, generation_schema.get("difficulty", "intermediate")
+                    )
+                )
+                assessment_result.setdefault("module_id", module_id)
+                assessment_results.append(assessment_result)
+        except Exception as e:
+            self.store.fail_stage(pipeline_id, "assessments", str(e), output={"results": assessment_results})
+            raise
+        
+        output = {"results": assessment_results}
+        failed = [a.get("module_id") for a in assessment_results if not a.get("success")]
+        if failed:
+            self.store.fail_stage(
+                pipeline_id, "assessments", f"Assessment generation failed for modules: {failed}", output=output
+            )
+        else:
+            self.store.complete_stage(pipeline_id, "assessments", output)
+        
+        return assessment_results
+    
+    async def _run_metered(self, agent_name: str, interaction_type: str, teacher_id: Optional[int],
+                           pipeline_result: Dict, call) -> Dict[str, Any]:
+        """Run one agent call under its token meter and runtime limit"""
+        
+        max_minutes = AgentConfig.get_agent_limits(agent_name).get("max_runtime_minutes")
+        with metered_run(agent_name, user_id=teacher_id, interaction_type=interaction_type) as meter:
+            try:
+                return await asyncio.wait_for(call, timeout=max_minutes * 60 if max_minutes else None)
+            except asyncio.TimeoutError:
+                meter.violations = [f"runtime_minutes exceeds limit {max_minutes}"]
+                raise BudgetExceededError(agent_name, meter.violations)
+            finally:
+                pipeline_result["usage"].setdefault(agent_name, []).append(meter.usage())
+    
+    def _checkpointed_output(self, stages: Dict[str, Any], stage: str) -> Optional[Dict[str, Any]]:
+        """Return a completed stage's stored output, or None if it must run"""
+        stage_state = stages.get(stage, {})
+        if stage_state.get("status") == "completed":
+            return stage_state.get("output")
+        return None
+    
     async def process_batch_content(self, s3_keys: List[str], teacher_id: int, schema: Dict) -> Dict[str, Any]:
         """Process multiple content files in batch"""
         
@@ -122,6 +237,7 @@ class PipelineRequest(BaseModel):
         "duration_weeks": 4,
         "learning_objectives": []
     }
+    resume: bool = True
 
 class BatchRequest(BaseModel):
     s3_keys: List[str]
@@ -139,7 +255,8 @@ async def run_agent_pipeline(request: PipelineRequest):
         result = await orchestrator.process_complete_pipeline(
             request.s3_key,
             request.teacher_id,
-            request.generation_schema
+            request.generation_schema,
+            resume=request.resume
         )
         return result
     except Exception as e:
@@ -159,15 +276,44 @@ async def run_batch_processing(request: BatchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/agents/pipeline/{pipeline_id}/resume")
+async def resume_agent_pipeline(pipeline_id: str):
+    """Resume a failed or partial pipeline, skipping completed stages"""
+    
+    run = orchestrator.store.get_run(pipeline_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    
+    try:
+        return await orchestrator.process_complete_pipeline(
+            run["s3_key"],
+            run["teacher_id"],
+            run["generation_schema"] or {},
+            resume=True
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/agents/status/{pipeline_id}")
 async def get_pipeline_status(pipeline_id: str):
-    """Get status of running pipeline"""
+    """Get status of a pipeline run from the pipeline store"""
+    
+    run = orchestrator.store.get_run(pipeline_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
     
-    # Mock status for now
     return {
-        "pipeline_id": pipeline_id,
-        "status": "completed",
-        "progress": 100,
-        "current_stage": "assessment_generation",
-        "estimated_completion": "2024-01-01T12:00:00Z"
-    }
\ No newline at end of file
+        "pipeline_id": run["pipeline_id"],
+        "status": run["status"],
+        "progress": run["progress"],
+        "current_stage": run["current_stage"],
+        "completed_stages": run["completed_stages"],
+        "stages": {
+            name: {k: v for k, v in stage.items() if k != "output"}
+            for name, stage in run["stages"].items()
+        },
+        "final_outputs": run["final_outputs"],
+        "errors": run["errors"],
+        "attempts": run["attempts"],
+        "updated_at": run["updated_at"]
+    }
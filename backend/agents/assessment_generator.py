@@ -2,10 +2,11 @@ import json
 import yaml
 from typing import Dict, List, Any
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
 
 class AssessmentGeneratorAgent:
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = MeteredAIService(AIService(), "assessment_generator")
         with open('agents/kiro_config.yaml', 'r') as f:
             self.config = yaml.safe_load(f)
     
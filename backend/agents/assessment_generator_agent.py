@@ -1,14 +1,17 @@
 import json
 import asyncio
-import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
+from agents.backend_gateway import BackendGateway, get_backend_gateway
+from agents.question_validation import validate_questions
 
 class AssessmentGeneratorAgent:
     """Amazon Q Agent for generating assessments from curriculum modules"""
     
-    def __init__(self):
-        self.ai_service = AIService()
+    def __init__(self, gateway: Optional[BackendGateway] = None):
+        self.ai_service = MeteredAIService(AIService(), "assessment_generator")
+        self.gateway = gateway or get_backend_gateway()
         
     async def generate_assessment(self, curriculum_id: str, module_id: str, difficulty: str) -> Dict[str, Any]:
         """Main agent workflow: curriculum/module -> assessment generation -> backend API"""
@@ -50,25 +53,24 @@ class AssessmentGeneratorAgent:
     async def _fetch_module_data(self, curriculum_id: str, module_id: str) -> Dict[str, Any]:
         """Fetch module data from backend"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://localhost:8000/api/curriculum/{curriculum_id}/modules/{module_id}")
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                # Fallback with mock module data
-                return {
-                    "module_id": module_id,
-                    "title": "Python Programming Fundamentals",
-                    "learning_outcomes": [
-                        "Understand Python syntax and data types",
-                        "Apply control structures in programming",
-                        "Create functions and handle exceptions"
-                    ],
-                    "content": "Python programming concepts including variables, functions, loops, and object-oriented programming",
-                    "bloom_level": "apply",
-                    "duration_hours": 4
-                }
+        module_data = await self.gateway.fetch_module(curriculum_id, module_id)
+        
+        if module_data is not None:
+            return module_data
+        else:
+            # Fallback with mock module data
+            return {
+                "module_id": module_id,
+                "title": "Python Programming Fundamentals",
+                "learning_outcomes": [
+                    "Understand Python syntax and data types",
+                    "Apply control structures in programming",
+                    "Create functions and handle exceptions"
+                ],
+                "content": "Python programming concepts including variables, functions, loops, and object-oriented programming",
+                "bloom_level": "apply",
+                "duration_hours": 4
+            }
     
     async def _generate_questions(self, module_data: Dict, difficulty: str) -> List[Dict[str, Any]]:
         """Generate multiple question types using prompt templates"""
@@ -219,59 +221,8 @@ class AssessmentGeneratorAgent:
             ]
     
     async def _validate_questions(self, questions: List[Dict]) -> List[Dict[str, Any]]:
-        """Validate questions using model-based validators"""
-        
-        validated_questions = []
-        
-        for question in questions:
-            validation_result = await self._validate_single_question(question)
-            
-            if validation_result["is_valid"]:
-                # Apply any corrections suggested by validator
-                corrected_question = {
-                    **question,
-                    **validation_result.get("corrections", {})
-                }
-                validated_questions.append(corrected_question)
-        
-        return validated_questions
-    
-    async def _validate_single_question(self, question: Dict) -> Dict[str, Any]:
-        """Validate a single question using AI"""
-        
-        prompt = f"""
-        Validate this assessment question:
-        
-        Question: {json.dumps(question, indent=2)}
-        
-        Check for:
-        1. Clear and unambiguous wording
-        2. Appropriate difficulty level
-        3. Correct answer accuracy
-        4. Bloom's taxonomy alignment
-        
-        Return JSON:
-        {{
-            "is_valid": true/false,
-            "issues": ["issue1", "issue2"],
-            "corrections": {{
-                "question_text": "corrected_text_if_needed"
-            }},
-            "quality_score": 0.85
-        }}
-        """
-        
-        try:
-            response = await self.ai_service.generate_content(prompt)
-            return json.loads(response)
-        except:
-            # Default validation (pass all questions)
-            return {
-                "is_valid": True,
-                "issues": [],
-                "corrections": {},
-                "quality_score": 0.8
-            }
+        """Validate questions: cheap local checks first, then batched model verdicts"""
+        return await validate_questions(self.ai_service.generate_content, questions)
     
     async def _create_scoring_rubric(self, questions: List[Dict], difficulty: str) -> Dict[str, Any]:
         """Create scoring rubric for the assessment"""
@@ -316,18 +267,8 @@ class AssessmentGeneratorAgent:
             "ai_generated": True
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://localhost:8000/api/assessment/{curriculum_id}",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("assessment_id", f"assessment_{curriculum_id}")
-            else:
-                raise Exception(f"Backend assessment creation failed: {response.status_code}")
+        assessment_id = await self.gateway.create_assessment(curriculum_id, payload)
+        return assessment_id or f"assessment_{curriculum_id}"
 
 # Test case
 async def test_assessment_generator_agent():
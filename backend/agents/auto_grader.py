@@ -1,22 +1,34 @@
 import json
+import asyncio
 import yaml
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
+from agents.prompt_payload import PromptPayload
+from agents.plagiarism import PlagiarismEngine
+from agents.code_runner import get_sandbox_pool
 
 class AutoGraderAgent:
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = MeteredAIService(AIService(), "auto_grader")
         with open('agents/kiro_config.yaml', 'r') as f:
             self.config = yaml.safe_load(f)
+        self.plagiarism_engine = PlagiarismEngine(self.config.get("auto_grader", {}).get("plagiarism"))
+        self.code_runner = get_sandbox_pool(self.config.get("auto_grader", {}).get("sandbox"))
     
     async def grade_submission(self, submission: Dict[str, Any], assessment: Dict[str, Any]) -> Dict[str, Any]:
         """Grade student submission using AI with detailed feedback"""
         
-        prompt = f"""
+        payload = (PromptPayload()
+                   .add("assessment", assessment, kind="assessment")
+                   .add("submission", submission, kind="submission"))
+        payload.log("grade_submission")
+        
+        prompt = payload.render("""
         Grade this student submission against the assessment rubric.
         
-        Assessment: {json.dumps(assessment, indent=2)}
-        Submission: {json.dumps(submission, indent=2)}
+        Assessment: {assessment}
+        Submission: {submission}
         
         For each question, provide:
         - Score (0-max points)
@@ -26,9 +38,9 @@ class AutoGraderAgent:
         
         Output JSON:
         {{
-            "submission_id": "{submission.get('id')}",
-            "student_id": "{submission.get('student_id')}",
-            "assessment_id": "{assessment.get('id')}",
+            "submission_id": "{submission_id}",
+            "student_id": "{student_id}",
+            "assessment_id": "{assessment_id}",
             "total_score": 85,
             "max_score": 100,
             "percentage": 85.0,
@@ -49,23 +61,99 @@ class AutoGraderAgent:
             "next_steps": ["recommended_action1", "recommended_action2"],
             "time_spent": "minutes_to_complete"
         }}
-        """
+        """, submission_id=submission.get('id'), student_id=submission.get('student_id'),
+            assessment_id=assessment.get('id'))
         
         response = await self.ai_service.generate_content(prompt)
         return json.loads(response)
     
-    async def grade_coding_submission(self, code: str, test_cases: List[Dict], rubric: Dict) -> Dict[str, Any]:
-        """Grade coding submissions with test execution and code quality analysis"""
+    async def grade_coding_submission(self, code: str, test_cases: List[Dict], rubric: Dict,
+                                      function_name: str = None) -> Dict[str, Any]:
+        """Grade coding submissions with test execution and code quality analysis
         
-        prompt = f"""
-        Grade this coding submission with comprehensive analysis.
+        Correctness comes from running the test cases in the sandbox pool; the
+        model only reviews quality and efficiency.
+        """
         
-        Code: {code}
-        Test Cases: {json.dumps(test_cases, indent=2)}
-        Rubric: {json.dumps(rubric, indent=2)}
+        execution = await self.code_runner.run_tests(code, test_cases, function_name)
+        total_tests = execution["total_tests"]
+        tests_passed = execution["tests_passed"]
+        
+        correctness = {
+            "score": round(tests_passed / total_tests * 100) if total_tests else 0,
+            "max_score": 100,
+            "tests_passed": tests_passed,
+            "total_tests": total_tests,
+            "failed_tests": [
+                {
+                    "test_name": case["test_name"],
+                    "status": case["status"],
+                    "expected": case["expected"],
+                    "actual": case["actual"],
+                    "error": case["error"]
+                }
+                for case in execution["cases"] if case["status"] != "passed"
+            ],
+            "execution_ms": execution["duration_ms"]
+        }
+        
+        review = await self._review_code_quality(code, rubric)
+        weights = rubric.get("weights", {}) if isinstance(rubric, dict) else {}
+        correctness_weight = weights.get("correctness", 0.7)
+        quality_weight = 1 - correctness_weight
+        
+        quality_score = review.get("code_quality", {}).get("score")
+        overall = correctness["score"] if quality_score is None else round(
+            correctness["score"] * correctness_weight + quality_score * quality_weight
+        )
+        
+        return {
+            "correctness": correctness,
+            "code_quality": review.get("code_quality", {}),
+            "efficiency": review.get("efficiency", {}),
+            "overall_score": overall,
+            "grade": self._letter_grade(overall),
+            "detailed_feedback": review.get("detailed_feedback", ""),
+            "suggestions": review.get("suggestions", [])
+        }
+    
+    async def grade_coding_submissions(self, submissions: List[Dict], test_cases: List[Dict],
+                                       rubric: Dict) -> List[Dict]:
+        """Grade a class's coding submissions concurrently on the sandbox pool"""
+        
+        results = await asyncio.gather(*(
+            self.grade_coding_submission(s.get("code", ""), test_cases, rubric, s.get("function_name"))
+            for s in submissions
+        ), return_exceptions=True)
+        
+        graded = []
+        for submission, result in zip(submissions, results):
+            if isinstance(result, Exception):
+                graded.append({
+                    'submission_id': submission.get('id'),
+                    'error': f'Grading failed: {str(result)}',
+                    'status': 'failed'
+                })
+            else:
+                graded.append({'submission_id': submission.get('id'), **result})
+        
+        return graded
+    
+    async def _review_code_quality(self, code: str, rubric: Dict) -> Dict[str, Any]:
+        """Model review of readability, structure and efficiency"""
+        
+        payload = PromptPayload().add("code", code).add("rubric", rubric)
+        payload.log("review_code_quality")
+        
+        prompt = payload.render("""
+        Review the quality of this coding submission. Correctness has already been
+        measured by running the tests; do not score it.
+        
+        Code:
+        {code}
+        Rubric: {rubric}
         
         Evaluate:
-        - Correctness (passes test cases)
         - Code quality (readability, structure)
         - Efficiency (time/space complexity)
         - Best practices (naming, comments)
@@ -73,20 +161,6 @@ class AutoGraderAgent:
         
         Output JSON:
         {{
-            "correctness": {{
-                "score": 80,
-                "max_score": 100,
-                "tests_passed": 8,
-                "total_tests": 10,
-                "failed_tests": [
-                    {{
-                        "test_name": "edge_case_1",
-                        "expected": "expected_output",
-                        "actual": "actual_output",
-                        "error": "error_message"
-                    }}
-                ]
-            }},
             "code_quality": {{
                 "score": 75,
                 "max_score": 100,
@@ -102,15 +176,27 @@ class AutoGraderAgent:
                 "space_complexity": "O(1)",
                 "optimization_suggestions": ["suggestion1"]
             }},
-            "overall_score": 82,
-            "grade": "B+",
             "detailed_feedback": "comprehensive_code_review",
             "suggestions": ["improvement1", "improvement2"]
         }}
-        """
+        """)
         
-        response = await self.ai_service.generate_content(prompt)
-        return json.loads(response)
+        try:
+            response = await self.ai_service.generate_content(prompt)
+            return json.loads(response)
+        except Exception:
+            return {}
+    
+    def _letter_grade(self, score: float) -> str:
+        if score >= 90:
+            return "A"
+        if score >= 80:
+            return "B"
+        if score >= 70:
+            return "C"
+        if score >= 60:
+            return "D"
+        return "F"
     
     async def generate_feedback(self, score: float, rubric: Dict[str, Any], student_answer: str) -> str:
         """Generate personalized feedback based on score and rubric"""
@@ -172,39 +258,93 @@ class AutoGraderAgent:
         
         return analytics_update
     
-    async def detect_plagiarism(self, submission: str, reference_submissions: List[str]) -> Dict[str, Any]:
-        """Detect potential plagiarism in submissions"""
+    async def detect_plagiarism(self, submission: str, reference_submissions: List[str],
+                                kind: str = "text") -> Dict[str, Any]:
+        """Detect potential plagiarism in submissions
         
-        prompt = f"""
-        Analyze this submission for potential plagiarism against reference submissions.
-        
-        Current Submission: {submission}
-        Reference Submissions: {json.dumps(reference_submissions, indent=2)}
+        Similarity is measured locally (MinHash/LSH); only flagged matches are
+        sent to the model, for an explanation of the overlap.
+        """
         
-        Check for:
-        - Exact text matches
-        - Paraphrased content
-        - Similar structure/logic
-        - Unusual similarity patterns
+        references = {f"ref_{i + 1}": ref for i, ref in enumerate(reference_submissions)}
+        matches = self.plagiarism_engine.compare_to_references(submission, references, kind)
+        threshold = self.plagiarism_engine.settings["threshold"]
+        top_similarity = matches[0]["similarity"] if matches else 0.0
         
-        Return JSON:
-        {{
-            "plagiarism_detected": false,
-            "similarity_score": 15.5,
-            "threshold": 70.0,
+        result = {
+            "plagiarism_detected": bool(matches),
+            "similarity_score": round(top_similarity * 100, 1),
+            "threshold": round(threshold * 100, 1),
             "matches": [
-                {{
-                    "reference_id": "ref_1",
-                    "similarity": 25.0,
-                    "matched_sections": ["section1", "section2"]
-                }}
+                {
+                    "reference_id": m["reference_id"],
+                    "similarity": round(m["similarity"] * 100, 1),
+                    "matched_sections": m["matched_sections"]
+                }
+                for m in matches
             ],
-            "recommendation": "no_action|review_required|investigation_needed"
-        }}
-        """
+            "recommendation": self._plagiarism_recommendation(top_similarity, threshold)
+        }
         
-        response = await self.ai_service.generate_content(prompt)
-        return json.loads(response)
+        if matches:
+            result["explanation"] = await self._explain_similarity(result["matches"])
+        
+        return result
+    
+    async def detect_class_plagiarism(self, submissions: Dict[str, str], kind: str = "text") -> Dict[str, Any]:
+        """Find similar submission pairs across a whole assessment"""
+        
+        pairs = self.plagiarism_engine.find_similar_pairs(submissions, kind)
+        settings = self.plagiarism_engine.settings
+        explained = pairs[:settings["max_explained_pairs"]]
+        
+        explanations = await asyncio.gather(*(
+            self._explain_similarity([{
+                "reference_id": pair["submission_b"],
+                "similarity": round(pair["similarity"] * 100, 1),
+                "matched_sections": pair["matched_sections"]
+            }])
+            for pair in explained
+        ))
+        for pair, explanation in zip(explained, explanations):
+            pair["explanation"] = explanation
+        
+        return {
+            "submissions_checked": len(submissions),
+            "threshold": round(settings["threshold"] * 100, 1),
+            "flagged_pairs": [
+                {**pair, "recommendation": self._plagiarism_recommendation(pair["similarity"], settings["threshold"])}
+                for pair in pairs
+            ]
+        }
+    
+    def _plagiarism_recommendation(self, similarity: float, threshold: float) -> str:
+        if similarity >= max(threshold, 0.9):
+            return "investigation_needed"
+        if similarity >= threshold:
+            return "review_required"
+        return "no_action"
+    
+    async def _explain_similarity(self, matches: List[Dict[str, Any]]) -> Optional[str]:
+        """Ask the model to explain flagged overlap, given only the matched passages"""
+        
+        payload = PromptPayload().add("matches", matches)
+        payload.log("explain_similarity")
+        
+        prompt = payload.render("""
+        These passages were found in both a student submission and another submission.
+        
+        Matches: {matches}
+        
+        Explain briefly whether the overlap suggests copying, shared course material,
+        or common phrasing, and what a teacher should check.
+        """)
+        
+        try:
+            response = await self.ai_service.generate_content(prompt)
+            return response.strip()
+        except Exception:
+            return None
     
     async def batch_grade_submissions(self, submissions: List[Dict], assessment: Dict) -> List[Dict]:
         """Grade multiple submissions efficiently"""
@@ -0,0 +1,189 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional
+import httpx
+from app.core.database import SessionLocal
+from app.models.curriculum import Curriculum, Assessment
+from app.models.ai_models import ContentAnalysis
+from app.core.http_client import http_clients
+from agents.agent_config import AgentConfig
+
+class BackendGateway(ABC):
+    """Interface between agents and the backend content store"""
+
+    @abstractmethod
+    async def upload_resource(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Store ingested chunks and return the new resource id"""
+
+    @abstractmethod
+    async def fetch_resource(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        """Return resource chunks and metadata, or None if unavailable"""
+
+    @abstractmethod
+    async def create_curriculum(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Create a curriculum owned by payload["teacher_id"] and return its id"""
+
+    @abstractmethod
+    async def fetch_module(self, curriculum_id: str, module_id: str) -> Optional[Dict[str, Any]]:
+        """Return a curriculum module, or None if unavailable"""
+
+    @abstractmethod
+    async def create_assessment(self, curriculum_id: str, payload: Dict[str, Any]) -> Optional[str]:
+        """Create an assessment and return its id"""
+
+    async def aclose(self):
+        """Release any held resources"""
+        pass
+
+class InProcessBackendGateway(BackendGateway):
+    """Gateway that writes straight to the database when agents run inside the backend"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    async def upload_resource(self, payload: Dict[str, Any]) -> Optional[str]:
+        chunks = payload.get("chunks", [])
+
+        db = self.session_factory()
+        try:
+            resource = ContentAnalysis(
+                content_source=payload.get("source_file"),
+                content_type=payload.get("source_file", "").lower().split(".")[-1] or "text",
+                extracted_text="\n".join(chunk.get("text", "") for chunk in chunks),
+                topics={"chunks": chunks, "metadata": payload.get("metadata", {})},
+                ai_services_used=[payload.get("metadata", {}).get("processing_agent", "IngestAgent")],
+                processing_status="completed"
+            )
+            db.add(resource)
+            db.commit()
+            db.refresh(resource)
+            return str(resource.id)
+        finally:
+            db.close()
+
+    async def fetch_resource(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        if not str(resource_id).isdigit():
+            return None
+
+        db = self.session_factory()
+        try:
+            resource = db.query(ContentAnalysis).filter(ContentAnalysis.id == int(resource_id)).first()
+            if not resource:
+                return None
+
+            stored = resource.topics or {}
+            return {
+                "resource_id": str(resource.id),
+                "chunks": stored.get("chunks", []),
+                "metadata": stored.get("metadata", {})
+            }
+        finally:
+            db.close()
+
+    async def create_curriculum(self, payload: Dict[str, Any]) -> Optional[str]:
+        # Without an owner the curriculum never shows up in a teacher's listings or search
+        if payload.get("teacher_id") is None:
+            raise ValueError("teacher_id is required to create a curriculum")
+
+        db = self.session_factory()
+        try:
+            curriculum = Curriculum(
+                title=payload.get("title") or "AI-Generated Curriculum",
+                description=payload.get("description"),
+                subject=payload.get("subject", "General Studies"),
+                grade_level=payload.get("grade_level", "intermediate"),
+                content_data=payload.get("curriculum_metadata"),
+                created_by=payload.get("teacher_id"),
+                ai_generated=True,
+                amazon_q_powered=True
+            )
+            db.add(curriculum)
+            db.commit()
+            db.refresh(curriculum)
+            return str(curriculum.id)
+        finally:
+            db.close()
+
+    async def fetch_module(self, curriculum_id: str, module_id: str) -> Optional[Dict[str, Any]]:
+        if not str(curriculum_id).isdigit():
+            return None
+
+        db = self.session_factory()
+        try:
+            curriculum = db.query(Curriculum).filter(Curriculum.id == int(curriculum_id)).first()
+            if not curriculum or not curriculum.content_data:
+                return None
+
+            module_ids = curriculum.content_data.get("module_ids", [])
+            modules = curriculum.content_data.get("modules", [])
+            if module_id not in module_ids:
+                return None
+
+            index = module_ids.index(module_id)
+            if index >= len(modules):
+                return None
+
+            return {"module_id": module_id, **modules[index]}
+        finally:
+            db.close()
+
+    async def create_assessment(self, curriculum_id: str, payload: Dict[str, Any]) -> Optional[str]:
+        db = self.session_factory()
+        try:
+            assessment = Assessment(
+                title=payload.get("title"),
+                curriculum_id=int(curriculum_id) if str(curriculum_id).isdigit() else None,
+                assessment_data={
+                    "questions": payload.get("questions", []),
+                    "scoring_rubric": payload.get("scoring_rubric", {})
+                },
+                total_points=payload.get("total_points", 100),
+                time_limit=payload.get("time_limit"),
+                ai_generated=payload.get("ai_generated", True)
+            )
+            db.add(assessment)
+            db.commit()
+            db.refresh(assessment)
+            return str(assessment.id)
+        finally:
+            db.close()
+
+class HTTPBackendGateway(BackendGateway):
+    """Gateway for remote deployments, using the shared keep-alive client pool"""
+
+    def __init__(self, base_url: str = None):
+        self.base_url = (base_url or AgentConfig.BACKEND_API_URL).rstrip("/")
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await http_clients.request(method, f"{self.base_url}{path}", profile="agents", **kwargs)
+
+    async def upload_resource(self, payload: Dict[str, Any]) -> Optional[str]:
+        response = await self._request("POST", "/api/curriculum/upload", json=payload)
+        if response.status_code != 200:
+            raise Exception(f"Backend upload failed: {response.status_code}")
+        return response.json().get("resource_id")
+
+    async def fetch_resource(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        response = await self._request("GET", f"/api/curriculum/resource/{resource_id}")
+        return response.json() if response.status_code == 200 else None
+
+    async def create_curriculum(self, payload: Dict[str, Any]) -> Optional[str]:
+        response = await self._request("POST", "/api/curriculum/", json=payload)
+        if response.status_code != 200:
+            raise Exception(f"Backend curriculum creation failed: {response.status_code}")
+        return response.json().get("id")
+
+    async def fetch_module(self, curriculum_id: str, module_id: str) -> Optional[Dict[str, Any]]:
+        response = await self._request("GET", f"/api/curriculum/{curriculum_id}/modules/{module_id}")
+        return response.json() if response.status_code == 200 else None
+
+    async def create_assessment(self, curriculum_id: str, payload: Dict[str, Any]) -> Optional[str]:
+        response = await self._request("POST", f"/api/assessment/{curriculum_id}", json=payload)
+        if response.status_code != 200:
+            raise Exception(f"Backend assessment creation failed: {response.status_code}")
+        return response.json().get("assessment_id")
+
+def get_backend_gateway() -> BackendGateway:
+    """Build the gateway selected by AGENT_BACKEND_MODE"""
+    if AgentConfig.BACKEND_MODE == "http":
+        return HTTPBackendGateway()
+    return InProcessBackendGateway()
@@ -0,0 +1,191 @@
+"""
+Sandboxed execution of coding submissions against test cases
+A pool of zygote processes runs test cases in parallel; each case runs in a
+child forked for it alone, with hard rlimits (see agents.sandbox_worker), and
+is judged here against an expected output the sandbox never sees. Zygotes
+that stop responding are replaced. Process isolation and rlimits only;
+deploy workers inside a container for filesystem and network isolation.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+from agents.sandbox_worker import judge
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+DEFAULT_LIMITS = {
+    "workers": min(os.cpu_count() or 2, 8),
+    "cpu_seconds": 2,
+    "memory_mb": 256,
+    "timeout_seconds": 5.0,
+    "max_jobs_per_worker": 200
+}
+
+# Extra wait beyond timeout_seconds before a silent zygote is presumed stuck;
+# the zygote enforces the timeout on its child itself
+ZYGOTE_GRACE_SECONDS = 2.0
+
+_FUNCTION_DEF = re.compile(r"^def\s+([A-Za-z_]\w*)\s*\(", re.MULTILINE)
+
+def detect_function_name(code: str) -> Optional[str]:
+    """Name of the first top-level function in starter or submitted code"""
+    match = _FUNCTION_DEF.search(code or "")
+    return match.group(1) if match else None
+
+class SandboxWorker:
+    """One zygote process; forks a fresh, confined child for every job"""
+
+    def __init__(self, process: asyncio.subprocess.Process, workdir: str):
+        self.process = process
+        self.workdir = workdir
+        self.jobs = 0
+
+    @classmethod
+    async def spawn(cls, limits: Dict[str, Any]) -> "SandboxWorker":
+        workdir = tempfile.mkdtemp(prefix="sandbox_")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", WORKER_SCRIPT,
+            str(limits["cpu_seconds"]), str(limits["memory_mb"]), str(limits["timeout_seconds"]),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=workdir,
+            env={"PATH": "/usr/bin:/bin", "PYTHONDONTWRITEBYTECODE": "1"},
+            start_new_session=True
+        )
+        return cls(process, workdir)
+
+    async def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.jobs += 1
+        self.process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout=timeout)
+        if not line:
+            raise ConnectionResetError("sandbox worker exited")
+        return json.loads(line)
+
+    async def kill(self):
+        # Zygotes run in their own session; take down anything they spawned too
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await self.process.wait()
+        try:
+            os.rmdir(self.workdir)
+        except OSError:
+            pass
+
+class SandboxPool:
+    """Bounded pool of sandbox zygotes"""
+
+    def __init__(self, limits: Dict[str, Any] = None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[SandboxWorker] = []
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if self._idle is not None:
+                return
+            self._idle = asyncio.Queue()
+            workers = await asyncio.gather(*(
+                SandboxWorker.spawn(self.limits) for _ in range(self.limits["workers"])
+            ))
+            for worker in workers:
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+
+    async def aclose(self):
+        workers, self._workers = self._workers, []
+        self._idle = None
+        await asyncio.gather(*(w.kill() for w in workers), return_exceptions=True)
+
+    async def run_case(self, code: str, case: Dict[str, Any], function: Optional[str]) -> Dict[str, Any]:
+        """Run one test case in a fresh child of the next free zygote"""
+        await self.start()
+        worker = await self._idle.get()
+        # The expected output stays here; the sandbox only gets what the submission is called with
+        sandbox_case = {key: case[key] for key in ("input", "args", "kwargs") if key in case}
+        job = {"code": code, "case": sandbox_case, "function": function}
+        started = time.perf_counter()
+
+        try:
+            report = await worker.run(job, self.limits["timeout_seconds"] + ZYGOTE_GRACE_SECONDS)
+            result = judge(report, case.get("expected_output"))
+        except asyncio.TimeoutError:
+            result = self._failure("timeout", f"exceeded {self.limits['timeout_seconds']}s", started)
+            worker = await self._replace(worker)
+        except (ConnectionResetError, BrokenPipeError, ValueError):
+            # The zygote itself died; the child's own limits are reported in its result
+            result = self._failure("resource_limit", "worker terminated (CPU or memory limit)", started)
+            worker = await self._replace(worker)
+        else:
+            if worker.jobs >= self.limits["max_jobs_per_worker"]:
+                worker = await self._replace(worker)
+        finally:
+            if self._idle is not None:
+                self._idle.put_nowait(worker)
+
+        return result
+
+    async def run_tests(self, code: str, test_cases: List[Dict[str, Any]],
+                        function: Optional[str] = None) -> Dict[str, Any]:
+        """Run every test case in parallel and summarize pass/fail/timing"""
+        function = function or detect_function_name(code)
+        started = time.perf_counter()
+
+        results = await asyncio.gather(*(self.run_case(code, case, function) for case in test_cases))
+
+        cases = []
+        for index, (case, result) in enumerate(zip(test_cases, results)):
+            cases.append({
+                "test_name": case.get("name") or f"test_{index + 1}",
+                "input": case.get("input", case.get("args")),
+                "expected": case.get("expected_output"),
+                **result
+            })
+
+        passed = sum(1 for c in cases if c["status"] == "passed")
+        return {
+            "function": function,
+            "tests_passed": passed,
+            "total_tests": len(cases),
+            "cases": cases,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    async def _replace(self, worker: SandboxWorker) -> SandboxWorker:
+        await worker.kill()
+        fresh = await SandboxWorker.spawn(self.limits)
+        self._workers = [w for w in self._workers if w is not worker] + [fresh]
+        return fresh
+
+    @staticmethod
+    def _failure(status: str, error: str, started: float) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "actual": None,
+            "error": error,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "stdout": ""
+        }
+
+_pool: Optional[SandboxPool] = None
+
+def get_sandbox_pool(limits: Dict[str, Any] = None) -> SandboxPool:
+    """Process-wide sandbox pool, created on first use"""
+    global _pool
+    if _pool is None:
+        _pool = SandboxPool(limits)
+    return _pool
@@ -2,10 +2,11 @@ import yaml
 import json
 from typing import Dict, List, Any
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
 
 class CurriculumArchitectAgent:
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = MeteredAIService(AIService(), "curriculum_architect")
         with open('agents/kiro_config.yaml', 'r') as f:
             self.config = yaml.safe_load(f)
     
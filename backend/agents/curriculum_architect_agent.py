@@ -1,16 +1,19 @@
 import json
 import asyncio
-import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
+from agents.backend_gateway import BackendGateway, get_backend_gateway
 
 class CurriculumArchitectAgent:
     """Amazon Q Agent for curriculum generation from processed resources"""
     
-    def __init__(self):
-        self.ai_service = AIService()
+    def __init__(self, gateway: Optional[BackendGateway] = None):
+        self.ai_service = MeteredAIService(AIService(), "curriculum_architect")
+        self.gateway = gateway or get_backend_gateway()
         
-    async def generate_curriculum_from_resource(self, resource_id: str, generation_schema: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_curriculum_from_resource(self, resource_id: str, generation_schema: Dict[str, Any],
+                                                teacher_id: int) -> Dict[str, Any]:
         """Main agent workflow: resource_id -> curriculum generation -> backend API"""
         
         try:
@@ -24,7 +27,7 @@ class CurriculumArchitectAgent:
             detailed_curriculum = await self._create_detailed_curriculum(curriculum_plan, resource_data)
             
             # Step 4: Post to backend curriculum API
-            curriculum_id = await self._create_curriculum_in_backend(detailed_curriculum)
+            curriculum_id = await self._create_curriculum_in_backend(detailed_curriculum, teacher_id)
             
             return {
                 "success": True,
@@ -44,22 +47,21 @@ class CurriculumArchitectAgent:
     async def _fetch_resource_data(self, resource_id: str) -> Dict[str, Any]:
         """Fetch processed resource data from backend"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://localhost:8000/api/curriculum/resource/{resource_id}")
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                # Fallback with mock data for testing
-                return {
-                    "resource_id": resource_id,
-                    "chunks": [
-                        {"text": "Introduction to Python programming concepts", "metadata": {"key_concepts": ["variables", "functions"]}},
-                        {"text": "Control structures and loops in Python", "metadata": {"key_concepts": ["loops", "conditionals"]}},
-                        {"text": "Object-oriented programming principles", "metadata": {"key_concepts": ["classes", "objects"]}}
-                    ],
-                    "metadata": {"total_chunks": 3, "difficulty_level": "intermediate"}
-                }
+        resource_data = await self.gateway.fetch_resource(resource_id)
+        
+        if resource_data is not None:
+            return resource_data
+        else:
+            # Fallback with mock data for testing
+            return {
+                "resource_id": resource_id,
+                "chunks": [
+                    {"text": "Introduction to Python programming concepts", "metadata": {"key_concepts": ["variables", "functions"]}},
+                    {"text": "Control structures and loops in Python", "metadata": {"key_concepts": ["loops", "conditionals"]}},
+                    {"text": "Object-oriented programming principles", "metadata": {"key_concepts": ["classes", "objects"]}}
+                ],
+                "metadata": {"total_chunks": 3, "difficulty_level": "intermediate"}
+            }
     
     async def _generate_curriculum_plan(self, resource_data: Dict, schema: Dict) -> Dict[str, Any]:
         """Generate curriculum plan using chain-of-thought prompting"""
@@ -194,10 +196,11 @@ class CurriculumArchitectAgent:
                 ]
             }
     
-    async def _create_curriculum_in_backend(self, curriculum_data: Dict) -> str:
+    async def _create_curriculum_in_backend(self, curriculum_data: Dict, teacher_id: int) -> str:
         """Create curriculum in backend via API"""
         
         payload = {
+            "teacher_id": teacher_id,
             "title": curriculum_data.get("title"),
             "description": curriculum_data.get("description"),
             "subject": "General Studies",
@@ -206,18 +209,8 @@ class CurriculumArchitectAgent:
             "curriculum_metadata": curriculum_data
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8000/api/curriculum/",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("id", f"curriculum_{curriculum_data.get('resource_id')}")
-            else:
-                raise Exception(f"Backend curriculum creation failed: {response.status_code}")
+        curriculum_id = await self.gateway.create_curriculum(payload)
+        return curriculum_id or f"curriculum_{curriculum_data.get('resource_id')}"
     
     def _summarize_content(self, resource_data: Dict) -> str:
         """Summarize resource content for analysis"""
@@ -238,6 +231,7 @@ async def test_curriculum_architect_agent():
     
     # Test data
     test_resource_id = "resource_123"
+    test_teacher_id = 1
     test_schema = {
         "difficulty": "intermediate",
         "duration_weeks": 4,
@@ -249,7 +243,7 @@ async def test_curriculum_architect_agent():
     }
     
     print("Testing Curriculum Architect Agent...")
-    result = await agent.generate_curriculum_from_resource(test_resource_id, test_schema)
+    result = await agent.generate_curriculum_from_resource(test_resource_id, test_schema, test_teacher_id)
     
     print(f"Result: {json.dumps(result, indent=2)}")
     
@@ -1,19 +1,21 @@
 import boto3
 import json
 import asyncio
-import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from botocore.exceptions import ClientError
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
+from agents.backend_gateway import BackendGateway, get_backend_gateway
 
 class IngestAgent:
     """Amazon Q Agent for content ingestion and processing"""
     
-    def __init__(self):
+    def __init__(self, gateway: Optional[BackendGateway] = None):
         self.s3_client = boto3.client('s3')
         self.textract_client = boto3.client('textract')
-        self.ai_service = AIService()
+        self.ai_service = MeteredAIService(AIService(), "ingest_agent")
         self.bucket_name = "edweavepack-content"
+        self.gateway = gateway or get_backend_gateway()
         
     async def process_s3_object(self, s3_key: str, teacher_id: int) -> Dict[str, Any]:
         """Main agent workflow: S3 object -> processed content -> backend API"""
@@ -167,18 +169,8 @@ class IngestAgent:
             }
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8000/api/curriculum/upload",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("resource_id", f"resource_{s3_key}")
-            else:
-                raise Exception(f"Backend upload failed: {response.status_code}")
+        resource_id = await self.gateway.upload_resource(payload)
+        return resource_id or f"resource_{s3_key}"
 
 # Test case
 async def test_ingest_agent():
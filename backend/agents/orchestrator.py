@@ -5,6 +5,8 @@ from agents.curriculum_architect import CurriculumArchitectAgent
 from agents.assessment_generator import AssessmentGeneratorAgent
 from agents.personalized_learning import PersonalizedLearningAgent
 from agents.auto_grader import AutoGraderAgent
+from agents.prompt_payload import PromptPayload
+from agents.usage_meter import flushes_usage
 
 class AgentOrchestrator:
     """Orchestrates multiple AI agents for comprehensive educational content generation"""
@@ -15,6 +17,7 @@ class AgentOrchestrator:
         self.learning_agent = PersonalizedLearningAgent()
         self.grader_agent = AutoGraderAgent()
     
+    @flushes_usage
     async def create_complete_curriculum(self, content: str, level: str, subject: str, student_profiles: List[Dict] = None) -> Dict[str, Any]:
         """Orchestrate complete curriculum creation with all agents"""
         
@@ -43,6 +46,7 @@ class AgentOrchestrator:
         
         return curriculum
     
+    @flushes_usage
     async def process_student_submission(self, submission: Dict[str, Any], assessment: Dict[str, Any], student_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Process student submission with grading and personalized recommendations"""
         
@@ -72,6 +76,7 @@ class AgentOrchestrator:
         
         return graded_result
     
+    @flushes_usage
     async def adapt_curriculum_for_class(self, curriculum: Dict[str, Any], class_performance: Dict[str, Any]) -> Dict[str, Any]:
         """Adapt curriculum based on overall class performance"""
         
@@ -98,6 +103,7 @@ class AgentOrchestrator:
         
         return adapted_curriculum
     
+    @flushes_usage
     async def generate_progress_insights(self, student_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate comprehensive progress insights for dashboard"""
         
@@ -197,10 +203,13 @@ class AgentOrchestrator:
     async def _generate_remediation_activities(self, module: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate additional remediation activities for struggling topics"""
         
-        prompt = f"""
+        payload = PromptPayload().add("module", module, kind="module")
+        payload.log("remediation_activities")
+        
+        prompt = payload.render("""
         Generate remediation activities for students struggling with this module:
         
-        Module: {json.dumps(module, indent=2)}
+        Module: {module}
         
         Create 3-5 scaffolded activities that:
         - Break down complex concepts
@@ -209,7 +218,7 @@ class AgentOrchestrator:
         - Include self-assessment checkpoints
         
         Return JSON array of activities.
-        """
+        """)
         
         response = await self.curriculum_agent.ai_service.generate_content(prompt)
         return json.loads(response)
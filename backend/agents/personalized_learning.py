@@ -2,10 +2,12 @@ import json
 import yaml
 from typing import Dict, List, Any
 from app.services.ai_service import AIService
+from agents.usage_meter import MeteredAIService
+from agents.prompt_payload import PromptPayload
 
 class PersonalizedLearningAgent:
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = MeteredAIService(AIService(), "personalized_learning")
         with open('agents/kiro_config.yaml', 'r') as f:
             self.config = yaml.safe_load(f)
     
@@ -173,11 +175,16 @@ class PersonalizedLearningAgent:
     async def optimize_learning_sequence(self, modules: List[Dict], student_profile: Dict) -> List[Dict]:
         """Optimize module sequence based on student profile"""
         
-        prompt = f"""
+        payload = (PromptPayload()
+                   .add("modules", modules, kind="module")
+                   .add("student_profile", student_profile, kind="student_profile"))
+        payload.log("optimize_learning_sequence")
+        
+        prompt = payload.render("""
         Optimize the learning sequence of these modules for this student.
         
-        Modules: {json.dumps(modules, indent=2)}
-        Student Profile: {json.dumps(student_profile, indent=2)}
+        Modules: {modules}
+        Student Profile: {student_profile}
         
         Consider:
         - Prerequisites and dependencies
@@ -187,7 +194,7 @@ class PersonalizedLearningAgent:
         - Motivation and engagement factors
         
         Return optimized sequence with rationale for changes.
-        """
+        """)
         
         response = await self.ai_service.generate_content(prompt)
         return json.loads(response)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from app.core.database import SessionLocal
+from app.models.ai_models import PipelineRun
+
+PIPELINE_STAGES = ["ingest", "curriculum", "assessments"]
+
+def schema_fingerprint(generation_schema: Optional[Dict[str, Any]]) -> str:
+    """Short stable hash of a generation schema, independent of key order"""
+    canonical = json.dumps(generation_schema or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+def pipeline_id_for(s3_key: str, teacher_id: int, generation_schema: Optional[Dict[str, Any]]) -> str:
+    """One pipeline per upload, teacher and schema; a new schema never reuses old outputs"""
+    return f"pipeline_{s3_key}_{teacher_id}_{schema_fingerprint(generation_schema)}"
+
+class PipelineStateStore:
+    """Persistent per-stage state for agent pipeline runs"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def get_run(self, pipeline_id: str) -> Optional[Dict[str, Any]]:
+        """Load a pipeline run as a plain dict, or None if unknown"""
+        db = self.session_factory()
+        try:
+            run = db.query(PipelineRun).filter(PipelineRun.pipeline_id == pipeline_id).first()
+            return self._to_dict(run) if run else None
+        finally:
+            db.close()
+
+    def start_run(self, pipeline_id: str, s3_key: str, teacher_id: int,
+                  generation_schema: Dict[str, Any], resume: bool = True) -> Dict[str, Any]:
+        """Create a run or reopen an existing one for resumption"""
+        db = self.session_factory()
+        try:
+            run = db.query(PipelineRun).filter(PipelineRun.pipeline_id == pipeline_id).first()
+
+            if run is None:
+                run = PipelineRun(pipeline_id=pipeline_id, attempts=0)
+                db.add(run)
+
+            # Completed stages were produced for the stored schema; a different one starts over
+            schema_changed = schema_fingerprint(run.generation_schema) != schema_fingerprint(generation_schema)
+            if run.stages is None or not resume or schema_changed:
+                run.stages = {stage: {"status": "pending"} for stage in PIPELINE_STAGES}
+                run.final_outputs = None
+
+            run.s3_key = s3_key
+            run.teacher_id = teacher_id
+            run.generation_schema = generation_schema
+            run.status = "running"
+            run.errors = []
+            run.attempts = (run.attempts or 0) + 1
+            run.updated_at = datetime.utcnow()
+
+            db.commit()
+            db.refresh(run)
+            return self._to_dict(run)
+        finally:
+            db.close()
+
+    def get_stage_output(self, pipeline_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the stored output of a completed stage, if any"""
+        run = self.get_run(pipeline_id)
+        if not run:
+            return None
+
+        stage_state = run["stages"].get(stage, {})
+        if stage_state.get("status") == "completed":
+            return stage_state.get("output")
+        return None
+
+    def mark_stage_running(self, pipeline_id: str, stage: str):
+        """Record that a stage has started"""
+        self._update_stage(pipeline_id, stage, {
+            "status": "running",
+            "started_at": datetime.utcnow().isoformat()
+        })
+
+    def complete_stage(self, pipeline_id: str, stage: str, output: Any):
+        """Checkpoint a finished stage together with its output"""
+        self._update_stage(pipeline_id, stage, {
+            "status": "completed",
+            "output": output,
+            "error": None,
+            "completed_at": datetime.utcnow().isoformat()
+        })
+
+    def fail_stage(self, pipeline_id: str, stage: str, error: str, output: Any = None):
+        """Record a stage failure, keeping any partial output for the retry"""
+        updates = {
+            "status": "failed",
+            "error": error,
+            "failed_at": datetime.utcnow().isoformat()
+        }
+        if output is not None:
+            updates["output"] = output
+        self._update_stage(pipeline_id, stage, updates)
+
+    def finish_run(self, pipeline_id: str, status: str, final_outputs: Dict[str, Any] = None,
+                   errors: List[str] = None):
+        """Close a run as completed, partial or failed"""
+        db = self.session_factory()
+        try:
+            run = db.query(PipelineRun).filter(PipelineRun.pipeline_id == pipeline_id).first()
+            if not run:
+                return
+
+            run.status = status
+            if status == "completed":
+                run.current_stage = None
+            run.final_outputs = final_outputs
+            run.errors = errors or []
+            run.updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def _update_stage(self, pipeline_id: str, stage: str, updates: Dict[str, Any]):
+        db = self.session_factory()
+        try:
+            run = db.query(PipelineRun).filter(PipelineRun.pipeline_id == pipeline_id).first()
+            if not run:
+                raise ValueError(f"Pipeline run {pipeline_id} not found")
+
+            # JSON columns only persist on reassignment
+            stages = dict(run.stages or {})
+            stages[stage] = {**stages.get(stage, {}), **updates}
+            run.stages = stages
+            run.current_stage = stage
+            run.updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def _to_dict(self, run: PipelineRun) -> Dict[str, Any]:
+        stages = run.stages or {}
+        completed = [s for s in PIPELINE_STAGES if stages.get(s, {}).get("status") == "completed"]
+
+        return {
+            "pipeline_id": run.pipeline_id,
+            "teacher_id": run.teacher_id,
+            "s3_key": run.s3_key,
+            "generation_schema": run.generation_schema,
+            "status": run.status,
+            "current_stage": run.current_stage,
+            "stages": stages,
+            "completed_stages": completed,
+            "progress": int(len(completed) / len(PIPELINE_STAGES) * 100),
+            "final_outputs": run.final_outputs,
+            "errors": run.errors or [],
+            "attempts": run.attempts or 0,
+            "created_at": run.created_at.isoformat() if run.created_at else None,
+            "updated_at": run.updated_at.isoformat() if run.updated_at else None
+        }
@@ -0,0 +1,202 @@
+"""
+Local near-duplicate detection for submissions
+Shingles text or normalized code tokens, builds MinHash signatures and uses
+LSH banding so a whole class is compared in roughly linear time.
+"""
+import keyword
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Any, List, Tuple, Set
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+_PRIME = np.uint64(MERSENNE_PRIME)
+
+DEFAULT_SETTINGS = {
+    "threshold": 0.7,
+    "num_perm": 128,
+    "bands": 32,
+    "text_shingle_size": 5,
+    "code_shingle_size": 7,
+    "max_matched_sections": 5,
+    "max_explained_pairs": 10
+}
+
+_WORD = re.compile(r"\w+")
+_CODE_TOKEN = re.compile(
+    r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\d+(?:\.\d+)?|[A-Za-z_]\w*|==|!=|<=|>=|->|&&|\|\||\S'
+)
+_CODE_COMMENT = re.compile(r"#[^\n]*|//[^\n]*|/\*.*?\*/", re.DOTALL)
+_CODE_KEYWORDS = set(keyword.kwlist) | {
+    "function", "var", "let", "const", "new", "this", "public", "private", "static",
+    "void", "int", "float", "double", "char", "string", "bool", "boolean", "switch", "case"
+}
+
+def text_tokens(text: str) -> Tuple[List[str], List[str]]:
+    """Lower-cased word tokens, alongside the original words for reporting"""
+    words = _WORD.findall(text)
+    return [w.lower() for w in words], words
+
+def code_tokens(code: str) -> Tuple[List[str], List[str]]:
+    """Tokens with identifiers and literals normalized, so renaming does not hide copying"""
+    original = _CODE_TOKEN.findall(_CODE_COMMENT.sub(" ", code))
+    normalized = []
+    for token in original:
+        if token[0] in "\"'":
+            normalized.append("STR")
+        elif token[0].isdigit():
+            normalized.append("NUM")
+        elif token[0].isalpha() or token[0] == "_":
+            normalized.append(token if token in _CODE_KEYWORDS else "ID")
+        else:
+            normalized.append(token)
+    return normalized, original
+
+class Fingerprint:
+    """Shingle set and MinHash signature of one submission"""
+
+    def __init__(self, doc_id: str, tokens: List[str], original: List[str], shingle_size: int):
+        self.doc_id = doc_id
+        self.original = original
+        # shingle hash -> token start positions
+        self.positions: Dict[int, List[int]] = defaultdict(list)
+        size = min(shingle_size, len(tokens)) or 1
+        for start in range(max(len(tokens) - size + 1, 0)):
+            shingle = " ".join(tokens[start:start + size])
+            self.positions[zlib.crc32(shingle.encode("utf-8"))].append(start)
+        self.shingle_size = size
+        self.signature = None
+
+    @property
+    def shingles(self) -> Set[int]:
+        return set(self.positions)
+
+class PlagiarismEngine:
+    """MinHash/LSH similarity search over a set of submissions"""
+
+    def __init__(self, settings: Dict[str, Any] = None, seed: int = 1):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        num_perm = self.settings["num_perm"]
+        if num_perm % self.settings["bands"]:
+            raise ValueError("num_perm must be divisible by bands")
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+    def fingerprint(self, doc_id: str, content: str, kind: str = "text") -> Fingerprint:
+        if kind == "code":
+            tokens, original = code_tokens(content)
+            size = self.settings["code_shingle_size"]
+        else:
+            tokens, original = text_tokens(content)
+            size = self.settings["text_shingle_size"]
+
+        fp = Fingerprint(doc_id, tokens, original, size)
+        fp.signature = self._signature(fp.shingles)
+        return fp
+
+    def _signature(self, shingles: Set[int]) -> np.ndarray:
+        if not shingles:
+            return np.full(self.settings["num_perm"], MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % _PRIME
+        # (a * h + b) mod p for every permutation at once; products stay below 2**62
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def candidate_pairs(self, fingerprints: List[Fingerprint]) -> Set[Tuple[int, int]]:
+        """Index pairs sharing at least one LSH band"""
+        bands = self.settings["bands"]
+        rows = self.settings["num_perm"] // bands
+        pairs = set()
+
+        for band in range(bands):
+            buckets = defaultdict(list)
+            for index, fp in enumerate(fingerprints):
+                if not fp.positions:
+                    continue
+                key = fp.signature[band * rows:(band + 1) * rows].tobytes()
+                buckets[key].append(index)
+            for members in buckets.values():
+                if len(members) > 1:
+                    pairs.update(combinations(members, 2))
+
+        return pairs
+
+    def shares_band(self, left: Fingerprint, right: Fingerprint) -> bool:
+        """True when two fingerprints would land in the same bucket of some LSH band"""
+        if not left.positions or not right.positions:
+            return False
+        bands = self.settings["bands"]
+        same = left.signature.reshape(bands, -1) == right.signature.reshape(bands, -1)
+        return bool(same.all(axis=1).any())
+
+    def compare(self, left: Fingerprint, right: Fingerprint) -> Dict[str, Any]:
+        """Exact Jaccard similarity and the shared passages of two fingerprints"""
+        a, b = left.shingles, right.shingles
+        shared = a & b
+        similarity = len(shared) / len(a | b) if a or b else 0.0
+
+        return {
+            "similarity": round(similarity, 4),
+            "estimated_similarity": round(float(np.mean(left.signature == right.signature)), 4),
+            "matched_sections": self._matched_sections(left, shared)
+        }
+
+    def find_similar_pairs(self, submissions: Dict[str, str], kind: str = "text") -> List[Dict[str, Any]]:
+        """All submission pairs at or above the similarity threshold, most similar first"""
+        fingerprints = [self.fingerprint(doc_id, content, kind) for doc_id, content in submissions.items()]
+        threshold = self.settings["threshold"]
+        results = []
+
+        for i, j in self.candidate_pairs(fingerprints):
+            comparison = self.compare(fingerprints[i], fingerprints[j])
+            if comparison["similarity"] >= threshold:
+                results.append({
+                    "submission_a": fingerprints[i].doc_id,
+                    "submission_b": fingerprints[j].doc_id,
+                    **comparison
+                })
+
+        return sorted(results, key=lambda r: r["similarity"], reverse=True)
+
+    def compare_to_references(self, submission: str, references: Dict[str, str],
+                              kind: str = "text") -> List[Dict[str, Any]]:
+        """References at or above the threshold for a single submission"""
+        target = self.fingerprint("submission", submission, kind)
+        threshold = self.settings["threshold"]
+        results = []
+
+        # Only the submission's own bands matter; reference-to-reference pairs are never built
+        for ref_id, content in references.items():
+            reference = self.fingerprint(ref_id, content, kind)
+            if not self.shares_band(target, reference):
+                continue
+            comparison = self.compare(target, reference)
+            if comparison["similarity"] >= threshold:
+                results.append({"reference_id": ref_id, **comparison})
+
+        return sorted(results, key=lambda r: r["similarity"], reverse=True)
+
+    def _matched_sections(self, fp: Fingerprint, shared: Set[int]) -> List[str]:
+        """Merge the positions of shared shingles into contiguous passages"""
+        covered = sorted({
+            position
+            for shingle in shared
+            for start in fp.positions[shingle]
+            for position in range(start, start + fp.shingle_size)
+        })
+
+        spans = []
+        for position in covered:
+            if spans and position == spans[-1][1] + 1:
+                spans[-1][1] = position
+            else:
+                spans.append([position, position])
+
+        spans.sort(key=lambda span: span[1] - span[0], reverse=True)
+        return [
+            " ".join(fp.original[start:end + 1])
+            for start, end in spans[:self.settings["max_matched_sections"]]
+        ]
@@ -0,0 +1,121 @@
+import json
+import logging
+from typing import Dict, Any, List, Optional, Union
+from agents.usage_meter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Fields each prompt actually needs. A None value keeps the field as-is;
+# a list or dict projects nested objects (applied to every item of a list).
+PROMPT_FIELDS = {
+    "assessment": {
+        "id": None,
+        "title": None,
+        "total_points": None,
+        "scoring_rubric": None,
+        # question_text/question_type from the pipeline agents, question/type from the legacy generator
+        "questions": [
+            "id", "question_text", "question", "question_type", "type", "points",
+            "options", "correct_answer", "sample_answer", "rubric"
+        ]
+    },
+    "submission": ["id", "student_id", "answers", "responses", "time_spent"],
+    # Pipeline agents write learning_outcomes; the legacy curriculum architect learning_objectives
+    "module": [
+        "id", "module_id", "title", "description", "bloom_level", "difficulty",
+        "learning_outcomes", "learning_objectives", "key_concepts", "prerequisites", "estimated_hours"
+    ],
+    "student_profile": [
+        "id", "learning_style", "current_level", "skill_level", "average_score",
+        "strengths", "weak_areas", "struggle_areas", "interests", "available_time",
+        "goals", "target_exams", "performance_trend"
+    ]
+}
+
+ProjectionSpec = Union[None, List[str], Dict[str, Any]]
+
+def project(value: Any, spec: ProjectionSpec) -> Any:
+    """Keep only the fields named in ``spec``, recursing into nested objects"""
+    if spec is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    fields = spec if isinstance(spec, dict) else dict.fromkeys(spec)
+    return {
+        key: project(value[key], sub_spec)
+        for key, sub_spec in fields.items()
+        if value.get(key) not in (None, "", [], {})
+    }
+
+def compact_json(value: Any) -> str:
+    """Serialize without indentation or padding"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def compact_prompt(prompt: str) -> str:
+    """Drop the source indentation and blank lines of a templated prompt"""
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
+
+def truncate(text: str, max_chars: Optional[int]) -> str:
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "...[truncated]"
+
+class PromptPayload:
+    """Builds compact prompt sections and reports their token cost
+
+    Sections are filled into a template by name once it has been compacted,
+    so code and other whitespace-sensitive data reach the model unchanged:
+
+        payload = PromptPayload().add("assessment", assessment, kind="assessment")
+        prompt = payload.render('''
+            Assessment: {assessment}
+        ''')
+    """
+
+    def __init__(self):
+        self.sections: Dict[str, str] = {}
+        self.original_tokens: Dict[str, int] = {}
+
+    def add(self, name: str, value: Any, kind: str = None, max_chars: int = None) -> "PromptPayload":
+        """Project ``value`` with the field set for ``kind`` and store it compactly"""
+        projected = project(value, PROMPT_FIELDS[kind]) if kind else value
+        text = value if isinstance(value, str) else compact_json(projected)
+
+        self.sections[name] = truncate(text, max_chars)
+        self.original_tokens[name] = estimate_tokens(
+            value if isinstance(value, str) else json.dumps(value, indent=2, default=str)
+        )
+        return self
+
+    def __getitem__(self, name: str) -> str:
+        return self.sections[name]
+
+    def render(self, template: str, **values: Any) -> str:
+        """Compact ``template`` (a str.format template), then fill in the sections and ``values``"""
+        return compact_prompt(template).format(**self.sections, **values)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estimated tokens per section, before and after compaction"""
+        sections = {
+            name: {"tokens": estimate_tokens(text), "original_tokens": self.original_tokens[name]}
+            for name, text in self.sections.items()
+        }
+        tokens = sum(s["tokens"] for s in sections.values())
+        original = sum(s["original_tokens"] for s in sections.values())
+
+        return {
+            "sections": sections,
+            "tokens": tokens,
+            "original_tokens": original,
+            "saved_ratio": round(1 - tokens / original, 3) if original else 0.0
+        }
+
+    def log(self, prompt_name: str):
+        stats = self.stats()
+        logger.debug(
+            f"{prompt_name} payload: {stats['tokens']} tokens "
+            f"(was {stats['original_tokens']}, saved {stats['saved_ratio']:.0%})"
+        )
@@ -0,0 +1,136 @@
+"""
+Validation of generated assessment questions
+Cheap structural checks run locally first; the survivors are sent to the
+model in batches, one prompt per batch, and its verdicts decide which
+questions are kept and what corrections are applied.
+"""
+import asyncio
+import json
+import re
+from typing import Dict, Any, List, Awaitable, Callable
+from agents.prompt_payload import project, compact_json, compact_prompt
+
+# Local validation bounds applied before any model call
+MIN_QUESTION_LENGTH = 10
+MAX_QUESTION_LENGTH = 1000
+MIN_OPTIONS = 2
+MAX_OPTIONS = 6
+
+# Questions per validation prompt; batches are sent concurrently
+VALIDATION_BATCH_SIZE = 5
+# Everything the validator needs to judge the answer, including short-answer and coding keys
+VALIDATION_FIELDS = [
+    "question_text", "question_type", "options", "correct_answer", "sample_answer",
+    "solution", "test_cases", "bloom_level", "difficulty"
+]
+
+DEFAULT_VERDICT = {
+    "is_valid": True,
+    "issues": [],
+    "corrections": {},
+    "quality_score": 0.8
+}
+
+_PROMPT = """
+    Validate each of these assessment questions:
+
+    Questions: {questions}
+
+    Check for:
+    1. Clear and unambiguous wording
+    2. Appropriate difficulty level
+    3. Correct answer accuracy
+    4. Bloom's taxonomy alignment
+
+    Return a JSON array with one verdict per question:
+    [
+        {{
+            "index": 0,
+            "is_valid": true/false,
+            "issues": ["issue1", "issue2"],
+            "corrections": {{
+                "question_text": "corrected_text_if_needed"
+            }},
+            "quality_score": 0.85
+        }}
+    ]
+"""
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+def local_validation(questions: List[Dict]) -> List[Dict[str, Any]]:
+    """Drop duplicates and structurally broken questions without a model call"""
+    seen_texts = set()
+    valid = []
+
+    for question in questions:
+        text = str(question.get("question_text", "")).strip()
+        normalized = _normalize(text)
+
+        if not MIN_QUESTION_LENGTH <= len(text) <= MAX_QUESTION_LENGTH:
+            continue
+        if normalized in seen_texts:
+            continue
+
+        if question.get("question_type") == "multiple_choice":
+            options = question.get("options") or []
+            if not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+                continue
+            if len({str(o).strip().lower() for o in options}) != len(options):
+                continue
+            answer = question.get("correct_answer")
+            if isinstance(answer, int) and not isinstance(answer, bool):
+                if not 0 <= answer < len(options):
+                    continue
+            elif answer not in options:
+                continue
+
+        seen_texts.add(normalized)
+        valid.append(question)
+
+    return valid
+
+def batch_prompt(questions: List[Dict]) -> str:
+    """One validation prompt for a batch, with each question's index in the batch"""
+    indexed = [{"index": i, **project(q, VALIDATION_FIELDS)} for i, q in enumerate(questions)]
+    return compact_prompt(_PROMPT).format(questions=compact_json(indexed))
+
+def parse_verdicts(response: str, count: int) -> List[Dict[str, Any]]:
+    """Verdicts by batch position; anything missing or unparseable passes by default"""
+    try:
+        by_index = {v.get("index"): v for v in json.loads(response) if isinstance(v, dict)}
+    except (TypeError, ValueError):
+        by_index = {}
+    return [by_index.get(i, DEFAULT_VERDICT) for i in range(count)]
+
+def apply_verdicts(questions: List[Dict], verdicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the questions judged valid, with the validator's corrections applied"""
+    return [
+        {**question, **(verdict.get("corrections") or {})}
+        for question, verdict in zip(questions, verdicts)
+        if verdict.get("is_valid", True)
+    ]
+
+async def validate_batch(generate: Callable[[str], Awaitable[str]], questions: List[Dict]) -> List[Dict[str, Any]]:
+    """Validate a batch of questions with a single model call"""
+    try:
+        response = await generate(batch_prompt(questions))
+    except Exception:
+        # Default validation (pass all questions)
+        response = None
+    return parse_verdicts(response, len(questions))
+
+async def validate_questions(generate: Callable[[str], Awaitable[str]], questions: List[Dict]) -> List[Dict[str, Any]]:
+    """Local checks first, then batched model verdicts sent concurrently"""
+    candidates = local_validation(questions)
+    batches = [
+        candidates[i:i + VALIDATION_BATCH_SIZE]
+        for i in range(0, len(candidates), VALIDATION_BATCH_SIZE)
+    ]
+    verdicts = await asyncio.gather(*(validate_batch(generate, batch) for batch in batches))
+
+    validated = []
+    for batch, batch_verdicts in zip(batches, verdicts):
+        validated.extend(apply_verdicts(batch, batch_verdicts))
+    return validated
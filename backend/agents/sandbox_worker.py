@@ -0,0 +1,262 @@
+"""
+Zygote process for the coding-submission sandbox
+Relays one JSON job per line on stdin to a freshly forked child and writes
+one JSON report per line on stdout. Submissions never run in the zygote:
+it keeps a warm child forked ahead of time, the child reads its own job,
+gives up stdin and the protocol channel, sets hard rlimits, runs the
+submission and reports over a pipe used for that job only, and is then
+killed. The zygote never sees job contents, the expected output never
+enters the sandbox, and the pass/fail verdict is made by the pool
+(judge()), so nothing a submission does can forge a result or reach the
+next student's job. Started by agents.code_runner.SandboxPool; not meant to
+be run directly.
+"""
+import ast
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+# Imported once here so forked children start warm
+import bisect, collections, functools, heapq, itertools, re, string  # noqa: E401,F401
+
+MAX_REPORT_BYTES = 64 * 1024
+OUTPUT_TAIL = 1000
+# Written by the child once it holds its job, before any submission code runs
+_READY = b"\x01"
+_REPORT_STATUSES = {"completed", "error", "memory_limit"}
+
+def _parse(value):
+    """Test case values arrive as literals or as their string form"""
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, TypeError, SyntaxError, RecursionError, MemoryError):
+            return value
+    return value
+
+def _call_args(case):
+    if "args" in case:
+        return list(case["args"]), dict(case.get("kwargs", {}))
+    value = _parse(case.get("input"))
+    if isinstance(value, tuple):
+        return list(value), {}
+    return [value], {}
+
+def _matches(actual, expected) -> bool:
+    expected = _parse(expected)
+    if actual == expected:
+        return True
+    if isinstance(actual, float) and isinstance(expected, (int, float)):
+        return math.isclose(actual, expected, rel_tol=1e-6, abs_tol=1e-9)
+    return str(actual).strip() == str(expected).strip()
+
+def judge(report, expected):
+    """Final case result from a zygote report; called by the pool, which holds the expected output"""
+    result = {key: report.get(key) for key in ("status", "actual", "error", "duration_ms", "stdout")}
+    if report.get("status") == "completed":
+        actual = report.get("actual")
+        value = actual if report.get("is_str") else _parse(actual)
+        result["status"] = "passed" if _matches(value, expected) else "failed"
+    return result
+
+# Process control that submissions must not reach (RLIMIT_NPROC does not bind root)
+_BLOCKED_CALLS = [
+    "fork", "forkpty", "system", "popen", "kill", "killpg", "setsid",
+    "execv", "execve", "execl", "execle", "execlp", "execlpe", "execvp", "execvpe",
+    "spawnl", "spawnle", "spawnlp", "spawnlpe", "spawnv", "spawnve", "spawnvp", "spawnvpe",
+    "posix_spawn", "posix_spawnp"
+]
+
+def _blocked(*args, **kwargs):
+    raise PermissionError("process control is disabled in the sandbox")
+
+def _block_process_control():
+    import posix
+    for module in (os, posix):
+        for name in _BLOCKED_CALLS:
+            if hasattr(module, name):
+                setattr(module, name, _blocked)
+    sys.modules["subprocess"] = None
+    sys.modules["multiprocessing"] = None
+
+def _read_job():
+    """The next job line from fd 0; the pool sends one job and waits for its report"""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = os.read(0, 65536)
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def _confine(report_fd: int, cpu_seconds: float, memory_mb: int):
+    """Runs in the child before any submission code"""
+    # stdin/stdout/stderr go to /dev/null; every other inherited descriptor but the report pipe is closed
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.closerange(3, report_fd)
+    os.closerange(report_fd + 1, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+
+    # Hard limits, so the submission cannot raise them again
+    cpu = max(1, math.ceil(cpu_seconds))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    if hasattr(resource, "RLIMIT_NPROC"):
+        # No child processes from submissions
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    _block_process_control()
+
+def _execute(job):
+    """Run the submission; reports what it produced, never a verdict"""
+    case = job["case"]
+    namespace = {"__name__": "__submission__"}
+    stdout = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(stdout):
+            if job.get("function"):
+                exec(compile(job["code"], "<submission>", "exec"), namespace)
+                func = namespace.get(job["function"])
+                if not callable(func):
+                    raise NameError(f"function '{job['function']}' is not defined")
+                args, kwargs = _call_args(case)
+                actual = func(*args, **kwargs)
+            else:
+                # Script-style submission: input on stdin, answer on stdout
+                sys.stdin = io.StringIO(str(case.get("input", "")))
+                exec(compile(job["code"], "<submission>", "exec"), namespace)
+                actual = stdout.getvalue().strip()
+        return {
+            "status": "completed",
+            "actual": actual if isinstance(actual, str) else repr(actual),
+            "is_str": isinstance(actual, str),
+            "error": None,
+            "stdout": stdout.getvalue()[-OUTPUT_TAIL:]
+        }
+    except MemoryError:
+        status, error = "memory_limit", "MemoryError"
+    except BaseException as e:
+        # SystemExit from the submission is reported like any other error
+        status = "error"
+        error = "".join(traceback.format_exception_only(type(e), e)).strip()
+
+    return {"status": status, "actual": None, "error": error, "stdout": stdout.getvalue()[-OUTPUT_TAIL:]}
+
+def _child(protocol_fd: int, report_fd: int, cpu_seconds: float, memory_mb: int):
+    try:
+        os.setpgid(0, 0)
+        os.close(protocol_fd)
+        line = _read_job()
+        if line is None:
+            return
+        os.write(report_fd, _READY)
+        _confine(report_fd, cpu_seconds, memory_mb)
+        try:
+            report = _execute(json.loads(line))
+        except ValueError as e:
+            report = {"status": "error", "actual": None, "error": f"invalid job: {e}", "stdout": ""}
+        os.write(report_fd, json.dumps(report, default=str).encode("utf-8")[:MAX_REPORT_BYTES])
+    finally:
+        os._exit(0)
+
+def _fork_child(protocol_fd: int, cpu_seconds: float, memory_mb: int):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        _child(protocol_fd, write_fd, cpu_seconds, memory_mb)
+    os.close(write_fd)
+    try:
+        # Also set from this side, so the group exists even if the child is killed early
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+    return pid, read_fd
+
+def _collect(read_fd: int, timeout: float):
+    """Read the child's report until it closes the pipe or the deadline passes"""
+    deadline = time.monotonic() + timeout
+    data = b""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return data, True
+        ready, _, _ = select.select([read_fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            return data, False
+        data = (data + chunk)[:MAX_REPORT_BYTES]
+
+def _reap(pid: int) -> int:
+    # Take down the child and anything it left behind
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    _, status = os.waitpid(pid, 0)
+    return status
+
+def _report(data: bytes, status: int, timed_out: bool, timeout: float, started: float):
+    """Normalize the child's untrusted report into one protocol line's worth of fields"""
+    report = {"status": "error", "actual": None, "is_str": False, "error": None, "stdout": ""}
+    try:
+        raw = json.loads(data) if not timed_out else None
+    except ValueError:
+        raw = None
+
+    if timed_out:
+        report.update(status="timeout", error=f"exceeded {timeout}s")
+    elif not isinstance(raw, dict) or raw.get("status") not in _REPORT_STATUSES:
+        if os.WIFSIGNALED(status) and os.WTERMSIG(status) in (signal.SIGKILL, signal.SIGXCPU):
+            report.update(status="resource_limit", error="worker terminated (CPU or memory limit)")
+        else:
+            report["error"] = "submission exited without a result"
+    else:
+        report.update(
+            status=raw["status"],
+            actual=None if raw.get("actual") is None else str(raw["actual"]),
+            is_str=bool(raw.get("is_str")),
+            error=None if raw.get("error") is None else str(raw["error"]),
+            stdout=str(raw.get("stdout") or "")[-OUTPUT_TAIL:]
+        )
+
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return report
+
+def main():
+    cpu_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    memory_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    timeout = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    # Keep the protocol channel away from anything else that writes to stdout
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+    while True:
+        pid, read_fd = _fork_child(protocol.fileno(), cpu_seconds, memory_mb)
+        # Idle until the child has read a job; EOF here means the pool closed stdin
+        if not os.read(read_fd, 1):
+            os.close(read_fd)
+            _reap(pid)
+            return
+        started = time.perf_counter()
+        data, timed_out = _collect(read_fd, timeout)
+        os.close(read_fd)
+        status = _reap(pid)
+        protocol.write(json.dumps(_report(data, status, timed_out, timeout, started)) + "\n")
+
+if __name__ == "__main__":
+    main()
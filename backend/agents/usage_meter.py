@@ -0,0 +1,282 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+from sqlalchemy import insert
+from app.core.database import SessionLocal
+from app.models.ai_models import AIInteraction
+from agents.agent_config import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+# Rough Claude tokenizer ratio; Bedrock text completions do not return usage counts
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_OUTPUT_TOKENS = 4000
+# Buffered usage rows written in one go once this many are pending
+FLUSH_THRESHOLD = 100
+
+# Meter for the agent run executing in the current task
+_active_meter: ContextVar[Optional["UsageMeter"]] = ContextVar("agent_usage_meter", default=None)
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count for a prompt or completion"""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def current_meter() -> Optional["UsageMeter"]:
+    """Return the meter of the agent run in progress, if any"""
+    return _active_meter.get()
+
+class BudgetExceededError(Exception):
+    """Raised when an agent run has used up its token or runtime budget"""
+
+    def __init__(self, agent_name: str, violations: list):
+        self.agent_name = agent_name
+        self.violations = violations
+        super().__init__(f"{agent_name} budget exceeded: {'; '.join(violations)}")
+
+class UsageBuffer:
+    """Pending AIInteraction rows, written in a single transaction per flush
+
+    Meters only append here, so recording usage never blocks the event loop;
+    the orchestrators flush once per run through aflush(), which does the
+    insert on a worker thread.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._rows: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: Dict[str, Any]):
+        with self._lock:
+            self._rows.append(row)
+            pending = len(self._rows)
+        if pending < FLUSH_THRESHOLD:
+            return
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self.flush)
+        except RuntimeError:
+            self.flush()
+
+    def flush(self) -> int:
+        """Insert every pending row; returns the number written"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(AIInteraction.__table__), rows)
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not record usage for {len(rows)} agent run(s): {e}")
+            return 0
+        finally:
+            db.close()
+
+    async def aflush(self) -> int:
+        return await asyncio.to_thread(self.flush)
+
+# Process-wide buffer used unless a meter is given its own
+usage_buffer = UsageBuffer()
+
+class UsageMeter:
+    """Token, latency and runtime accounting for a single agent run"""
+
+    def __init__(self, agent_name: str, user_id: int = None, interaction_type: str = None,
+                 buffer: UsageBuffer = None):
+        self.agent_name = agent_name
+        self.user_id = user_id
+        self.interaction_type = interaction_type or agent_name
+        self.buffer = buffer or usage_buffer
+        self.limits = AgentConfig.get_agent_limits(agent_name)
+
+        self.started_at = time.monotonic()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.ai_calls = 0
+        self.degraded_calls = 0
+        self.model_seconds = 0.0
+        self.models = []
+        self.violations = []
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def runtime_minutes(self) -> float:
+        return (time.monotonic() - self.started_at) / 60
+
+    def usage(self) -> Dict[str, Any]:
+        """Usage keyed the way AgentConfig.validate_limits expects"""
+        return {
+            "ai_tokens": self.total_tokens,
+            "runtime_minutes": round(self.runtime_minutes, 3),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "ai_calls": self.ai_calls,
+            "degraded_calls": self.degraded_calls,
+            "model_seconds": round(self.model_seconds, 3)
+        }
+
+    def remaining_tokens(self) -> Optional[int]:
+        """Tokens left in the budget, or None when the agent has no token limit"""
+        limit = self.limits.get("max_ai_tokens")
+        if limit is None:
+            return None
+        return max(0, limit - self.total_tokens)
+
+    def check_budget(self, prompt_tokens: int = 0):
+        """Raise BudgetExceededError if the next call would go over a limit"""
+        usage = self.usage()
+        usage["ai_tokens"] += prompt_tokens
+
+        result = AgentConfig.validate_limits(self.agent_name, usage)
+        if not result["within_limits"]:
+            self.violations = result["violations"]
+            raise BudgetExceededError(self.agent_name, result["violations"])
+
+    def output_allowance(self, prompt_tokens: int) -> int:
+        """Largest completion the budget still allows for a prompt of this size"""
+        remaining = self.remaining_tokens()
+        if remaining is None:
+            return DEFAULT_MAX_OUTPUT_TOKENS
+        return max(1, min(DEFAULT_MAX_OUTPUT_TOKENS, remaining - prompt_tokens))
+
+    def record_call(self, prompt: str, completion: str, seconds: float, model: str = None):
+        self.ai_calls += 1
+        self.input_tokens += estimate_tokens(prompt)
+        self.output_tokens += estimate_tokens(completion)
+        self.model_seconds += seconds
+        if model and model not in self.models:
+            self.models.append(model)
+
+    def record_degraded(self):
+        self.degraded_calls += 1
+
+    def save(self, success: bool = True, error: str = None):
+        """Queue run totals as an AIInteraction row; written on the buffer's next flush"""
+        self.buffer.add({
+            "user_id": self.user_id,
+            "interaction_type": self.interaction_type,
+            "input_data": {"agent": self.agent_name, "limits": self.limits},
+            "output_data": {**self.usage(), "violations": self.violations},
+            "ai_service": "bedrock",
+            "model_used": ", ".join(self.models) or None,
+            "tokens_used": self.total_tokens,
+            "processing_time": round(time.monotonic() - self.started_at, 3),
+            "success": success,
+            "error_message": error
+        })
+
+@contextmanager
+def metered_run(agent_name: str, user_id: int = None, interaction_type: str = None,
+                buffer: UsageBuffer = None):
+    """Meter every model call made inside the block and queue the totals on exit"""
+    meter = UsageMeter(agent_name, user_id=user_id, interaction_type=interaction_type, buffer=buffer)
+    token = _active_meter.set(meter)
+    try:
+        yield meter
+    except Exception as e:
+        meter.save(success=False, error=str(e))
+        raise
+    else:
+        meter.save(success=not meter.violations, error="; ".join(meter.violations) or None)
+    finally:
+        _active_meter.reset(token)
+
+def flushes_usage(func):
+    """Flush the shared usage buffer once the decorated coroutine finishes"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            await usage_buffer.aflush()
+    return wrapper
+
+class MeteredAIService:
+    """AIService wrapper that charges every model call to the active agent run
+
+    Calls made outside a metered_run are recorded as a run of their own in
+    ``buffer``. Once the run is over budget, text generation raises BudgetExceededError
+    (agents fall back to their local templates) and structured generation
+    degrades to the EnhancedAIService implementations.
+    """
+
+    def __init__(self, ai_service, agent_name: str, buffer: UsageBuffer = None):
+        self.ai_service = ai_service
+        self.agent_name = agent_name
+        self.buffer = buffer
+
+    def __getattr__(self, name):
+        return getattr(self.ai_service, name)
+
+    async def generate_content(self, prompt: str) -> str:
+        meter = current_meter()
+        if meter is None:
+            with metered_run(self.agent_name, buffer=self.buffer):
+                return await self.generate_content(prompt)
+
+        prompt_tokens = estimate_tokens(prompt)
+        try:
+            meter.check_budget(prompt_tokens)
+        except BudgetExceededError:
+            meter.record_degraded()
+            raise
+
+        started = time.monotonic()
+        completion, model = await self.ai_service.generate_content_with_model(
+            prompt, max_tokens=meter.output_allowance(prompt_tokens)
+        )
+        meter.record_call(prompt, completion, time.monotonic() - started, model)
+        return completion
+
+    async def generate_curriculum(self, content: str, subject: str, grade_level: str,
+                                  learning_objectives=None) -> Dict[str, Any]:
+        if self._over_budget(content):
+            return await self.ai_service.enhanced_ai.generate_enhanced_curriculum(content, subject, grade_level)
+        return await self._metered(
+            self.ai_service.generate_curriculum(content, subject, grade_level, learning_objectives), content
+        )
+
+    async def generate_assessments(self, curriculum_data: Dict[str, Any],
+                                   assessment_type: str = "comprehensive") -> Dict[str, Any]:
+        prompt = str(curriculum_data)
+        if self._over_budget(prompt):
+            return await self.ai_service.enhanced_ai.generate_enhanced_assessments(curriculum_data)
+        return await self._metered(self.ai_service.generate_assessments(curriculum_data, assessment_type), prompt)
+
+    def _over_budget(self, prompt: str) -> bool:
+        meter = current_meter()
+        if meter is None:
+            return False
+        try:
+            meter.check_budget(estimate_tokens(prompt))
+            return False
+        except BudgetExceededError as e:
+            logger.warning(f"{e}; using enhanced fallback")
+            meter.record_degraded()
+            return True
+
+    async def _metered(self, call, prompt: str):
+        meter = current_meter()
+        started = time.monotonic()
+        result = await call
+        if meter is not None:
+            meter.record_call(prompt, str(result), time.monotonic() - started, self.ai_service.text_model_id)
+        return result
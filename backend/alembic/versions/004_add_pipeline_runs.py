@@ -0,0 +1,42 @@
+"""Add pipeline_runs table for agent pipeline checkpoints
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create pipeline_runs table holding per-stage pipeline state
+    op.create_table(
+        'pipeline_runs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('pipeline_id', sa.String(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('s3_key', sa.String(), nullable=True),
+        sa.Column('generation_schema', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('current_stage', sa.String(), nullable=True),
+        sa.Column('stages', sa.JSON(), nullable=True),
+        sa.Column('final_outputs', sa.JSON(), nullable=True),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('ix_pipeline_runs_id', 'pipeline_runs', ['id'])
+    op.create_index('ix_pipeline_runs_pipeline_id', 'pipeline_runs', ['pipeline_id'], unique=True)
+
+def downgrade():
+    # Drop pipeline_runs table
+    op.drop_index('ix_pipeline_runs_pipeline_id', table_name='pipeline_runs')
+    op.drop_index('ix_pipeline_runs_id', table_name='pipeline_runs')
+    op.drop_table('pipeline_runs')
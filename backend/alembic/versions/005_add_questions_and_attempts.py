@@ -0,0 +1,53 @@
+"""Add questions and assessment_attempts tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create questions table
+    op.create_table(
+        'questions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('assessment_id', sa.Integer(), sa.ForeignKey('assessments.id'), nullable=False),
+        sa.Column('question_text', sa.Text(), nullable=False),
+        sa.Column('question_type', sa.String(), nullable=False),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('correct_answer', sa.Text(), nullable=True),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('explanation', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_questions_id', 'questions', ['id'])
+
+    # Create assessment_attempts table holding answers and grading results
+    op.create_table(
+        'assessment_attempts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('assessment_id', sa.Integer(), sa.ForeignKey('assessments.id'), nullable=False),
+        sa.Column('answers', sa.JSON(), nullable=True),
+        sa.Column('total_score', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=True),
+        sa.Column('feedback', sa.JSON(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('ix_assessment_attempts_id', 'assessment_attempts', ['id'])
+
+def downgrade():
+    # Drop assessment_attempts and questions tables
+    op.drop_index('ix_assessment_attempts_id', table_name='assessment_attempts')
+    op.drop_table('assessment_attempts')
+    op.drop_index('ix_questions_id', table_name='questions')
+    op.drop_table('questions')
@@ -0,0 +1,73 @@
+"""Add search_documents full-text index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create search_documents table, one row per indexed entity
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('title', sa.String(), nullable=False, server_default=''),
+        sa.Column('body', sa.Text(), nullable=False, server_default=''),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('entity_type', 'entity_id', name='uq_search_documents_entity')
+    )
+    op.create_index('ix_search_documents_owner_id', 'search_documents', ['owner_id'])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Generated tsvector, GIN-indexed together with the owner
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        op.execute(
+            "ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_search_documents_owner_vector ON search_documents "
+            "USING gin (owner_id, search_vector)"
+        )
+    else:
+        # FTS5 external-content table kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+            "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+            "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+            "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+            "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+
+def downgrade():
+    # Drop search index objects and table
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_search_documents_owner_vector")
+    else:
+        op.execute("DROP TABLE IF EXISTS search_documents_fts")
+    op.drop_index('ix_search_documents_owner_id', table_name='search_documents')
+    op.drop_table('search_documents')
@@ -0,0 +1,59 @@
+"""Add indexes for hot query predicates
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 12:00:00.000000
+
+On PostgreSQL every index is built CONCURRENTLY outside the migration
+transaction, so writes to these tables are not blocked while it runs.
+If a concurrent build fails it leaves an INVALID index behind; drop it
+and rerun the upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+GRADED = sa.text('total_score IS NOT NULL')
+
+# (name, table, columns, partial predicate)
+INDEXES = [
+    ('ix_curricula_created_by_id', 'curricula', ['created_by', 'id'], None),
+    ('ix_assessments_curriculum_id', 'assessments', ['curriculum_id'], None),
+    ('ix_questions_assessment_id_id', 'questions', ['assessment_id', 'id'], None),
+    ('ix_assessment_attempts_graded', 'assessment_attempts', ['assessment_id', 'id'], GRADED),
+    ('ix_assessment_attempts_student_id', 'assessment_attempts', ['student_id', 'submitted_at'], None),
+    ('ix_learning_paths_student_id', 'learning_paths', ['student_id'], None),
+    ('ix_learning_paths_curriculum_id', 'learning_paths', ['curriculum_id'], None),
+    ('ix_students_created_by', 'students', ['created_by'], None),
+    ('ix_files_user_id_id', 'files', ['user_id', 'id'], None),
+    ('ix_modules_curriculum_id_week', 'modules', ['curriculum_id', 'week_number', 'sequence_order'], None),
+]
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+def upgrade():
+    # Create indexes, concurrently on PostgreSQL
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(name, table, columns, postgresql_where=where,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, sqlite_where=where, if_not_exists=True)
+
+def downgrade():
+    # Drop indexes, concurrently on PostgreSQL
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
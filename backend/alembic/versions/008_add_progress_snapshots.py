@@ -0,0 +1,38 @@
+"""Add progress_snapshots table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create progress_snapshots table written by the nightly progress job
+    op.create_table(
+        'progress_snapshots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('student_id', sa.Integer(), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('overall_progress', sa.Float(), nullable=True),
+        sa.Column('tasks_completed', sa.Integer(), nullable=True),
+        sa.Column('quizzes_taken', sa.Integer(), nullable=True),
+        sa.Column('average_score', sa.Float(), nullable=True),
+        sa.Column('study_streak', sa.Integer(), nullable=True),
+        sa.Column('recommendations', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_progress_snapshots_id', 'progress_snapshots', ['id'])
+    op.create_index('ix_progress_snapshots_student_id', 'progress_snapshots', ['student_id', 'created_at'])
+
+def downgrade():
+    # Drop progress_snapshots table
+    op.drop_index('ix_progress_snapshots_student_id', table_name='progress_snapshots')
+    op.drop_index('ix_progress_snapshots_id', table_name='progress_snapshots')
+    op.drop_table('progress_snapshots')
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.user import User
+from app.models.student import Student
+from app.services import study_streaks
 from app.api.auth import get_current_user
 from typing import Dict, Any, List
 import logging
@@ -104,6 +106,19 @@ async def get_class_performance(
         }
     }
 
+@router.get("/streaks")
+async def get_class_streaks(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Current and longest study streaks for every student of the current teacher"""
+    student_ids = [row.id for row in db.query(Student.id).filter(Student.created_by == current_user.id)]
+    streaks = study_streaks.get_streaks(db, student_ids)
+    return {
+        "students": [{"student_id": student_id, **streak} for student_id, streak in streaks.items()],
+        "total": len(streaks)
+    }
+
 @router.get("/misconceptions")
 async def get_misconceptions_analysis(
     current_user: User = Depends(get_current_user),
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
+from datetime import datetime, timezone
 from app.core.database import get_db
-# from app.models.curriculum import Assessment, Curriculum  # Models available
-from app.models.student import Student
+from app.models.curriculum import Assessment, Curriculum, Question
+from app.models.student import Student, AssessmentAttempt
 from app.models.user import User
 from app.schemas.curriculum import AssessmentResponse, QuestionResponse
 from app.api.auth import get_current_user
 from app.services.ai_service import AIService
+from app.services import study_streaks  # noqa: F401 - invalidates cached streaks on commit
+from app.tasks.export_tasks import export_class_reports as export_class_reports_job
 
 router = APIRouter()
 ai_service = AIService()
@@ -60,10 +63,13 @@ async def submit_no_auth(
 async def submit_assessment(
     assessment_id: int,
     submission_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     answers = submission_data.get("answers", {})
-    student_id = submission_data.get("student_id")
+    
+    # Attempts are recorded for the signed-in student only, never one named in the body
+    student = db.query(Student.id).filter(Student.email == current_user.email).first()
     
     # Get assessment and questions
     assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
@@ -106,8 +112,17 @@ async def submit_assessment(
     # Calculate final score
     percentage_score = (total_earned / total_possible * 100) if total_possible > 0 else 0
     
-    # Save assessment attempt (simplified for now)
-    # TODO: Implement proper assessment attempt tracking
+    if student:
+        db.add(AssessmentAttempt(
+            student_id=student.id,
+            assessment_id=assessment_id,
+            answers=answers,
+            total_score=total_earned,
+            max_score=total_possible,
+            feedback={qid: {"score": score, **detailed_feedback[qid]} for qid, score in question_scores.items()},
+            submitted_at=datetime.now(timezone.utc)
+        ))
+        db.commit()
     
     return {
         "assessment_id": assessment_id,
@@ -120,6 +135,24 @@ async def submit_assessment(
         "overall_feedback": f"You scored {total_earned}/{total_possible} ({percentage_score:.1f}%)"
     }
 
+@router.post("/{assessment_id}/reports/export")
+async def export_class_reports(
+    assessment_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Start a background export of every student's report as one ZIP; poll /api/tasks/status/{task_id}"""
+    assessment = db.query(Assessment.id, Curriculum.created_by).join(
+        Curriculum, Curriculum.id == Assessment.curriculum_id
+    ).filter(Assessment.id == assessment_id).first()
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    if assessment.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to export reports for this assessment")
+
+    task = export_class_reports_job.delay(assessment_id)
+    return {"task_id": task.id, "assessment_id": assessment_id, "status": "queued"}
+
 @router.post("/generate")
 async def generate_assessment(
     curriculum_id: int,
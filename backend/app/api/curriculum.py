@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
-# from app.models.curriculum import Curriculum, Assessment  # Models available
+from app.core.pagination import keyset_page, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
+from app.models.curriculum import Curriculum, Assessment
 from app.models.user import User
-from app.schemas.curriculum import CurriculumCreate, CurriculumResponse, LearningPathResponse
+from app.schemas.curriculum import CurriculumCreate, CurriculumResponse, CurriculumPage, LearningPathResponse
 from app.api.auth import get_current_user
 from app.services.ai_service import AIService
 from app.services.content_extractor import ContentExtractor
@@ -158,11 +159,22 @@ async def create_curriculum(
     db.commit()
     return db_curriculum
 
-@router.get("/", response_model=List[CurriculumResponse])
+@router.get("/", response_model=CurriculumPage)
 async def get_curricula(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    return db.query(Curriculum).all()
+    # List columns only; content_data stays in the database
+    query = db.query(
+        Curriculum.id, Curriculum.title, Curriculum.description,
+        Curriculum.subject, Curriculum.grade_level, Curriculum.created_at
+    )
+    try:
+        rows, next_cursor = keyset_page(query, Curriculum.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"curricula": [row._asdict() for row in rows], "next_cursor": next_cursor}
 
 @router.get("/test/{curriculum_id}")
 async def get_curriculum_test(
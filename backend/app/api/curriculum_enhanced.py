@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
-import io
+import copy
 from app.core.database import get_db
 from app.models.curriculum import Curriculum
 from app.models.user import User
@@ -27,15 +27,15 @@ async def adapt_curriculum_level(
     
     curriculum = db.query(Curriculum).filter(
         Curriculum.id == curriculum_id,
-        Curriculum.user_id == current_user.id
+        Curriculum.created_by == current_user.id
     ).first()
     
     if not curriculum:
         raise HTTPException(status_code=404, detail="Curriculum not found")
     
-    # Adapt curriculum using pedagogical templates
+    # Adapt a copy; the templates edit blocks in place
     adapted_data = pedagogical_templates.adapt_curriculum_for_level(
-        curriculum.metadata, target_level
+        copy.deepcopy(curriculum.content_data or {}), target_level
     )
     
     # Create new adapted curriculum
@@ -44,9 +44,8 @@ async def adapt_curriculum_level(
         description=f"Adapted for {target_level} level",
         subject=curriculum.subject,
         grade_level=target_level,
-        user_id=current_user.id,
-        source_content=curriculum.source_content,
-        metadata=adapted_data
+        created_by=current_user.id,
+        content_data=adapted_data
     )
     
     db.add(new_curriculum)
@@ -76,7 +75,7 @@ async def generate_scaffolded_project(
     
     curriculum = db.query(Curriculum).filter(
         Curriculum.id == curriculum_id,
-        Curriculum.user_id == current_user.id
+        Curriculum.created_by == current_user.id
     ).first()
     
     if not curriculum:
@@ -105,20 +104,20 @@ async def export_curriculum_pdf(
     
     curriculum = db.query(Curriculum).filter(
         Curriculum.id == curriculum_id,
-        Curriculum.user_id == current_user.id
+        Curriculum.created_by == current_user.id
     ).first()
     
     if not curriculum:
         raise HTTPException(status_code=404, detail="Curriculum not found")
     
-    # Generate PDF
-    pdf_content = export_service.export_lesson_plan_pdf(curriculum.metadata, format_type)
+    # Render in the export worker pool, then stream the finished file back
+    pdf_stream = await export_service.stream_export("lesson_plan", curriculum.content_data, "pdf", format_type)
     
     # Create filename
     filename = f"{curriculum.title.replace(' ', '_')}_lesson_plan.pdf"
     
     return StreamingResponse(
-        io.BytesIO(pdf_content),
+        pdf_stream,
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -133,20 +132,20 @@ async def export_curriculum_docx(
     
     curriculum = db.query(Curriculum).filter(
         Curriculum.id == curriculum_id,
-        Curriculum.user_id == current_user.id
+        Curriculum.created_by == current_user.id
     ).first()
     
     if not curriculum:
         raise HTTPException(status_code=404, detail="Curriculum not found")
     
-    # Generate DOCX
-    docx_content = export_service.export_lesson_plan_docx(curriculum.metadata)
+    # Render in the export worker pool, then stream the finished file back
+    docx_stream = await export_service.stream_export("lesson_plan", curriculum.content_data, "docx")
     
     # Create filename
     filename = f"{curriculum.title.replace(' ', '_')}_lesson_plan.docx"
     
     return StreamingResponse(
-        io.BytesIO(docx_content),
+        docx_stream,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -161,7 +160,7 @@ async def create_shareable_link(
     
     curriculum = db.query(Curriculum).filter(
         Curriculum.id == curriculum_id,
-        Curriculum.user_id == current_user.id
+        Curriculum.created_by == current_user.id
     ).first()
     
     if not curriculum:
@@ -203,14 +202,14 @@ async def export_project_rubric(
 ):
     """Export project rubric as PDF"""
     
-    # Generate rubric PDF
-    pdf_content = export_service.export_project_rubric(project_data)
+    # Render rubric PDF in the export worker pool
+    pdf_stream = await export_service.stream_export("project_rubric", project_data)
     
     # Create filename
     filename = f"{project_data.get('title', 'project').replace(' ', '_')}_rubric.pdf"
     
     return StreamingResponse(
-        io.BytesIO(pdf_content),
+        pdf_stream,
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
\ No newline at end of file
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.pagination import keyset_page, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
+from app.models.files import File as FileRecord
 from app.models.user import User
 from app.api.auth import get_current_user
 from app.services.s3_service import S3Service
@@ -107,13 +109,23 @@ async def upload_url(
 
 @router.get("/")
 async def get_files(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's uploaded files"""
+    """Get user's uploaded files, newest first; extracted_content is not loaded"""
+    query = db.query(
+        FileRecord.id, FileRecord.original_filename, FileRecord.file_size, FileRecord.content_type,
+        FileRecord.upload_status, FileRecord.created_at, FileRecord.processed_at
+    ).filter(FileRecord.user_id == current_user.id)
+    try:
+        rows, next_cursor = keyset_page(query, FileRecord.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "files": [],
-        "message": "File listing functionality available"
+        "files": [row._asdict() for row in rows],
+        "next_cursor": next_cursor
     }
 
 @router.get("/{file_id}")
@@ -1,16 +1,19 @@
 """
 Learning Paths API - AI-powered personalized learning paths
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import flag_modified
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import logging
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import keyset_page, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
 from app.core.auth import get_current_user
 from app.services.amazon_q_service import amazon_q_service
+from app.services import path_analytics
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -134,15 +137,23 @@ async def get_learning_paths(
     subject: Optional[str] = None,
     grade_level: Optional[str] = None,
     learning_style: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get learning paths with optional filters"""
+    """Get learning paths with optional filters, newest first"""
     
     try:
         from app.models.learning_path import LearningPath
         
-        query = db.query(LearningPath).filter(LearningPath.teacher_id == current_user.id)
+        # Only the list columns; ai_data and the other JSON stay deferred
+        query = db.query(LearningPath).options(load_only(
+            LearningPath.id, LearningPath.title, LearningPath.description, LearningPath.subject,
+            LearningPath.grade_level, LearningPath.learning_style, LearningPath.difficulty_level,
+            LearningPath.estimated_duration, LearningPath.progress_percentage, LearningPath.ai_generated,
+            LearningPath.created_at, LearningPath.updated_at
+        )).filter(LearningPath.teacher_id == current_user.id)
         
         if subject:
             query = query.filter(LearningPath.subject.ilike(f"%{subject}%"))
@@ -151,7 +162,10 @@ async def get_learning_paths(
         if learning_style:
             query = query.filter(LearningPath.learning_style.ilike(f"%{learning_style}%"))
         
-        learning_paths = query.all()
+        try:
+            learning_paths, next_cursor = keyset_page(query, LearningPath.id, cursor, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return {
             "success": True,
@@ -172,7 +186,8 @@ async def get_learning_paths(
                 }
                 for path in learning_paths
             ],
-            "total_count": len(learning_paths),
+            "count": len(learning_paths),
+            "next_cursor": next_cursor,
             "filters_applied": {
                 "subject": subject,
                 "grade_level": grade_level,
@@ -180,6 +195,8 @@ async def get_learning_paths(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get learning paths error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve learning paths: {str(e)}")
@@ -308,20 +325,31 @@ async def complete_milestone(
         
         # Update milestone completion
         milestones = learning_path.milestones or []
+        completed_milestone = None
         for milestone in milestones:
             if milestone.get('id') == request.milestone_id:
                 milestone['completed'] = True
-                milestone['completion_time'] = request.completion_time or datetime.utcnow()
+                milestone['completion_time'] = (request.completion_time or datetime.utcnow()).isoformat()
                 milestone['performance_score'] = request.performance_score
                 milestone['notes'] = request.notes
+                completed_milestone = milestone
                 break
         
         learning_path.milestones = milestones
         
+        # Fold the completion into the stored analytics
+        ai_data = dict(learning_path.ai_data or {})
+        stats = ai_data.get(path_analytics.ANALYTICS_KEY)
+        if stats is None or completed_milestone is None or \
+                path_analytics.record_completion(stats, completed_milestone, len(milestones)) is None:
+            stats = path_analytics.recompute(milestones)
+        ai_data[path_analytics.ANALYTICS_KEY] = stats
+        learning_path.ai_data = ai_data
+        flag_modified(learning_path, 'ai_data')  # stats were updated in place
+        
         # Calculate progress
-        completed_milestones = sum(1 for m in milestones if m.get('completed', False))
         total_milestones = len(milestones)
-        learning_path.progress_percentage = (completed_milestones / total_milestones * 100) if total_milestones > 0 else 0
+        learning_path.progress_percentage = (stats['completed'] / total_milestones * 100) if total_milestones > 0 else 0
         
         # Update current milestone
         next_milestone = next((m for m in milestones if not m.get('completed', False)), None)
@@ -443,21 +471,15 @@ async def get_learning_path_analytics(
         if not learning_path:
             raise HTTPException(status_code=404, detail="Learning path not found")
         
-        # Calculate analytics
-        milestones = learning_path.milestones or []
-        completed_milestones = [m for m in milestones if m.get('completed', False)]
-        
-        analytics = {
-            "completion_rate": len(completed_milestones) / len(milestones) * 100 if milestones else 0,
-            "average_performance": sum(m.get('performance_score', 0) for m in completed_milestones) / len(completed_milestones) if completed_milestones else 0,
-            "time_spent": sum(m.get('time_spent', 0) for m in completed_milestones),
-            "milestones_completed": len(completed_milestones),
-            "total_milestones": len(milestones),
-            "current_streak": self._calculate_streak(completed_milestones),
-            "difficulty_progression": self._analyze_difficulty_progression(completed_milestones),
-            "learning_velocity": self._calculate_learning_velocity(completed_milestones),
-            "adaptation_count": len(learning_path.ai_data.get('adaptations', [])) if learning_path.ai_data else 0
-        }
+        # Stored running totals; paths without them are computed here but not
+        # saved, so a read never overwrites a concurrent completion's totals.
+        # path_analytics.backfill stores them.
+        ai_data = learning_path.ai_data or {}
+        stats = ai_data.get(path_analytics.ANALYTICS_KEY)
+        if stats is None:
+            stats = path_analytics.recompute(learning_path.milestones or [])
+        
+        analytics = path_analytics.summarize(stats, len(ai_data.get('adaptations', [])))
         
         return {
             "success": True,
@@ -562,78 +584,3 @@ async def adapt_learning_path(path_id: int, performance_score: float, db: Sessio
         
     except Exception as e:
         logger.error(f"Failed to adapt learning path: {e}")
-
-def _calculate_streak(completed_milestones: List[Dict]) -> int:
-    """Calculate current completion streak"""
-    if not completed_milestones:
-        return 0
-    
-    # Sort by completion time
-    sorted_milestones = sorted(
-        completed_milestones,
-        key=lambda x: x.get('completion_time', datetime.min),
-        reverse=True
-    )
-    
-    streak = 0
-    for milestone in sorted_milestones:
-        if milestone.get('performance_score', 0) >= 0.7:  # Good performance threshold
-            streak += 1
-        else:
-            break
-    
-    return streak
-
-def _analyze_difficulty_progression(completed_milestones: List[Dict]) -> Dict[str, Any]:
-    """Analyze how difficulty has progressed"""
-    if not completed_milestones:
-        return {"trend": "no_data"}
-    
-    scores = [m.get('performance_score', 0) for m in completed_milestones]
-    
-    if len(scores) < 2:
-        return {"trend": "insufficient_data", "average_score": scores[0] if scores else 0}
-    
-    # Simple trend analysis
-    recent_avg = sum(scores[-3:]) / len(scores[-3:])  # Last 3 milestones
-    overall_avg = sum(scores) / len(scores)
-    
-    if recent_avg > overall_avg + 0.1:
-        trend = "improving"
-    elif recent_avg < overall_avg - 0.1:
-        trend = "declining"
-    else:
-        trend = "stable"
-    
-    return {
-        "trend": trend,
-        "recent_average": recent_avg,
-        "overall_average": overall_avg,
-        "score_variance": max(scores) - min(scores)
-    }
-
-def _calculate_learning_velocity(completed_milestones: List[Dict]) -> float:
-    """Calculate learning velocity (milestones per week)"""
-    if len(completed_milestones) < 2:
-        return 0.0
-    
-    # Sort by completion time
-    sorted_milestones = sorted(
-        completed_milestones,
-        key=lambda x: x.get('completion_time', datetime.min)
-    )
-    
-    first_completion = sorted_milestones[0].get('completion_time')
-    last_completion = sorted_milestones[-1].get('completion_time')
-    
-    if not first_completion or not last_completion:
-        return 0.0
-    
-    # Calculate weeks between first and last completion
-    time_diff = last_completion - first_completion
-    weeks = time_diff.days / 7.0
-    
-    if weeks == 0:
-        return len(completed_milestones)  # All completed in same week
-    
-    return len(completed_milestones) / weeks
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import get_db
+from app.models.user import User
+from app.api.auth import get_current_user
+from app.services import search_service
+
+router = APIRouter()
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[str]] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=search_service.MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search over the teacher's curricula, modules, files and learning paths"""
+    try:
+        return search_service.search(db, current_user.id, q, types, page, page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -28,6 +28,9 @@ async def get_task_status(
             'progress': task_result.info.get('progress', 0),
             'status': task_result.info.get('status', 'Processing...')
         }
+        if 'total' in task_result.info:
+            response['processed'] = task_result.info.get('processed', 0)
+            response['total'] = task_result.info['total']
     elif task_result.state == 'SUCCESS':
         response = {
             'task_id': task_id,
@@ -0,0 +1,88 @@
+"""
+asyncio execution for I/O-bound Celery tasks
+Tasks written as ``async def`` with ``base=AsyncTask`` run on one event loop
+per worker process, kept on a background thread. Pool threads hand their
+coroutine to the loop and wait for it, so a worker on the threads pool has
+as many AI calls in flight as it has pool threads, up to a per-process
+limit. Only the AI calls are awaited on the loop: database sessions, service
+construction and progress writes to the result backend block, so tasks run
+them through asyncio.to_thread (update_state_async for progress).
+"""
+import asyncio
+import contextvars
+import inspect
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Optional
+from celery import Task
+
+MAX_IN_FLIGHT = int(os.getenv("ASYNC_TASK_MAX_IN_FLIGHT", 100))
+
+# Celery's request stack is thread-local; coroutines on the loop thread find
+# their own task id here instead
+_task_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("async_task_id", default=None)
+
+class AsyncRuntime:
+    """An event loop on a daemon thread, shared by every async task in the process"""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.loop = asyncio.new_event_loop()
+        # Blocking SDK calls offloaded with to_thread must not queue behind a small default pool
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="async-task-io")
+        )
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-task-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine, task_id: Optional[str] = None,
+               timeout: Optional[float] = None) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._guarded(coroutine, task_id, timeout), self.loop)
+
+    def run(self, coroutine: Coroutine, task_id: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+        """Run ``coroutine`` on the loop and block the calling thread for its result"""
+        return self.submit(coroutine, task_id, timeout).result()
+
+    async def _guarded(self, coroutine: Coroutine, task_id: Optional[str], timeout: Optional[float]) -> Any:
+        _task_id.set(task_id)
+        async with self._slots:
+            # The threads pool can't enforce Celery time limits, so the loop does
+            return await asyncio.wait_for(coroutine, timeout)
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+_runtime: Optional[AsyncRuntime] = None
+_runtime_pid: Optional[int] = None
+_runtime_lock = threading.Lock()
+
+def get_runtime() -> AsyncRuntime:
+    """This process's runtime; started lazily, and again in forked children"""
+    global _runtime, _runtime_pid
+    with _runtime_lock:
+        if _runtime is None or _runtime_pid != os.getpid():
+            _runtime = AsyncRuntime()
+            _runtime_pid = os.getpid()
+        return _runtime
+
+class AsyncTask(Task):
+    """Base for ``async def`` tasks; the coroutine runs on the process's event loop"""
+
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        if not inspect.iscoroutine(result):
+            return result
+        timeout = self.soft_time_limit or self.app.conf.task_soft_time_limit
+        return get_runtime().run(result, self.request.id, timeout)
+
+    def update_state(self, task_id=None, state=None, meta=None, **kwargs):
+        super().update_state(task_id or _task_id.get(), state, meta, **kwargs)
+
+    async def update_state_async(self, state=None, meta=None, **kwargs):
+        """update_state from a coroutine; the result backend write runs off the loop"""
+        # to_thread copies the context, so the task id travels with it
+        await asyncio.to_thread(self.update_state, state=state, meta=meta, **kwargs)
@@ -1,12 +1,61 @@
 from celery import Celery
+from celery.schedules import crontab
+from kombu import Queue
 import os
 
+# Queues by workload; each runs on its own worker with a suitable pool
+QUEUE_INTERACTIVE = "interactive"  # short tasks a user is waiting on
+QUEUE_LLM_IO = "llm-io"  # slow, network-bound AI calls
+QUEUE_CPU = "cpu"  # extraction, rendering
+QUEUE_DB_BULK = "db-bulk"  # batch jobs over many rows
+
+# Redis transport: 0 is consumed first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+TASK_ROUTES = {
+    "app.tasks.content_tasks.extract_job": {"queue": QUEUE_CPU},
+    "app.tasks.content_tasks.process_url_content": {"queue": QUEUE_LLM_IO},
+    "app.tasks.curriculum_tasks.curriculum_generation": {"queue": QUEUE_LLM_IO},
+    "app.tasks.curriculum_tasks.generate_learning_path": {"queue": QUEUE_LLM_IO},
+    "app.tasks.assessment_tasks.assessment_generation": {"queue": QUEUE_LLM_IO},
+    # A student is waiting on a single grade; batch fan-out lowers its own priority
+    "app.tasks.assessment_tasks.grading": {"queue": QUEUE_LLM_IO, "priority": PRIORITY_HIGH},
+    "app.tasks.assessment_tasks.batch_grade_assessments": {"queue": QUEUE_DB_BULK},
+    "app.tasks.export_tasks.export_class_reports": {"queue": QUEUE_DB_BULK},
+    "app.tasks.learning_path.generate_learning_path": {"queue": QUEUE_LLM_IO},
+    "app.tasks.student_tasks.generate_learning_path": {"queue": QUEUE_LLM_IO},
+    "app.tasks.student_tasks.generate_student_quiz": {"queue": QUEUE_LLM_IO, "priority": PRIORITY_HIGH},
+    "app.tasks.student_tasks.generate_weekly_plan": {"queue": QUEUE_INTERACTIVE},
+    "app.tasks.student_tasks.generate_daily_tasks": {"queue": QUEUE_INTERACTIVE},
+    "app.tasks.student_tasks.analyze_student_progress": {"queue": QUEUE_INTERACTIVE},
+    "app.tasks.progress_tasks.analyze_all_student_progress": {"queue": QUEUE_DB_BULK, "priority": PRIORITY_LOW},
+    "app.tasks.progress_tasks.backfill_path_analytics": {"queue": QUEUE_DB_BULK, "priority": PRIORITY_LOW},
+}
+
+def _concurrency(queue: str, default: int) -> int:
+    return int(os.getenv(f"CELERY_{queue.upper().replace('-', '_')}_CONCURRENCY", default))
+
+# Pool and concurrency per queue: threads for I/O waits, processes for CPU.
+# llm-io threads mostly wait on app.core.async_tasks' event loop, which
+# caps in-flight AI calls per process at ASYNC_TASK_MAX_IN_FLIGHT
+WORKER_PROFILES = {
+    QUEUE_INTERACTIVE: {"pool": "prefork", "concurrency": _concurrency(QUEUE_INTERACTIVE, 4)},
+    QUEUE_LLM_IO: {"pool": "threads", "concurrency": _concurrency(QUEUE_LLM_IO, 100)},
+    QUEUE_CPU: {"pool": "prefork", "concurrency": _concurrency(QUEUE_CPU, os.cpu_count() or 2)},
+    QUEUE_DB_BULK: {"pool": "prefork", "concurrency": _concurrency(QUEUE_DB_BULK, 2)},
+}
+
 # Create Celery instance
 celery_app = Celery(
     "edweave_pack",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    include=["app.tasks.content_tasks", "app.tasks.curriculum_tasks", "app.tasks.assessment_tasks"]
+    include=[
+        "app.tasks.content_tasks", "app.tasks.curriculum_tasks", "app.tasks.assessment_tasks",
+        "app.tasks.export_tasks", "app.tasks.progress_tasks"
+    ]
 )
 
 # Celery configuration
@@ -21,4 +70,30 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
-)
\ No newline at end of file
+    task_queues=[Queue(name) for name in WORKER_PROFILES],
+    task_default_queue=QUEUE_CPU,
+    task_routes=TASK_ROUTES,
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={
+        "priority_steps": list(range(PRIORITY_HIGH, PRIORITY_LOW + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    # Run `celery -A app.core.celery_app beat` alongside the workers
+    beat_schedule={
+        "nightly-student-progress": {
+            "task": "app.tasks.progress_tasks.analyze_all_student_progress",
+            "schedule": crontab(hour=2, minute=0),
+        },
+    },
+)
+
+def worker_argv(queue: str) -> list:
+    """Command line for a worker consuming only ``queue`` with its profile"""
+    if queue not in WORKER_PROFILES:
+        raise ValueError(f"Unknown queue: {queue}")
+    profile = WORKER_PROFILES[queue]
+    return [
+        "worker", "--loglevel=info", f"--queues={queue}", f"--hostname={queue}@%h",
+        f"--pool={profile['pool']}", f"--concurrency={profile['concurrency']}"
+    ]
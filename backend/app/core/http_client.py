@@ -0,0 +1,189 @@
+"""
+Shared async HTTP clients for outbound calls (SSO providers, agent backends)
+One pooled keep-alive client per (profile, host), opened at startup and closed at shutdown
+"""
+import asyncio
+import logging
+import os
+import weakref
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection and retry policy per outbound profile
+HTTP_CLIENT_PROFILES = {
+    "default": {
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 30.0,
+        "connect_timeout": 5.0,
+        "read_timeout": 30.0,
+        "retries": 2,
+        "backoff_seconds": 0.25
+    },
+    "sso": {
+        "max_connections": 50,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 60.0,
+        "connect_timeout": 5.0,
+        "read_timeout": 10.0,
+        "retries": 2,
+        "backoff_seconds": 0.2
+    },
+    "agents": {
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 60.0,
+        "connect_timeout": 5.0,
+        "read_timeout": float(os.getenv("AGENT_HTTP_READ_TIMEOUT", "120")),
+        "retries": 1,
+        "backoff_seconds": 0.5
+    }
+}
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Raised before any bytes of the request reach the server
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled httpx clients with reuse metrics"""
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]] = None):
+        self.profiles = profiles or HTTP_CLIENT_PROFILES
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._seen_streams: Dict[Tuple[str, str], "weakref.WeakSet"] = {}
+        self._metrics: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.started = False
+
+    async def start(self):
+        """Mark the registry open; clients are created lazily per host"""
+        self.started = True
+        logger.info(f"HTTP client registry started (http2={'on' if HTTP2_AVAILABLE else 'off'})")
+
+    async def aclose(self):
+        """Close every pooled client"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._seen_streams.clear()
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+        self.started = False
+        logger.info(f"HTTP client registry closed {len(clients)} client(s)")
+
+    def client(self, url: str, profile: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for the host of ``url`` under ``profile``"""
+        key = (profile, self._origin(url))
+        client = self._clients.get(key)
+
+        if client is None or client.is_closed:
+            client = self._build_client(key)
+            self._clients[key] = client
+            self._seen_streams[key] = weakref.WeakSet()
+            self._metrics.setdefault(key, {
+                "requests": 0,
+                "new_connections": 0,
+                "reused_connections": 0,
+                "retries": 0,
+                "errors": 0
+            })
+
+        return client
+
+    async def request(self, method: str, url: str, profile: str = "default", **kwargs) -> httpx.Response:
+        """Send a request on the shared client, retrying transient failures
+
+        Idempotent methods are retried on any transport error and on retryable
+        status codes. Other methods (POST, PATCH) are retried only when the
+        connection could not be opened, since otherwise the server may
+        already have acted on the request.
+        """
+        settings = self.profiles.get(profile, self.profiles["default"])
+        client = self.client(url, profile)
+        key = (profile, self._origin(url))
+        metrics = self._metrics[key]
+        attempts = settings["retries"] + 1
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                metrics["errors"] += 1
+                if last_attempt or not (idempotent or isinstance(e, UNSENT_ERRORS)):
+                    raise
+            else:
+                self._record_connection(key, response)
+                if response.status_code in RETRYABLE_STATUS_CODES and idempotent and not last_attempt:
+                    await response.aclose()
+                else:
+                    return response
+
+            metrics["retries"] += 1
+            await asyncio.sleep(settings["backoff_seconds"] * (2 ** attempt))
+
+    async def get(self, url: str, profile: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("GET", url, profile=profile, **kwargs)
+
+    async def post(self, url: str, profile: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("POST", url, profile=profile, **kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection reuse statistics per profile and host"""
+        report = {}
+        for (profile, origin), counters in self._metrics.items():
+            requests = counters["requests"]
+            report[f"{profile}:{origin}"] = {
+                **counters,
+                "reuse_ratio": round(counters["reused_connections"] / requests, 3) if requests else 0.0,
+                "open": (profile, origin) in self._clients
+            }
+        return {"http2": HTTP2_AVAILABLE, "started": self.started, "clients": report}
+
+    def _build_client(self, key: Tuple[str, str]) -> httpx.AsyncClient:
+        profile, origin = key
+        settings = self.profiles.get(profile, self.profiles["default"])
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings["read_timeout"], connect=settings["connect_timeout"]),
+            # Retries happen in request() only, so connect failures aren't retried twice
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive_connections"],
+                    keepalive_expiry=settings["keepalive_expiry"]
+                )
+            )
+        )
+
+    def _record_connection(self, key: Tuple[str, str], response: httpx.Response):
+        metrics = self._metrics[key]
+        metrics["requests"] += 1
+
+        stream = response.extensions.get("network_stream")
+        seen = self._seen_streams.get(key)
+        if stream is None or seen is None:
+            return
+
+        if stream in seen:
+            metrics["reused_connections"] += 1
+        else:
+            seen.add(stream)
+            metrics["new_connections"] += 1
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+
+# Global registry instance
+http_clients = HTTPClientRegistry()
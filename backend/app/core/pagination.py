@@ -0,0 +1,56 @@
+"""
+Keyset (cursor) pagination for list endpoints
+Pages are ordered newest first by primary key and continue strictly after the
+last id seen, so fetching page N costs the same as page 1 and rows inserted
+meanwhile never shift or repeat entries. Cursors are opaque to clients.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Last id of the previous page, or None; ValueError if the cursor is malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise ValueError("Invalid cursor")
+    return after
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+def keyset_page(query, id_column, cursor: Optional[str] = None,
+                limit: Optional[int] = None) -> Tuple[List[Any], Optional[str]]:
+    """One page of ``query`` ordered by ``id_column`` descending, plus the next cursor
+
+    ``query`` should already be filtered and projected. One extra row is
+    fetched to tell whether another page exists.
+    """
+    limit = clamp_page_size(limit)
+    after = decode_cursor(cursor)
+    if after is not None:
+        query = query.filter(id_column < after)
+    rows = query.order_by(id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(_row_id(rows[-1], id_column))
+
+def _row_id(row: Any, id_column) -> int:
+    key = id_column.key
+    if hasattr(row, "_mapping") and key in row._mapping:
+        return row._mapping[key]
+    return getattr(row, key)
@@ -0,0 +1,32 @@
+"""
+Shared Redis connection pools (asyncio and blocking)
+"""
+import os
+from typing import Optional
+import redis.asyncio as redis
+from redis import Redis
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client: Optional[redis.Redis] = None
+_sync_client: Optional[Redis] = None
+
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client; connections are pooled and opened lazily"""
+    global _client
+    if _client is None:
+        _client = redis.from_url(REDIS_URL, decode_responses=True, health_check_interval=30)
+    return _client
+
+def get_sync_redis() -> Redis:
+    """Blocking client for Celery tasks and other synchronous callers"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = Redis.from_url(REDIS_URL, decode_responses=True, health_check_interval=30)
+    return _sync_client
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1 +1,5 @@
-# Models package initialization
\ No newline at end of file
+# Models package initialization
+# Every model module is imported so Base.metadata is complete (Alembic, create_all)
+# and search indexing on write is registered
+from app.core.database import Base
+from app.models import user, curriculum, student, files, ai_models, search  # noqa: F401
@@ -121,4 +121,22 @@ class AIFeedback(Base):
     ai_model_used = Column(String)
     confidence_score = Column(Float)
     human_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PipelineRun(Base):
+    """Persisted state of an agent pipeline run for checkpoint/resume"""
+    __tablename__ = "pipeline_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pipeline_id = Column(String, unique=True, index=True, nullable=False)
+    teacher_id = Column(Integer, ForeignKey("users.id"))
+    s3_key = Column(String)
+    generation_schema = Column(JSON)
+    status = Column(String, default="pending")  # pending, running, completed, partial, failed
+    current_stage = Column(String, nullable=True)  # ingest, curriculum, assessments
+    stages = Column(JSON)  # Per-stage status, output and error
+    final_outputs = Column(JSON, nullable=True)
+    errors = Column(JSON)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
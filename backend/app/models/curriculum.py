@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Curriculum(Base):
     __tablename__ = "curricula"
+    __table_args__ = (
+        # Teacher's curricula, newest first (keyset pages)
+        Index("ix_curricula_created_by_id", "created_by", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -21,6 +25,7 @@ class Curriculum(Base):
 
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (Index("ix_assessments_curriculum_id", "curriculum_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -30,4 +35,18 @@ class Assessment(Base):
     time_limit = Column(Integer)
     ai_generated = Column(Boolean, default=True)
     created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Question(Base):
+    __tablename__ = "questions"
+    __table_args__ = (Index("ix_questions_assessment_id_id", "assessment_id", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    question_text = Column(Text, nullable=False)
+    question_type = Column(String, nullable=False)
+    options = Column(JSON)
+    correct_answer = Column(Text)
+    points = Column(Integer, default=10)
+    explanation = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, BigInteger, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (Index("ix_files_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
@@ -19,10 +20,11 @@ class File(Base):
     processed_at = Column(DateTime(timezone=True))
     
     # Relationships
-    user = relationship("User", back_populates="files")
+    user = relationship("User")
 
 class Module(Base):
     __tablename__ = "modules"
+    __table_args__ = (Index("ix_modules_curriculum_id_week", "curriculum_id", "week_number", "sequence_order"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -38,7 +40,7 @@ class Module(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    curriculum = relationship("Curriculum", back_populates="modules")
+    curriculum = relationship("Curriculum")
 
 class StudentResponse(Base):
     __tablename__ = "student_responses"
@@ -0,0 +1,154 @@
+import json
+from typing import Iterator, Optional, Tuple
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, DDL, UniqueConstraint, event, inspect, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SearchDocument(Base):
+    """Denormalized search text for one curriculum, module, file or learning path
+
+    The full-text index lives outside the mapped columns: a generated
+    tsvector column with a GIN index on PostgreSQL, an FTS5 table kept in
+    sync by triggers on SQLite.
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),)
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String, nullable=False)  # curriculum, module, file, learning_path
+    entity_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    "ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED",
+    # Owner first so teacher-scoped queries read one index
+    "CREATE INDEX ix_search_documents_owner_vector ON search_documents USING gin (owner_id, search_vector)"
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    SearchDocument.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite")
+)
+
+# Indexed tables: (entity type, columns whose change triggers a reindex)
+INDEXED_TABLES = {
+    "curricula": ("curriculum", ("title", "subject", "grade_level", "description", "content_data", "created_by")),
+    "modules": ("module", ("title", "description", "content_data", "activities", "resources", "curriculum_id")),
+    "files": ("file", ("original_filename", "extracted_content", "user_id")),
+    "learning_paths": ("learning_path", ("path_data", "curriculum_id"))
+}
+
+MAX_BODY_CHARS = 500_000  # well below the 1 MB tsvector limit
+
+def flatten_text(value) -> Iterator[str]:
+    """String leaves of a JSON value; JSON held in text columns is parsed first"""
+    if isinstance(value, str):
+        stripped = value.lstrip()
+        if stripped[:1] in ("{", "["):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                yield value
+                return
+        else:
+            if stripped:
+                yield value
+            return
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if item:
+                yield item
+        elif isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+def _join(*values) -> str:
+    return "\n".join(part for value in values if value is not None for part in flatten_text(value))[:MAX_BODY_CHARS]
+
+def _curriculum_owner(connection, curriculum_id) -> Optional[int]:
+    if curriculum_id is None:
+        return None
+    return connection.execute(
+        text("SELECT created_by FROM curricula WHERE id = :id"), {"id": curriculum_id}
+    ).scalar()
+
+def search_fields(connection, entity_type: str, target) -> Tuple[Optional[int], str, str]:
+    """(owner_id, title, body) for an indexed row"""
+    if entity_type == "curriculum":
+        return target.created_by, target.title or "", _join(
+            target.subject, target.grade_level, target.description, target.content_data
+        )
+    if entity_type == "module":
+        return _curriculum_owner(connection, target.curriculum_id), target.title or "", _join(
+            target.description, target.content_data, target.activities, target.resources
+        )
+    if entity_type == "file":
+        return target.user_id, target.original_filename or "", _join(target.extracted_content)
+    path_data = target.path_data or {}
+    title = path_data.get("title") if isinstance(path_data, dict) else None
+    return _curriculum_owner(connection, target.curriculum_id), title or f"Learning path {target.id}", _join(path_data)
+
+def upsert_search_document(connection, entity_type: str, target):
+    owner_id, title, body = search_fields(connection, entity_type, target)
+    table = SearchDocument.__table__
+    values = {"owner_id": owner_id, "title": title, "body": body, "updated_at": func.now()}
+    updated = connection.execute(
+        table.update().where(table.c.entity_type == entity_type, table.c.entity_id == target.id).values(**values)
+    )
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(entity_type=entity_type, entity_id=target.id, **values))
+
+def _indexed(target) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    return INDEXED_TABLES.get(getattr(target, "__tablename__", None))
+
+@event.listens_for(Base, "after_insert", propagate=True)
+def _index_after_insert(mapper, connection, target):
+    indexed = _indexed(target)
+    if indexed:
+        upsert_search_document(connection, indexed[0], target)
+
+@event.listens_for(Base, "after_update", propagate=True)
+def _index_after_update(mapper, connection, target):
+    indexed = _indexed(target)
+    if not indexed:
+        return
+    state = inspect(target)
+    # Progress updates and the like don't touch the index
+    if any(state.attrs[column].history.has_changes() for column in indexed[1]):
+        upsert_search_document(connection, indexed[0], target)
+
+@event.listens_for(Base, "after_delete", propagate=True)
+def _unindex_after_delete(mapper, connection, target):
+    indexed = _indexed(target)
+    if indexed:
+        table = SearchDocument.__table__
+        connection.execute(table.delete().where(
+            table.c.entity_type == indexed[0], table.c.entity_id == target.id
+        ))
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (Index("ix_students_created_by", "created_by"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -17,6 +18,10 @@ class Student(Base):
 
 class LearningPath(Base):
     __tablename__ = "learning_paths"
+    __table_args__ = (
+        Index("ix_learning_paths_student_id", "student_id"),
+        Index("ix_learning_paths_curriculum_id", "curriculum_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
@@ -25,4 +30,40 @@ class LearningPath(Base):
     progress_percentage = Column(Float, default=0.0)
     ai_personalized = Column(String, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class AssessmentAttempt(Base):
+    __tablename__ = "assessment_attempts"
+    __table_args__ = (
+        # Graded attempts of an assessment in id order (reports, exports)
+        Index(
+            "ix_assessment_attempts_graded", "assessment_id", "id",
+            postgresql_where=text("total_score IS NOT NULL"),
+            sqlite_where=text("total_score IS NOT NULL")
+        ),
+        Index("ix_assessment_attempts_student_id", "student_id", "submitted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    answers = Column(JSON)
+    total_score = Column(Float, nullable=True)  # None until graded
+    max_score = Column(Float, nullable=True)
+    feedback = Column(JSON)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    submitted_at = Column(DateTime(timezone=True), nullable=True)
+
+class ProgressSnapshot(Base):
+    __tablename__ = "progress_snapshots"
+    __table_args__ = (Index("ix_progress_snapshots_student_id", "student_id", "created_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    overall_progress = Column(Float, default=0.0)  # mean learning path progress
+    tasks_completed = Column(Integer, default=0)  # submitted attempts
+    quizzes_taken = Column(Integer, default=0)  # graded attempts
+    average_score = Column(Float, nullable=True)  # percent, None without graded attempts
+    study_streak = Column(Integer, default=0)
+    recommendations = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
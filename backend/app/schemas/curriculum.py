@@ -20,6 +20,10 @@ class CurriculumResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CurriculumPage(BaseModel):
+    curricula: List[CurriculumResponse]
+    next_cursor: Optional[str] = None
+
 class LearningPathResponse(BaseModel):
     id: int
     title: str
@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import os
 from datetime import datetime, timedelta
 import random
@@ -25,6 +25,18 @@ class AIService:
         else:
             logger.info("AI Service using enhanced fallback implementations")
     
+    @property
+    def text_model_id(self) -> str:
+        return self.amazon_q.text_model_id
+    
+    async def generate_content(self, prompt: str, max_tokens: int = 4000) -> str:
+        """Free-form text completion used by the agents"""
+        return await self.amazon_q._call_bedrock_claude(prompt, max_tokens=max_tokens)
+    
+    async def generate_content_with_model(self, prompt: str, max_tokens: int = 4000) -> Tuple[str, str]:
+        """Like generate_content, also returning the id of the model that answered"""
+        return await self.amazon_q.complete_with_model(prompt, max_tokens=max_tokens)
+    
     async def generate_curriculum(self, content: str, subject: str, grade_level: str, learning_objectives: List[str] = None) -> Dict[str, Any]:
         """Generate 4-week modular curriculum aligned with Bloom's taxonomy using Amazon Q Developer"""
         
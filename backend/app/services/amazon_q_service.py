@@ -5,7 +5,8 @@ Provides AI-powered content generation, curriculum creation, and assessment tool
 import boto3
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import os
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
@@ -15,9 +16,13 @@ from langchain.embeddings import OpenAIEmbeddings
 from langchain.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 from langchain.llms import OpenAI
+from app.services import readability
 
 logger = logging.getLogger(__name__)
 
+TEXT_MODEL_ID = os.getenv("BEDROCK_TEXT_MODEL_ID", "anthropic.claude-v2")
+FALLBACK_MODEL_ID = "local-fallback"
+
 class AmazonQService:
     """Enhanced Amazon Q Developer service with comprehensive AI capabilities"""
     
@@ -26,6 +31,9 @@ class AmazonQService:
         self.comprehend_client = boto3.client('comprehend', region_name='us-east-1')
         self.textract_client = boto3.client('textract', region_name='us-east-1')
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self.text_model_id = TEXT_MODEL_ID
+        # Clients are created lazily by boto3; failed calls fall back to local templates
+        self.q_available = True
         
         # Initialize embeddings for content analysis
         self.embeddings = OpenAIEmbeddings() if openai.api_key else None
@@ -293,29 +301,36 @@ class AmazonQService:
                 'fallback_feedback': self._generate_fallback_feedback(student_answer, correct_answer)
             }
     
-    async def _call_bedrock_claude(self, prompt: str) -> str:
+    async def _call_bedrock_claude(self, prompt: str, max_tokens: int = 4000) -> str:
         """Call Amazon Bedrock Claude model"""
+        completion, _ = await self.complete_with_model(prompt, max_tokens)
+        return completion
+    
+    async def complete_with_model(self, prompt: str, max_tokens: int = 4000) -> Tuple[str, str]:
+        """Text completion and the id of the model that produced it"""
         
         body = {
             "prompt": f"\\n\\nHuman: {prompt}\\n\\nAssistant:",
-            "max_tokens_to_sample": 4000,
+            "max_tokens_to_sample": max_tokens,
             "temperature": 0.7,
             "top_p": 0.9
         }
         
         try:
-            response = self.bedrock_client.invoke_model(
-                modelId="anthropic.claude-v2",
+            # boto3 blocks; run it off the event loop so concurrent calls overlap
+            response = await asyncio.to_thread(
+                self.bedrock_client.invoke_model,
+                modelId=self.text_model_id,
                 body=json.dumps(body)
             )
             
             response_body = json.loads(response['body'].read())
-            return response_body['completion']
+            return response_body['completion'], self.text_model_id
             
         except Exception as e:
             logger.error(f"Bedrock Claude call failed: {e}")
             # Fallback to simulated response
-            return self._generate_fallback_response(prompt)
+            return self._generate_fallback_response(prompt), FALLBACK_MODEL_ID
     
     def _parse_curriculum_response(self, response: str) -> Dict[str, Any]:
         """Parse curriculum response from AI"""
@@ -385,49 +400,7 @@ class AmazonQService:
     
     def _calculate_readability(self, text: str) -> Dict[str, float]:
         """Calculate readability metrics"""
-        import re
-        
-        # Simple readability calculation
-        sentences = len(re.findall(r'[.!?]+', text))
-        words = len(text.split())
-        syllables = sum([self._count_syllables(word) for word in text.split()])
-        
-        if sentences == 0 or words == 0:
-            return {'flesch_score': 0, 'grade_level': 12}
-        
-        # Flesch Reading Ease
-        flesch_score = 206.835 - (1.015 * (words / sentences)) - (84.6 * (syllables / words))
-        
-        # Approximate grade level
-        grade_level = max(1, min(12, int((words / sentences) + (syllables / words) - 15)))
-        
-        return {
-            'flesch_score': round(flesch_score, 2),
-            'grade_level': grade_level,
-            'words': words,
-            'sentences': sentences,
-            'syllables': syllables
-        }
-    
-    def _count_syllables(self, word: str) -> int:
-        """Count syllables in a word"""
-        import re
-        word = word.lower()
-        vowels = 'aeiouy'
-        syllable_count = 0
-        previous_was_vowel = False
-        
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                syllable_count += 1
-            previous_was_vowel = is_vowel
-        
-        # Handle silent e
-        if word.endswith('e'):
-            syllable_count -= 1
-        
-        return max(1, syllable_count)
+        return readability.analyze(text)
     
     def _extract_modules_from_text(self, text: str) -> List[Dict]:
         """Extract module information from text"""
@@ -0,0 +1,285 @@
+"""
+Bulk assessment report export
+Graded attempts are read from the database in keyset batches and rendered,
+one PDF per student, in the export render pool. The reports, a class summary
+and a results CSV go into a single ZIP that is streamed to S3 with a multipart
+upload. Memory stays flat regardless of class size: only one batch of rows
+and rendered reports is held at a time.
+"""
+import csv
+import io
+import logging
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Optional, Callable, Iterator
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.curriculum import Assessment, Question
+from app.models.student import Student, AssessmentAttempt
+from app.services.document_renderer import render_pdf
+from app.services.export_service import get_render_pool, EXPORT_BUCKET
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+PART_SIZE = 8 * 1024 * 1024  # S3 parts must be at least 5 MB, except the last
+
+GRADE_BANDS = [(90, "A"), (80, "B"), (70, "C"), (60, "D"), (0, "F")]
+CSV_COLUMNS = ["student_id", "student_name", "email", "score", "max_score", "percentage", "grade", "submitted_at"]
+
+def letter_grade(percentage: float) -> str:
+    return next(grade for floor, grade in GRADE_BANDS if percentage >= floor)
+
+class S3MultipartWriter(io.RawIOBase):
+    """Write-only stream that uploads to S3 in parts as data arrives"""
+
+    def __init__(self, s3_client, bucket: str, key: str, content_type: str = "application/zip",
+                 part_size: int = PART_SIZE):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._parts: List[Dict[str, Any]] = []
+        self._position = 0
+        self._upload_id = s3_client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes):
+        number = len(self._parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=number, Body=body
+        )
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def close(self):
+        if self.closed:
+            return
+        if self._upload_id:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts}
+            )
+        super().close()
+
+    def abort(self):
+        if self._upload_id:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            self._upload_id = None
+        super().close()
+
+class ReportStats:
+    """Running class summary; constant memory"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.highest: Optional[float] = None
+        self.lowest: Optional[float] = None
+        self.grades = {grade: 0 for _, grade in GRADE_BANDS}
+
+    def add(self, percentage: float, grade: str):
+        self.count += 1
+        self.total += percentage
+        self.highest = percentage if self.highest is None else max(self.highest, percentage)
+        self.lowest = percentage if self.lowest is None else min(self.lowest, percentage)
+        self.grades[grade] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {"students": self.count}
+        if self.count:
+            summary.update({
+                "average_percentage": round(self.total / self.count, 1),
+                "highest_percentage": self.highest,
+                "lowest_percentage": self.lowest
+            })
+        summary.update({f"{grade} grades": n for grade, n in self.grades.items()})
+        return summary
+
+def iter_attempt_batches(db: Session, assessment_id: int, batch_size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Graded attempts with their student, in id order, one keyset page at a time"""
+    last_id = 0
+    while True:
+        rows = db.query(
+            AssessmentAttempt.id,
+            AssessmentAttempt.student_id,
+            Student.name.label("student_name"),
+            Student.email,
+            AssessmentAttempt.total_score,
+            AssessmentAttempt.max_score,
+            AssessmentAttempt.answers,
+            AssessmentAttempt.feedback,
+            AssessmentAttempt.submitted_at
+        ).join(Student, Student.id == AssessmentAttempt.student_id).filter(
+            AssessmentAttempt.assessment_id == assessment_id,
+            AssessmentAttempt.total_score.isnot(None),
+            AssessmentAttempt.id > last_id
+        ).order_by(AssessmentAttempt.id).limit(batch_size).all()
+
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [row._asdict() for row in rows]
+
+def render_student_report(data: Dict[str, Any]) -> bytes:
+    """Render one student's PDF; runs inside the render pool"""
+    return b"".join(render_pdf("student_report", data, title=data["student_name"]))
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_")[:60] or "student"
+
+class ClassReportExport:
+    """Export every graded attempt of an assessment into one ZIP on S3"""
+
+    def __init__(self, db: Session, s3_client=None, bucket: str = EXPORT_BUCKET,
+                 render_pool: Optional[Executor] = None, batch_size: int = BATCH_SIZE,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.db = db
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.render_pool = render_pool
+        self.batch_size = batch_size
+        self.progress = progress or (lambda processed, total: None)
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client("s3")
+        return self._s3_client
+
+    def run(self, assessment_id: int, key: str) -> Dict[str, Any]:
+        assessment = self.db.query(Assessment.id, Assessment.title).filter(Assessment.id == assessment_id).first()
+        if not assessment:
+            raise ValueError(f"Assessment {assessment_id} not found")
+
+        questions = {
+            str(q.id): {"text": q.question_text, "points": q.points}
+            for q in self.db.query(Question.id, Question.question_text, Question.points)
+            .filter(Question.assessment_id == assessment_id).order_by(Question.id)
+        }
+        total = self.db.query(func.count(AssessmentAttempt.id)).filter(
+            AssessmentAttempt.assessment_id == assessment_id,
+            AssessmentAttempt.total_score.isnot(None)
+        ).scalar()
+
+        pool = self.render_pool or get_render_pool()
+        stats = ReportStats()
+        processed = 0
+        started = time.perf_counter()
+        writer = S3MultipartWriter(self.s3_client, self.bucket, key)
+
+        try:
+            with tempfile.TemporaryFile("w+", newline="", encoding="utf-8") as results_csv:
+                results = csv.DictWriter(results_csv, fieldnames=CSV_COLUMNS)
+                results.writeheader()
+
+                with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                    for batch in iter_attempt_batches(self.db, assessment_id, self.batch_size):
+                        reports = [self._student_report(assessment.title, row, questions) for row in batch]
+                        # PDF streams are already compressed; store them as-is
+                        for report, pdf in zip(reports, pool.map(render_student_report, reports)):
+                            archive.writestr(report["filename"], pdf, compress_type=zipfile.ZIP_STORED)
+                            stats.add(report["percentage"], report["grade"])
+                            results.writerow(report["row"])
+
+                        processed += len(batch)
+                        self.progress(processed, total)
+
+                    self._write_summary(archive, assessment.title, stats, results_csv)
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+        return {
+            "assessment_id": assessment_id,
+            "bucket": self.bucket,
+            "key": key,
+            "reports": processed,
+            "size_bytes": writer.tell(),
+            "summary": stats.summary(),
+            "duration_seconds": round(time.perf_counter() - started, 2)
+        }
+
+    def _student_report(self, title: str, row: Dict[str, Any], questions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        max_score = row["max_score"] or sum(q["points"] or 0 for q in questions.values()) or 1
+        percentage = round(row["total_score"] / max_score * 100, 1)
+        grade = letter_grade(percentage)
+        answers, feedback = row["answers"] or {}, row["feedback"] or {}
+        submitted = row["submitted_at"].isoformat() if row["submitted_at"] else None
+
+        return {
+            "filename": f"students/{row['student_id']}_{_slug(row['student_name'])}.pdf",
+            "title": title,
+            "student_name": row["student_name"],
+            "summary": {
+                "score": f"{row['total_score']:g} / {max_score:g}",
+                "percentage": percentage,
+                "grade": grade,
+                "submitted": submitted
+            },
+            "questions": [
+                {
+                    "question": question["text"],
+                    "answer": answers.get(question_id, ""),
+                    "points": f"{feedback.get(question_id, {}).get('score', 0):g} / {question['points']}",
+                    "feedback": feedback.get(question_id, {}).get("feedback", "")
+                } for question_id, question in questions.items()
+            ],
+            "percentage": percentage,
+            "grade": grade,
+            "row": {
+                "student_id": row["student_id"],
+                "student_name": row["student_name"],
+                "email": row["email"],
+                "score": row["total_score"],
+                "max_score": max_score,
+                "percentage": percentage,
+                "grade": grade,
+                "submitted_at": submitted
+            }
+        }
+
+    def _write_summary(self, archive: zipfile.ZipFile, title: str, stats: ReportStats, results_csv):
+        """Class summary PDF and results CSV, both streamed from the spooled results"""
+        results_csv.seek(0)
+        summary = {
+            "title": f"{title}: class summary",
+            "summary": stats.summary(),
+            "student_results": _csv_rows(results_csv)
+        }
+        with archive.open("summary.pdf", "w") as member:
+            for chunk in render_pdf("assessment_report", summary, title=summary["title"]):
+                member.write(chunk)
+
+        results_csv.seek(0)
+        with archive.open("results.csv", "w") as member:
+            while True:
+                chunk = results_csv.read(64 * 1024)
+                if not chunk:
+                    break
+                member.write(chunk.encode("utf-8"))
+
+def _csv_rows(results_csv) -> Iterator[Dict[str, Any]]:
+    yield from csv.DictReader(results_csv)
@@ -0,0 +1,339 @@
+"""
+WebSocket fan-out for collaboration sessions
+Each worker process keeps one Redis subscription per active session, however
+many sockets it serves. Cursor/presence updates are coalesced (last position
+wins) and document deltas batched, then flushed to every socket once per tick,
+so a session costs at most one frame per client per tick instead of N² polls.
+Sockets that cannot keep up have their queued deltas dropped and are told to
+resync; sockets that stay stuck are closed.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, List, Any, Optional, Set
+from app.services.collaboration_service import CollaborationService
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 0.05
+MAX_PENDING_FRAMES = 32
+MAX_LAGGING_TICKS = 200
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+# WebSocket close codes
+POLICY_VIOLATION = 1008
+TRY_AGAIN_LATER = 1013
+
+_PATH_KEYS = ("field_path", "array_path")
+_INT_KEYS = ("client_seq", "base_version", "position", "length", "index", "item_index")
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_path(value: Any) -> bool:
+    if isinstance(value, str):
+        return True
+    return isinstance(value, list) and all(isinstance(s, str) or _is_int(s) for s in value)
+
+def validate_message(message: Any):
+    """Reject client frames whose fields have the wrong shape; raises ValueError"""
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ValueError("Messages must be objects with a string 'type'")
+    kind = message["type"]
+
+    if kind == "change":
+        change = message.get("change")
+        if not isinstance(change, dict):
+            raise ValueError("'change' must be an object")
+        for key in _PATH_KEYS:
+            if change.get(key) is not None and not _is_path(change[key]):
+                raise ValueError(f"'{key}' must be a string or a list of keys and indexes")
+        for key in _INT_KEYS:
+            if change.get(key) is not None and not _is_int(change[key]):
+                raise ValueError(f"'{key}' must be an integer")
+    elif kind in ("lock", "unlock"):
+        if not isinstance(message.get("field_path"), str):
+            raise ValueError("'field_path' must be a string")
+    elif kind == "resync":
+        if message.get("version") is not None and not _is_int(message["version"]):
+            raise ValueError("'version' must be an integer")
+
+class ClientConnection:
+    """One socket with a bounded outbound queue drained by its own sender task"""
+
+    def __init__(self, websocket, user_id: str, max_pending: int = MAX_PENDING_FRAMES):
+        self.websocket = websocket
+        self.user_id = str(user_id)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.needs_resync = False
+        self.lagging_ticks = 0
+        self.dropped_frames = 0
+        self.sender: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.sender = asyncio.create_task(self._send_loop())
+
+    def offer(self, frame: Dict[str, Any]) -> bool:
+        """Queue a frame without waiting; False if the client is behind"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.dropped_frames += 1
+            return False
+
+    def discard_pending(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    async def _send_loop(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                await self.websocket.send_text(json.dumps(frame, default=str))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Socket gone; the receive loop notices and disconnects
+            logger.debug("collaboration sender for %s stopped: %s", self.user_id, e)
+
+    async def close(self, code: int = 1000):
+        if self.sender:
+            self.sender.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+class SessionRoom:
+    """Sockets in this process attached to one session"""
+
+    def __init__(self, hub: "CollaborationHub", session_id: str):
+        self.hub = hub
+        self.session_id = session_id
+        self.connections: Set[ClientConnection] = set()
+        self.deltas: List[Dict[str, Any]] = []
+        self.presence: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.local_cursors: Dict[str, Any] = {}
+        self.version = 0
+        self.subscribed = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._tick())
+        ]
+
+    async def wait_subscribed(self, timeout: float = SUBSCRIBE_TIMEOUT_SECONDS):
+        """Return once this room receives the session's events; raises ConnectionError otherwise"""
+        if self.subscribed.is_set():
+            return
+        waiter = asyncio.ensure_future(self.subscribed.wait())
+        await asyncio.wait({waiter, self._tasks[0]}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not waiter.done():
+            waiter.cancel()
+            raise ConnectionError(f"Could not subscribe to session {self.session_id}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _listen(self):
+        """Buffer events from every worker until the next tick"""
+        async for event in self.hub.service.subscribe(self.session_id, self.subscribed):
+            kind = event.get("type")
+            if kind == "delta":
+                self.deltas.append(event)
+                self.version = max(self.version, event.get("version", 0))
+            elif kind == "presence":
+                self.presence.update(event.get("cursors", {}))
+            else:
+                self.events.append(event)
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.hub.tick_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("collaboration tick failed for %s: %s", self.session_id, e)
+
+    async def flush(self):
+        """Publish coalesced local cursors, then send one frame per socket"""
+        if self.local_cursors:
+            cursors, self.local_cursors = self.local_cursors, {}
+            await self.hub.service.update_cursor_positions(self.session_id, cursors)
+
+        if not (self.deltas or self.presence or self.events):
+            return
+        deltas, self.deltas = self.deltas, []
+        presence, self.presence = self.presence, {}
+        events, self.events = self.events, []
+
+        for connection in list(self.connections):
+            if connection.needs_resync:
+                # Hold everything until the resync notice has gone out; the
+                # state the client then refetches covers what was skipped
+                if not connection.queue.empty():
+                    self._lagging(connection)
+                    continue
+                connection.needs_resync = False
+                connection.lagging_ticks = 0
+
+            frame = {"type": "frame", "version": self.version}
+            if deltas:
+                frame["deltas"] = deltas
+            others = {uid: pos for uid, pos in presence.items() if uid != connection.user_id}
+            if others:
+                frame["presence"] = others
+            if events:
+                frame["events"] = events
+            if len(frame) == 2:
+                continue
+
+            if not connection.offer(frame):
+                # Deltas can't be coalesced; drop the backlog and have the client refetch
+                connection.discard_pending()
+                connection.offer({"type": "resync", "version": self.version})
+                connection.needs_resync = True
+                self._lagging(connection)
+
+    def _lagging(self, connection: ClientConnection):
+        connection.lagging_ticks += 1
+        if connection.lagging_ticks > self.hub.max_lagging_ticks:
+            logger.info("closing slow collaboration client %s in %s", connection.user_id, self.session_id)
+            asyncio.create_task(self.hub.disconnect(self.session_id, connection, code=TRY_AGAIN_LATER))
+
+class CollaborationHub:
+    """Per-process registry of session rooms"""
+
+    def __init__(self, service: CollaborationService = None, tick_seconds: float = TICK_SECONDS,
+                 max_pending_frames: int = MAX_PENDING_FRAMES, max_lagging_ticks: int = MAX_LAGGING_TICKS):
+        self.service = service or CollaborationService()
+        self.tick_seconds = tick_seconds
+        self.max_pending_frames = max_pending_frames
+        self.max_lagging_ticks = max_lagging_ticks
+        self.rooms: Dict[str, SessionRoom] = {}
+
+    async def connect(self, session_id: str, user_id: str, user_name: str, websocket,
+                      since_version: Optional[int] = None) -> ClientConnection:
+        """Join the session and send the client what it needs to catch up"""
+        room = self.rooms.get(session_id)
+        if room is None:
+            room = self.rooms[session_id] = SessionRoom(self, session_id)
+            room.start()
+
+        # Join only once the room is subscribed, so nothing published after the
+        # join's snapshot is missed; frames carry versions so overlap is detectable
+        try:
+            await room.wait_subscribed()
+            state = await self.service.join_session(session_id, user_id, user_name, since_version)
+        except (ValueError, ConnectionError):
+            if not room.connections:
+                del self.rooms[session_id]
+                await room.stop()
+            raise
+        connection = ClientConnection(websocket, user_id, self.max_pending_frames)
+        connection.offer({"type": "state", **state})
+        connection.start()
+
+        room.version = max(room.version, state["version"])
+        room.connections.add(connection)
+        return connection
+
+    async def disconnect(self, session_id: str, connection: ClientConnection, code: int = 1000):
+        room = self.rooms.get(session_id)
+        if room is None or connection not in room.connections:
+            return
+        room.connections.discard(connection)
+        room.local_cursors.pop(connection.user_id, None)
+        await connection.close(code)
+
+        if not any(c.user_id == connection.user_id for c in room.connections):
+            await self.service.leave_session(session_id, connection.user_id)
+        if not room.connections:
+            del self.rooms[session_id]
+            await room.stop()
+
+    async def handle_message(self, session_id: str, connection: ClientConnection, message: Dict[str, Any]):
+        """Dispatch one client message; cursor moves only update the tick buffer"""
+        validate_message(message)
+        kind = message["type"]
+        room = self.rooms[session_id]
+
+        if kind == "cursor":
+            room.local_cursors[connection.user_id] = message.get("position")
+        elif kind == "change":
+            result = await self.service.apply_change(session_id, connection.user_id, message.get("change", {}))
+            connection.offer({
+                "type": "ack",
+                "client_seq": message.get("change", {}).get("client_seq"),
+                "change_id": result["change_id"],
+                "applied": result["applied"],
+                "conflict": result["conflict"],
+                "version": result["version"]
+            })
+        elif kind == "lock":
+            locked = await self.service.lock_field(session_id, connection.user_id, message["field_path"])
+            connection.offer({"type": "lock", "field_path": message["field_path"], "locked": locked})
+        elif kind == "unlock":
+            await self.service.unlock_field(session_id, connection.user_id, message["field_path"])
+        elif kind == "resync":
+            state = await self.service.catch_up(session_id, message.get("version"))
+            connection.offer({"type": "state", **state})
+        else:
+            connection.offer({"type": "error", "detail": f"Unsupported message type: {kind}"})
+
+    async def serve(self, session_id: str, user_id: str, user_name: str, websocket,
+                    since_version: Optional[int] = None):
+        """Run a client connection until the socket closes"""
+        try:
+            connection = await self.connect(session_id, user_id, user_name, websocket, since_version)
+        except ValueError as e:
+            await websocket.close(code=POLICY_VIOLATION, reason=str(e))
+            return
+        except ConnectionError as e:
+            await websocket.close(code=TRY_AGAIN_LATER, reason=str(e))
+            return
+
+        try:
+            while True:
+                raw = await websocket.receive_text()
+                try:
+                    message = json.loads(raw)
+                except json.JSONDecodeError:
+                    connection.offer({"type": "error", "detail": "Invalid JSON"})
+                    continue
+                try:
+                    await self.handle_message(session_id, connection, message)
+                except (KeyError, ValueError, TypeError) as e:
+                    connection.offer({"type": "error", "detail": str(e)})
+        except Exception as e:
+            # WebSocketDisconnect or a dropped transport
+            logger.debug("collaboration socket for %s closed: %s", user_id, e)
+        finally:
+            await self.disconnect(session_id, connection)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.rooms),
+            "connections": sum(len(r.connections) for r in self.rooms.values()),
+            "dropped_frames": sum(c.dropped_frames for r in self.rooms.values() for c in r.connections)
+        }
+
+    async def aclose(self):
+        for session_id, room in list(self.rooms.items()):
+            for connection in list(room.connections):
+                await self.disconnect(session_id, connection, code=1001)
+
+_hub: Optional[CollaborationHub] = None
+
+def get_collaboration_hub() -> CollaborationHub:
+    """Process-wide hub, created on first use"""
+    global _hub
+    if _hub is None:
+        _hub = CollaborationHub()
+    return _hub
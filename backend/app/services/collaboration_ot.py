@@ -0,0 +1,173 @@
+"""
+Path-scoped operational transformation for collaborative curriculum JSON
+The server sequences operations: an incoming op is transformed against every
+op applied since the client's base version, then applied and broadcast.
+"""
+import copy
+from typing import Dict, List, Any, Optional, Union
+from app.services.json_path import compile_path, MISSING
+
+PathSegment = Union[str, int]
+
+# Operation types and the fields that locate them
+STRUCTURAL_OPS = {"insert", "delete"}
+TEXT_OPS = {"text_insert", "text_delete"}
+
+def parse_path(path: Union[str, List[PathSegment], None]) -> List[PathSegment]:
+    """'modules.0.title' or '/modules/0/title' -> ['modules', 0, 'title']"""
+    return list(compile_path(path).segments)
+
+def normalize_change(change: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an editor change into an operation"""
+    change_type = change.get("type")
+
+    if change_type in ("text_edit", "set"):
+        return {"op": "set", "path": parse_path(change.get("field_path")), "value": change.get("value")}
+    if change_type in ("add_item", "insert"):
+        return {
+            "op": "insert",
+            "path": parse_path(change.get("array_path")),
+            "index": change.get("index"),
+            "value": change.get("item", change.get("value"))
+        }
+    if change_type in ("remove_item", "delete"):
+        return {"op": "delete", "path": parse_path(change.get("array_path")), "index": change.get("item_index")}
+    if change_type == "text_insert":
+        return {
+            "op": "text_insert",
+            "path": parse_path(change.get("field_path")),
+            "position": int(change.get("position", 0)),
+            "text": change.get("text", "")
+        }
+    if change_type == "text_delete":
+        return {
+            "op": "text_delete",
+            "path": parse_path(change.get("field_path")),
+            "position": int(change.get("position", 0)),
+            "length": int(change.get("length", 0))
+        }
+
+    raise ValueError(f"Unsupported change type: {change_type}")
+
+def _is_prefix(prefix: List[PathSegment], path: List[PathSegment]) -> bool:
+    return len(prefix) <= len(path) and path[:len(prefix)] == prefix
+
+def _shift_path(op: Dict[str, Any], array_path: List[PathSegment], index: int, delta: int,
+                deleted: bool = False) -> Optional[Dict[str, Any]]:
+    """Adjust an op whose path runs through an element of a changed array"""
+    depth = len(array_path)
+    path = op["path"]
+    if len(path) <= depth or path[:depth] != array_path or not isinstance(path[depth], int):
+        return op
+
+    position = path[depth]
+    if deleted and position == index:
+        return None  # its target element is gone
+    if position > index or (not deleted and position == index):
+        op = {**op, "path": path[:depth] + [position + delta] + path[depth + 1:]}
+    return op
+
+def transform(op: Dict[str, Any], applied: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rewrite ``op`` so it has the same intent after ``applied`` ran first"""
+    kind, other = op["op"], applied["op"]
+
+    if other == "set":
+        # Nested edits inside a replaced subtree lose their target; later sets win
+        if kind != "set" and _is_prefix(applied["path"], op["path"]):
+            return []
+        return [op]
+
+    if other == "insert":
+        index = applied["index"]
+        if op["path"] == applied["path"] and kind in STRUCTURAL_OPS and op.get("index") is not None:
+            if op["index"] >= index:
+                op = {**op, "index": op["index"] + 1}
+            return [op]
+        shifted = _shift_path(op, applied["path"], index, 1)
+        return [shifted] if shifted else []
+
+    if other == "delete":
+        index = applied["index"]
+        if op["path"] == applied["path"] and kind in STRUCTURAL_OPS and op.get("index") is not None:
+            if kind == "delete" and op["index"] == index:
+                return []
+            if op["index"] > index:
+                op = {**op, "index": op["index"] - 1}
+            return [op]
+        shifted = _shift_path(op, applied["path"], index, -1, deleted=True)
+        return [shifted] if shifted else []
+
+    if other in TEXT_OPS and kind in TEXT_OPS and op["path"] == applied["path"]:
+        return _transform_text(op, applied)
+
+    return [op]
+
+def _transform_text(op: Dict[str, Any], applied: Dict[str, Any]) -> List[Dict[str, Any]]:
+    position = op["position"]
+
+    if applied["op"] == "text_insert":
+        at, size = applied["position"], len(applied["text"])
+        if op["op"] == "text_insert":
+            return [{**op, "position": position + size if position >= at else position}]
+
+        end = position + op["length"]
+        if at <= position:
+            return [{**op, "position": position + size}]
+        if at >= end:
+            return [op]
+        # Text was typed inside the range being deleted: delete around it, later
+        # range first so both pieces stay in the same coordinate space
+        return [
+            {**op, "position": at + size, "length": end - at},
+            {**op, "length": at - position}
+        ]
+
+    at, size = applied["position"], applied["length"]
+
+    def shift(x: int) -> int:
+        if x <= at:
+            return x
+        return at if x <= at + size else x - size
+
+    if op["op"] == "text_insert":
+        return [{**op, "position": shift(position)}]
+
+    start, end = shift(position), shift(position + op["length"])
+    return [{**op, "position": start, "length": end - start}] if end > start else []
+
+def transform_against(ops: List[Dict[str, Any]], history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Transform ops against a sequence of already-applied ops, in order"""
+    for applied in history:
+        ops = [result for op in ops for result in transform(op, applied)]
+    return ops
+
+def apply_op(document: Dict[str, Any], op: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply an op in place; returns the op as applied (appends get a concrete index) or None"""
+    kind = op["op"]
+    path = compile_path(op["path"])
+
+    if kind == "set":
+        return op if path.set(document, copy.deepcopy(op["value"])) else None
+
+    if kind == "insert":
+        index = path.insert(document, copy.deepcopy(op["value"]), op.get("index"))
+        return None if index is None else {**op, "index": index}
+
+    if kind == "delete":
+        if op.get("index") is None or path.remove(document, op["index"]) is MISSING:
+            return None
+        return op
+
+    if kind in TEXT_OPS:
+        target = path.get(document)
+        if not isinstance(target, str) or not path.segments:
+            return None
+        position = max(0, min(op["position"], len(target)))
+        if kind == "text_insert":
+            updated = target[:position] + op["text"] + target[position:]
+        else:
+            updated = target[:position] + target[position + op["length"]:]
+        path.set(document, updated)
+        return {**op, "position": position}
+
+    return None
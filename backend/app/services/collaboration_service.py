@@ -1,74 +1,164 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 import json
+import gzip
 import asyncio
+import logging
 from datetime import datetime
 import uuid
+from redis.exceptions import WatchError
+from app.core.redis_client import get_redis
+from app.services.collaboration_ot import normalize_change, transform_against, apply_op
+
+logger = logging.getLogger(__name__)
 
 class CollaborationService:
-    def __init__(self):
-        # In-memory storage for demo (use Redis in production)
-        self.active_sessions = {}
-        self.document_locks = {}
-        self.change_history = {}
-    
+    """Collaborative curriculum editing backed by Redis
+
+    Per session: a hash with metadata, document state and version, a hash of
+    participants, a stream of applied changes and a pub/sub channel that fans
+    events out to every worker.
+
+    The change stream is a segmented log: every ``snapshot_interval`` versions
+    the document is snapshotted and segments older than ``retained_segments``
+    are compacted away, with ``max_history`` as a hard ring-buffer cap. Joiners
+    catch up from their own version or from the snapshot plus the log tail.
+    Keys expire after a period of inactivity, and idle sessions are evicted to
+    cold storage.
+    """
+
+    KEY_PREFIX = "collab"
+    ARCHIVE_PREFIX = "collaboration-archive"
+
+    def __init__(self, redis_client=None, session_ttl_hours: int = 24, max_history: int = 1000,
+                 lock_ttl_seconds: int = 300, snapshot_interval: int = 100, retained_segments: int = 2,
+                 archive=None):
+        self.redis = redis_client or get_redis()
+        self.session_ttl = session_ttl_hours * 3600
+        self.max_history = max_history
+        self.lock_ttl = lock_ttl_seconds
+        self.snapshot_interval = snapshot_interval
+        self.retained_segments = retained_segments
+        self.archive = archive
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}"
+
+    def _participants_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:participants"
+
+    def _changes_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:changes"
+
+    def _snapshot_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:snapshot"
+
+    def _cursors_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:cursors"
+
+    def _clock_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:clock"
+
+    def _lock_key(self, session_id: str, field_path: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:lock:{field_path}"
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:session:{session_id}:events"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.KEY_PREFIX}:sessions"
+
+    def _touch(self, pipe, session_id: str):
+        """Queue TTL refresh and activity tracking for a session"""
+        for key in (self._session_key(session_id), self._participants_key(session_id),
+                    self._changes_key(session_id), self._clock_key(session_id),
+                    self._snapshot_key(session_id)):
+            pipe.expire(key, self.session_ttl)
+        pipe.zadd(self._index_key, {session_id: datetime.utcnow().timestamp()})
+
+    async def _publish(self, session_id: str, event: Dict[str, Any]):
+        await self.redis.publish(self._channel(session_id), json.dumps(event, default=str))
+
     async def create_collaboration_session(self, curriculum_id: int, user_id: int, user_name: str) -> str:
         """Create a new collaboration session"""
         session_id = str(uuid.uuid4())
-        
-        self.active_sessions[session_id] = {
-            "curriculum_id": curriculum_id,
-            "created_by": user_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "participants": {
-                str(user_id): {
-                    "name": user_name,
-                    "joined_at": datetime.utcnow().isoformat(),
-                    "is_active": True,
-                    "cursor_position": None
-                }
-            },
-            "document_state": {},
-            "pending_changes": []
-        }
-        
+        now = datetime.utcnow().isoformat()
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._session_key(session_id), mapping={
+                "curriculum_id": curriculum_id,
+                "created_by": user_id,
+                "created_at": now,
+                "document_state": "{}",
+                "version": 0
+            })
+            pipe.hset(self._participants_key(session_id), str(user_id), json.dumps({
+                "name": user_name,
+                "joined_at": now,
+                "is_active": True,
+                "cursor_position": None
+            }))
+            self._touch(pipe, session_id)
+            await pipe.execute()
+
         return session_id
-    
-    async def join_session(self, session_id: str, user_id: int, user_name: str) -> Dict[str, Any]:
-        """Join an existing collaboration session"""
-        if session_id not in self.active_sessions:
+
+    async def join_session(self, session_id: str, user_id: int, user_name: str,
+                           since_version: Optional[int] = None) -> Dict[str, Any]:
+        """Join an existing collaboration session, catching up from since_version if given"""
+        curriculum_id = await self.redis.hget(self._session_key(session_id), "curriculum_id")
+        if curriculum_id is None:
             raise ValueError("Session not found")
-        
-        session = self.active_sessions[session_id]
-        session["participants"][str(user_id)] = {
+
+        participant = {
             "name": user_name,
             "joined_at": datetime.utcnow().isoformat(),
             "is_active": True,
             "cursor_position": None
         }
-        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._participants_key(session_id), str(user_id), json.dumps(participant))
+            self._touch(pipe, session_id)
+            await pipe.execute()
+
+        await self._publish(session_id, {"type": "participant_joined", "user_id": user_id, "participant": participant})
+
         return {
             "session_id": session_id,
-            "curriculum_id": session["curriculum_id"],
-            "participants": session["participants"],
-            "document_state": session["document_state"]
+            "curriculum_id": int(curriculum_id),
+            "participants": await self._load_participants(session_id),
+            **await self.catch_up(session_id, since_version)
+        }
+
+    async def session_access(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Who may open the session: its curriculum, creator and participants; None if it doesn't exist"""
+        curriculum_id, created_by = await self.redis.hmget(self._session_key(session_id), "curriculum_id", "created_by")
+        if curriculum_id is None:
+            return None
+        return {
+            "curriculum_id": int(curriculum_id),
+            "created_by": created_by,
+            "participants": set(await self.redis.hkeys(self._participants_key(session_id)))
         }
-    
+
     async def leave_session(self, session_id: str, user_id: int):
         """Leave a collaboration session"""
-        if session_id in self.active_sessions:
-            session = self.active_sessions[session_id]
-            if str(user_id) in session["participants"]:
-                session["participants"][str(user_id)]["is_active"] = False
-                session["participants"][str(user_id)]["left_at"] = datetime.utcnow().isoformat()
-    
+        participant = await self._update_participant(session_id, user_id, {
+            "is_active": False,
+            "left_at": datetime.utcnow().isoformat()
+        })
+        if participant:
+            await self._publish(session_id, {"type": "participant_left", "user_id": user_id})
+
     async def apply_change(self, session_id: str, user_id: int, change: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply a change to the collaborative document"""
-        if session_id not in self.active_sessions:
-            raise ValueError("Session not found")
-        
-        session = self.active_sessions[session_id]
-        
-        # Add change metadata
+        """Merge a change into the collaborative document
+
+        The change is transformed against every change applied since the
+        client's ``base_version`` (see collaboration_ot), applied, and broadcast
+        as a delta with the session's version vector. The read-modify-write runs
+        as an optimistic Redis transaction, retried if another worker commits
+        first. Only explicit field locks and a trimmed history reject a change.
+        """
         change_with_metadata = {
             **change,
             "id": str(uuid.uuid4()),
@@ -76,178 +166,410 @@ class CollaborationService:
             "timestamp": datetime.utcnow().isoformat(),
             "applied": False
         }
-        
-        # Check for conflicts
-        conflict = await self._check_conflicts(session_id, change_with_metadata)
-        
-        if not conflict:
-            # Apply change to document state
-            await self._apply_change_to_document(session_id, change_with_metadata)
-            change_with_metadata["applied"] = True
-            
-            # Add to history
-            if session_id not in self.change_history:
-                self.change_history[session_id] = []
-            self.change_history[session_id].append(change_with_metadata)
-        
+        ops = [normalize_change(change)]
+        session_key = self._session_key(session_id)
+        clock_key = self._clock_key(session_id)
+        conflict = None
+        version = 0
+        vector = {}
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    watched = [session_key, clock_key]
+                    if change.get("field_path"):
+                        watched.append(self._lock_key(session_id, change["field_path"]))
+                    await pipe.watch(*watched)
+
+                    raw_state, raw_version = await pipe.hmget(session_key, "document_state", "version")
+                    if raw_state is None:
+                        raise ValueError("Session not found")
+                    version = int(raw_version or 0)
+                    vector = {uid: int(seq) for uid, seq in (await pipe.hgetall(clock_key)).items()}
+
+                    client_seq = change.get("client_seq")
+                    if client_seq is not None and client_seq <= vector.get(str(user_id), 0):
+                        # Retransmission of a change that was already merged
+                        conflict = {"type": "duplicate", "client_seq": client_seq}
+                        await pipe.unwatch()
+                        break
+
+                    # Check for conflicts
+                    conflict = await self._check_conflicts(session_id, change_with_metadata)
+                    if conflict:
+                        await pipe.unwatch()
+                        break
+
+                    base_version = change.get("base_version", version)
+                    if base_version < version:
+                        history = await self._ops_since(session_id, base_version, version)
+                        if history is None:
+                            conflict = {"type": "resync_required", "version": version}
+                            await pipe.unwatch()
+                            break
+                        merged = transform_against(ops, history)
+                    else:
+                        merged = ops
+
+                    document_state = json.loads(raw_state)
+                    applied_ops = [a for a in (apply_op(document_state, op) for op in merged) if a]
+                    if not applied_ops:
+                        conflict = {"type": "superseded", "version": version}
+                        await pipe.unwatch()
+                        break
+
+                    version += 1
+                    vector[str(user_id)] = client_seq if client_seq is not None else vector.get(str(user_id), 0) + 1
+                    change_with_metadata.update({"applied": True, "version": version, "ops": applied_ops})
+
+                    pipe.multi()
+                    pipe.hset(session_key, mapping={
+                        "document_state": json.dumps(document_state),
+                        "version": version
+                    })
+                    pipe.hset(clock_key, str(user_id), vector[str(user_id)])
+                    # Add to history, keyed by version so catch-up reads are range scans
+                    pipe.xadd(
+                        self._changes_key(session_id),
+                        {"change": json.dumps(change_with_metadata, default=str)},
+                        id=f"{version}-0",
+                        maxlen=self.max_history,
+                        approximate=True
+                    )
+                    if version % self.snapshot_interval == 0:
+                        self._snapshot(pipe, session_id, version, document_state, vector)
+                    pipe.publish(self._channel(session_id), json.dumps({
+                        "type": "delta",
+                        "change_id": change_with_metadata["id"],
+                        "user_id": user_id,
+                        "ops": applied_ops,
+                        "version": version,
+                        "vector": vector
+                    }, default=str))
+                    self._touch(pipe, session_id)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    change_with_metadata.update({"applied": False, "version": None, "ops": None})
+                    continue
+
         return {
             "change_id": change_with_metadata["id"],
             "applied": change_with_metadata["applied"],
             "conflict": conflict,
-            "document_state": session["document_state"]
+            "ops": change_with_metadata.get("ops") or [],
+            "version": version,
+            "vector": vector
         }
-    
+
+    def _snapshot(self, pipe, session_id: str, version: int, document_state: Dict[str, Any],
+                  vector: Dict[str, int]):
+        """Queue a snapshot at ``version`` and compact segments it makes redundant"""
+        pipe.hset(self._snapshot_key(session_id), mapping={
+            "version": version,
+            "document_state": json.dumps(document_state),
+            "vector": json.dumps(vector),
+            "created_at": datetime.utcnow().isoformat()
+        })
+        # Keep the open segment plus (retained_segments - 1) closed ones so
+        # clients a little behind can still be transformed instead of resynced
+        oldest = version - self.snapshot_interval * (self.retained_segments - 1)
+        if oldest > 0:
+            pipe.xtrim(self._changes_key(session_id), minid=f"{oldest + 1}-0", approximate=False)
+
+    async def _ops_since(self, session_id: str, base_version: int,
+                         current_version: int) -> Optional[List[Dict[str, Any]]]:
+        """Ops applied after base_version, or None if that history was trimmed"""
+        entries = await self.redis.xrange(
+            self._changes_key(session_id), min=f"{base_version + 1}-0", max=f"{current_version}-0"
+        )
+        changes = [json.loads(fields["change"]) for _, fields in entries]
+
+        if len(changes) != current_version - base_version:
+            return None
+        return [op for c in changes for op in c.get("ops", [])]
+
     async def _check_conflicts(self, session_id: str, change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Check for conflicts with pending changes"""
-        session = self.active_sessions[session_id]
-        
-        # Simple conflict detection based on field being edited
+        """Check whether another user holds the lock on the edited field"""
         field_path = change.get("field_path")
         if not field_path:
             return None
-        
-        # Check if another user is editing the same field
-        for pending_change in session["pending_changes"]:
-            if (pending_change.get("field_path") == field_path and 
-                pending_change.get("user_id") != change["user_id"]):
+
+        lock = await self.redis.get(self._lock_key(session_id, field_path))
+        if lock:
+            holder = json.loads(lock)["user_id"]
+            if holder != change["user_id"]:
                 return {
-                    "type": "concurrent_edit",
-                    "conflicting_user": pending_change["user_id"],
+                    "type": "field_locked",
+                    "conflicting_user": holder,
                     "field": field_path
                 }
-        
+
         return None
-    
-    async def _apply_change_to_document(self, session_id: str, change: Dict[str, Any]):
-        """Apply change to the document state"""
-        session = self.active_sessions[session_id]
-        
-        change_type = change.get("type")
-        field_path = change.get("field_path")
-        new_value = change.get("value")
-        
-        if change_type == "text_edit" and field_path:
-            # Navigate to the field and update value
-            self._set_nested_value(session["document_state"], field_path, new_value)
-        elif change_type == "add_item":
-            # Add new item to array
-            array_path = change.get("array_path")
-            item = change.get("item")
-            if array_path and item:
-                array = self._get_nested_value(session["document_state"], array_path)
-                if isinstance(array, list):
-                    array.append(item)
-        elif change_type == "remove_item":
-            # Remove item from array
-            array_path = change.get("array_path")
-            item_index = change.get("item_index")
-            if array_path and item_index is not None:
-                array = self._get_nested_value(session["document_state"], array_path)
-                if isinstance(array, list) and 0 <= item_index < len(array):
-                    array.pop(item_index)
-    
-    def _get_nested_value(self, obj: Dict[str, Any], path: str) -> Any:
-        """Get value from nested object using dot notation"""
-        keys = path.split(".")
-        current = obj
-        
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return None
-        
-        return current
-    
-    def _set_nested_value(self, obj: Dict[str, Any], path: str, value: Any):
-        """Set value in nested object using dot notation"""
-        keys = path.split(".")
-        current = obj
-        
-        # Navigate to parent object
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
-        
-        # Set the final value
-        current[keys[-1]] = value
-    
+
     async def update_cursor_position(self, session_id: str, user_id: int, position: Dict[str, Any]):
         """Update user's cursor position"""
-        if session_id in self.active_sessions:
-            session = self.active_sessions[session_id]
-            if str(user_id) in session["participants"]:
-                session["participants"][str(user_id)]["cursor_position"] = position
-    
+        await self.update_cursor_positions(session_id, {str(user_id): position})
+
+    async def update_cursor_positions(self, session_id: str, positions: Dict[str, Any]):
+        """Store a batch of cursor positions and announce them as one presence event
+
+        Cursors live in their own hash so frequent moves never contend with
+        participant updates.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self._cursors_key(session_id), mapping={
+                user_id: json.dumps(position, default=str) for user_id, position in positions.items()
+            })
+            pipe.expire(self._cursors_key(session_id), self.session_ttl)
+            pipe.publish(self._channel(session_id), json.dumps({"type": "presence", "cursors": positions}, default=str))
+            await pipe.execute()
+
     async def get_session_state(self, session_id: str) -> Dict[str, Any]:
         """Get current session state"""
-        if session_id not in self.active_sessions:
-            raise ValueError("Session not found")
-        
-        session = self.active_sessions[session_id]
+        session = await self._load_session(session_id)
+        participants = await self._load_participants(session_id)
+
         return {
             "session_id": session_id,
-            "participants": session["participants"],
+            "participants": participants,
             "document_state": session["document_state"],
+            "version": session["version"],
             "active_participants": [
-                p for p in session["participants"].values() 
+                p for p in participants.values()
                 if p.get("is_active", False)
             ]
         }
-    
-    async def get_change_history(self, session_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get change history for a session"""
-        if session_id not in self.change_history:
-            return []
-        
-        history = self.change_history[session_id]
-        return history[-limit:] if limit else history
-    
+
+    async def get_change_history(self, session_id: str, limit: int = 50,
+                                 before_version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the newest ``limit`` retained changes (older than before_version), oldest first"""
+        key = self._changes_key(session_id)
+        newest = f"{before_version - 1}-0" if before_version else "+"
+        if limit:
+            entries = await self.redis.xrevrange(key, max=newest, min="-", count=limit)
+            entries.reverse()
+        else:
+            entries = await self.redis.xrange(key, min="-", max=newest)
+
+        return [json.loads(fields["change"]) for _, fields in entries]
+
+    async def catch_up(self, session_id: str, since_version: Optional[int] = None) -> Dict[str, Any]:
+        """What a (re)joining client needs to reach the current version
+
+        Just the ops after ``since_version`` when the log still has them,
+        otherwise the latest snapshot plus the log tail after it, and the full
+        document only if neither is available.
+        """
+        version = await self.redis.hget(self._session_key(session_id), "version")
+        if version is None:
+            raise ValueError("Session not found")
+        version = int(version)
+
+        if since_version is not None and 0 <= since_version <= version:
+            ops = await self._ops_since(session_id, since_version, version)
+            if ops is not None:
+                return {"version": version, "base_version": since_version, "ops": ops}
+
+        snapshot = await self.redis.hgetall(self._snapshot_key(session_id))
+        if snapshot and int(snapshot["version"]) <= version:
+            ops = await self._ops_since(session_id, int(snapshot["version"]), version)
+            if ops is not None:
+                return {
+                    "version": version,
+                    "base_version": int(snapshot["version"]),
+                    "snapshot": json.loads(snapshot["document_state"]),
+                    "ops": ops
+                }
+
+        session = await self._load_session(session_id)
+        return {
+            "version": session["version"],
+            "base_version": session["version"],
+            "snapshot": session["document_state"],
+            "ops": []
+        }
+
     async def lock_field(self, session_id: str, user_id: int, field_path: str) -> bool:
-        """Lock a field for editing"""
-        lock_key = f"{session_id}:{field_path}"
-        
-        if lock_key in self.document_locks:
-            # Field is already locked by another user
-            if self.document_locks[lock_key]["user_id"] != user_id:
-                return False
-        
-        self.document_locks[lock_key] = {
+        """Lock a field for editing; locks expire if not refreshed"""
+        lock_key = self._lock_key(session_id, field_path)
+        lock = json.dumps({
             "user_id": user_id,
             "locked_at": datetime.utcnow().isoformat(),
             "field_path": field_path
-        }
-        
-        return True
-    
+        })
+
+        if await self.redis.set(lock_key, lock, nx=True, ex=self.lock_ttl):
+            return True
+
+        # Already locked: only the holder may refresh it
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(lock_key)
+                current = await pipe.get(lock_key)
+                if current and json.loads(current)["user_id"] != user_id:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.set(lock_key, lock, ex=self.lock_ttl)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
     async def unlock_field(self, session_id: str, user_id: int, field_path: str):
         """Unlock a field"""
-        lock_key = f"{session_id}:{field_path}"
-        
-        if (lock_key in self.document_locks and 
-            self.document_locks[lock_key]["user_id"] == user_id):
-            del self.document_locks[lock_key]
-    
-    async def cleanup_inactive_sessions(self, max_age_hours: int = 24):
-        """Clean up inactive sessions"""
+        lock_key = self._lock_key(session_id, field_path)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(lock_key)
+                current = await pipe.get(lock_key)
+                if not current or json.loads(current)["user_id"] != user_id:
+                    await pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(lock_key)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def subscribe(self, session_id: str, ready: Optional[asyncio.Event] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield change and presence events published by any worker
+
+        ``ready`` is set once the subscription is live, so callers can join
+        the session knowing no later event will be missed.
+        """
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._channel(session_id))
+        if ready is not None:
+            ready.set()
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(self._channel(session_id))
+            await pubsub.aclose()
+
+    async def cleanup_inactive_sessions(self, max_age_hours: int = 24) -> List[str]:
+        """Evict sessions idle for longer than max_age_hours with nobody active
+
+        Each session is written to cold storage first and only dropped from
+        Redis once the upload succeeded; with no archive available nothing is
+        evicted. Returns the evicted session ids.
+        """
+        archive = self._get_archive()
+        if archive is None:
+            logger.warning("Collaboration archive unavailable, skipping session eviction")
+            return []
+
         cutoff_time = datetime.utcnow().timestamp() - (max_age_hours * 3600)
-        
-        sessions_to_remove = []
-        for session_id, session in self.active_sessions.items():
-            created_at = datetime.fromisoformat(session["created_at"]).timestamp()
-            
-            # Check if session is old and has no active participants
-            if created_at < cutoff_time:
-                active_participants = [
-                    p for p in session["participants"].values() 
-                    if p.get("is_active", False)
-                ]
-                
-                if not active_participants:
-                    sessions_to_remove.append(session_id)
-        
-        for session_id in sessions_to_remove:
-            del self.active_sessions[session_id]
-            if session_id in self.change_history:
-                del self.change_history[session_id]
\ No newline at end of file
+        stale = await self.redis.zrangebyscore(self._index_key, "-inf", cutoff_time)
+        evicted = []
+
+        for session_id in stale:
+            participants = await self._load_participants(session_id)
+            if any(p.get("is_active", False) for p in participants.values()):
+                continue
+
+            try:
+                session = await self._load_session(session_id)
+            except ValueError:
+                # Index entry without a session document: leftovers with nothing to archive
+                session = None
+            if session is not None and not await self._archive_session(archive, session_id, session, participants):
+                continue
+
+            lock_keys = [key async for key in self.redis.scan_iter(match=self._lock_key(session_id, "*"))]
+            await self.redis.delete(
+                self._session_key(session_id),
+                self._participants_key(session_id),
+                self._changes_key(session_id),
+                self._clock_key(session_id),
+                self._cursors_key(session_id),
+                self._snapshot_key(session_id),
+                *lock_keys
+            )
+            await self.redis.zrem(self._index_key, session_id)
+            evicted.append(session_id)
+
+        return evicted
+
+    def _get_archive(self):
+        if self.archive is None:
+            try:
+                from app.services.s3_service import S3Service
+                self.archive = S3Service()
+            except Exception as e:
+                logger.warning(f"Collaboration archive unavailable: {e}")
+                return None
+        return self.archive if getattr(self.archive, "available", True) else None
+
+    async def _archive_session(self, archive, session_id: str, session: Dict[str, Any],
+                               participants: Dict[str, Dict[str, Any]]) -> bool:
+        """Write the final document and the retained log tail to cold storage"""
+        changes = await self.get_change_history(session_id, limit=self.snapshot_interval)
+        payload = gzip.compress(json.dumps({
+            "session_id": session_id,
+            **session,
+            "participants": participants,
+            "vector": await self.redis.hgetall(self._clock_key(session_id)),
+            "changes": changes,
+            "archived_at": datetime.utcnow().isoformat()
+        }, default=str).encode("utf-8"))
+
+        key = f"{self.ARCHIVE_PREFIX}/{session['curriculum_id']}/{session_id}.json.gz"
+        try:
+            url = await asyncio.to_thread(archive.upload_file, payload, key, "application/gzip")
+        except Exception as e:
+            logger.error(f"Archive upload for collaboration session {session_id} raised: {e}")
+            url = None
+        if not url:
+            logger.error(f"Keeping collaboration session {session_id}: archive upload failed")
+            return False
+        return True
+
+    async def _load_session(self, session_id: str) -> Dict[str, Any]:
+        raw = await self.redis.hgetall(self._session_key(session_id))
+        if not raw:
+            raise ValueError("Session not found")
+
+        return {
+            "curriculum_id": int(raw["curriculum_id"]),
+            "created_by": int(raw["created_by"]) if raw["created_by"].isdigit() else raw["created_by"],
+            "created_at": raw["created_at"],
+            "document_state": json.loads(raw.get("document_state") or "{}"),
+            "version": int(raw.get("version") or 0)
+        }
+
+    async def _load_participants(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        raw = await self.redis.hgetall(self._participants_key(session_id))
+        cursors = await self.redis.hgetall(self._cursors_key(session_id))
+        participants = {user_id: json.loads(data) for user_id, data in raw.items()}
+        for user_id, position in cursors.items():
+            if user_id in participants:
+                participants[user_id]["cursor_position"] = json.loads(position)
+        return participants
+
+    async def _update_participant(self, session_id: str, user_id: int,
+                                  updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge updates into a participant record atomically"""
+        key = self._participants_key(session_id)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.hget(key, str(user_id))
+                    if raw is None:
+                        await pipe.unwatch()
+                        return None
+                    participant = {**json.loads(raw), **updates}
+                    pipe.multi()
+                    pipe.hset(key, str(user_id), json.dumps(participant, default=str))
+                    self._touch(pipe, session_id)
+                    await pipe.execute()
+                    return participant
+                except WatchError:
+                    continue
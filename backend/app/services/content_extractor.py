@@ -1,6 +1,7 @@
 import io
 import logging
-from typing import Optional
+from collections import Counter
+from typing import Optional, Iterable, Iterator, Union
 import PyPDF2
 from docx import Document
 
@@ -12,14 +13,7 @@ class ContentExtractor:
     def extract_from_pdf(self, content: bytes) -> str:
         """Extract text from PDF content"""
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            return "".join(self.iter_pdf_text(content)).strip()
             
         except Exception as e:
             logger.error(f"PDF extraction error: {e}")
@@ -28,19 +22,24 @@ class ContentExtractor:
     def extract_from_docx(self, content: bytes) -> str:
         """Extract text from DOCX content"""
         try:
-            docx_file = io.BytesIO(content)
-            doc = Document(docx_file)
-            
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
+            return "".join(self.iter_docx_text(content)).strip()
             
         except Exception as e:
             logger.error(f"DOCX extraction error: {e}")
             return "DOCX content extraction failed - using fallback processing"
     
+    def iter_pdf_text(self, content: bytes) -> Iterator[str]:
+        """Yield the text of each PDF page in turn"""
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+        for page in pdf_reader.pages:
+            yield page.extract_text() + "\n"
+    
+    def iter_docx_text(self, content: bytes) -> Iterator[str]:
+        """Yield DOCX paragraphs in turn"""
+        doc = Document(io.BytesIO(content))
+        for paragraph in doc.paragraphs:
+            yield paragraph.text + "\n"
+    
     def extract_from_text(self, content: bytes) -> str:
         """Extract text from plain text files"""
         try:
@@ -49,65 +48,106 @@ class ContentExtractor:
             logger.error(f"Text extraction error: {e}")
             return "Text content extraction failed"
     
-    def analyze_content(self, text: str) -> dict:
-        """Analyze extracted content for AI processing"""
-        word_count = len(text.split())
-        char_count = len(text)
-        
-        # Simple content analysis
-        analysis = {
-            "word_count": word_count,
-            "character_count": char_count,
-            "estimated_reading_time": max(1, word_count // 200),
-            "content_type": self._detect_content_type(text),
-            "complexity_level": self._assess_complexity(text),
-            "key_topics": self._extract_key_topics(text)
+    def analyze_content(self, text: Union[str, Iterable[str]]) -> dict:
+        """Analyze extracted content for AI processing
+
+        Accepts the full text or an iterable of chunks (e.g. iter_pdf_text),
+        which is consumed in one pass without being joined.
+        """
+        analyzer = ContentAnalyzer()
+        if isinstance(text, str):
+            analyzer.feed(text)
+        else:
+            for chunk in text:
+                analyzer.feed(chunk)
+        return analyzer.result()
+
+# Domain keywords, checked in order; the first domain with a hit wins
+CONTENT_TYPE_KEYWORDS = [
+    ("computer_science", ("algorithm", "programming", "code", "function")),
+    ("mathematics", ("equation", "formula", "calculate", "mathematics")),
+    ("science", ("experiment", "hypothesis", "theory", "science")),
+    ("history", ("history", "historical", "century", "period"))
+]
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
+})
+
+MAX_CARRY = 64 * 1024
+
+class ContentAnalyzer:
+    """Single-pass analyzer: feed text chunks, then read all metrics at once
+
+    Only running counters are kept. A word cut off at the end of a chunk is
+    held back and joined to the start of the next one.
+    """
+
+    def __init__(self, max_topics: int = 5):
+        self.max_topics = max_topics
+        self.word_count = 0
+        self.char_count = 0
+        self.word_length_total = 0
+        self.domains_found = set()
+        self.topic_counts = Counter()
+        self._carry = ""
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self.char_count += len(chunk)
+        text, self._carry = self._carry + chunk, ""
+        if not text[-1].isspace():
+            cut = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t")) + 1
+            # Bounded, so input without whitespace still streams
+            if len(text) - cut <= MAX_CARRY:
+                text, self._carry = text[:cut], text[cut:]
+        self._consume(text)
+
+    def _consume(self, text: str):
+        lowered = text.lower()
+        words = lowered.split()
+        self.word_count += len(words)
+        self.word_length_total += sum(map(len, words))
+
+        for domain, keywords in CONTENT_TYPE_KEYWORDS:
+            if domain not in self.domains_found and any(k in lowered for k in keywords):
+                self.domains_found.add(domain)
+
+        self.topic_counts.update(
+            w for w in words if len(w) > 4 and w.isalpha() and w not in STOP_WORDS
+        )
+
+    def result(self) -> dict:
+        if self._carry:
+            self._consume(self._carry)
+            self._carry = ""
+
+        return {
+            "word_count": self.word_count,
+            "character_count": self.char_count,
+            "estimated_reading_time": max(1, self.word_count // 200),
+            "content_type": self.content_type(),
+            "complexity_level": self.complexity_level(),
+            "key_topics": [word for word, _ in self.topic_counts.most_common(self.max_topics)]
         }
-        
-        return analysis
-    
-    def _detect_content_type(self, text: str) -> str:
+
+    def content_type(self) -> str:
         """Detect the type of educational content"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['algorithm', 'programming', 'code', 'function']):
-            return "computer_science"
-        elif any(word in text_lower for word in ['equation', 'formula', 'calculate', 'mathematics']):
-            return "mathematics"
-        elif any(word in text_lower for word in ['experiment', 'hypothesis', 'theory', 'science']):
-            return "science"
-        elif any(word in text_lower for word in ['history', 'historical', 'century', 'period']):
-            return "history"
-        else:
-            return "general_education"
-    
-    def _assess_complexity(self, text: str) -> str:
-        """Assess content complexity level"""
-        words = text.split()
-        avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
-        
+        for domain, _ in CONTENT_TYPE_KEYWORDS:
+            if domain in self.domains_found:
+                return domain
+        return "general_education"
+
+    def complexity_level(self) -> str:
+        """Assess content complexity level from average word length"""
+        avg_word_length = self.word_length_total / self.word_count if self.word_count else 0
+
         if avg_word_length < 4:
             return "elementary"
         elif avg_word_length < 5.5:
             return "intermediate"
         else:
             return "advanced"
-    
-    def _extract_key_topics(self, text: str) -> list:
-        """Extract key topics from content"""
-        # Simple keyword extraction
-        words = text.lower().split()
-        
-        # Filter out common words and get meaningful terms
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
-        
-        meaningful_words = [word for word in words if len(word) > 4 and word not in stop_words and word.isalpha()]
-        
-        # Get most frequent meaningful words as topics
-        word_freq = {}
-        for word in meaningful_words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Return top 5 most frequent words as key topics
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:5]]
\ No newline at end of file
@@ -0,0 +1,394 @@
+"""
+Document rendering for curriculum exports
+Layouts are declarative element lists. Each is compiled once per (layout,
+variant, format) into path accessors and resolved styles, then cached.
+Rendering walks the data into a stream of blocks; the PDF writer lays them
+out and emits the file page by page, and DOCX output goes through python-docx.
+"""
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, BinaryIO
+from app.services.json_path import compile_path, CompiledPath
+
+# Element types: title, heading, paragraph, bullets, fields (dict as label:
+# value lines), table (list of dicts), matrix (dict of dicts), section
+# (repeat children for each item at path). "only" limits an element to
+# variants.
+LAYOUTS: Dict[str, List[Dict[str, Any]]] = {
+    "lesson_plan": [
+        {"type": "title", "path": "curriculum_overview", "default": "Curriculum Plan"},
+        {"type": "heading", "text": "Learning Objectives"},
+        {"type": "bullets", "path": "learning_objectives"},
+        {"type": "section", "path": "weekly_modules", "children": [
+            {"type": "heading", "path": "title", "level": 2},
+            {"type": "paragraph", "path": "bloom_focus", "format": "Bloom focus: {}"},
+            {"type": "bullets", "path": "learning_outcomes"},
+            {"type": "section", "path": "content_blocks", "only": ["detailed"], "children": [
+                {"type": "heading", "path": "title", "level": 3},
+                {"type": "paragraph", "path": "description"},
+                {"type": "paragraph", "path": "estimated_duration", "format": "Duration: {} minutes"},
+                {"type": "bullets", "path": "activities", "item": "title"}
+            ]},
+            {"type": "bullets", "path": "formative_assessments", "item": "title", "only": ["detailed"]},
+            {"type": "paragraph", "path": "summative_assessment.title", "format": "Summative assessment: {}"}
+        ]},
+        {"type": "heading", "text": "Assessment Strategy"},
+        {"type": "fields", "path": "assessment_strategy"}
+    ],
+    "project_rubric": [
+        {"type": "title", "path": "title", "default": "Project Rubric"},
+        {"type": "paragraph", "path": "description"},
+        {"type": "paragraph", "path": "duration_weeks", "format": "Duration: {} weeks"},
+        {"type": "heading", "text": "Project Steps"},
+        {"type": "table", "path": "scaffolds", "columns": [["Step", "step"], ["Task", "task"], ["Support", "support"]]},
+        {"type": "heading", "text": "Rubric"},
+        {"type": "matrix", "path": "rubric", "label": "Criterion"}
+    ],
+    "student_report": [
+        {"type": "title", "path": "student_name", "default": "Student Report"},
+        {"type": "paragraph", "path": "title"},
+        {"type": "fields", "path": "summary"},
+        {"type": "heading", "text": "Questions"},
+        {"type": "table", "path": "questions", "columns": [
+            ["Question", "question"], ["Answer", "answer"], ["Points", "points"], ["Feedback", "feedback"]
+        ]}
+    ],
+    "assessment_report": [
+        {"type": "title", "path": "title", "default": "Assessment Report"},
+        {"type": "fields", "path": "summary"},
+        {"type": "heading", "text": "Student Results"},
+        {"type": "table", "path": "student_results", "columns": [
+            ["Student", "student_name"], ["Score", "score"], ["Percentage", "percentage"], ["Grade", "grade"]
+        ]}
+    ]
+}
+
+STYLES: Dict[str, Dict[str, Any]] = {
+    "pdf": {
+        "title": {"font": "F2", "size": 20, "before": 0, "after": 10},
+        "heading1": {"font": "F2", "size": 15, "before": 12, "after": 4},
+        "heading2": {"font": "F2", "size": 13, "before": 10, "after": 3},
+        "heading3": {"font": "F2", "size": 11, "before": 8, "after": 2},
+        "body": {"font": "F1", "size": 10, "before": 0, "after": 4},
+        "bullet": {"font": "F1", "size": 10, "before": 0, "after": 1, "indent": 14},
+        "table": {"font": "F1", "size": 9, "header_font": "F2", "before": 2, "after": 8}
+    },
+    "docx": {
+        "title": {"heading": 0},
+        "heading1": {"heading": 1},
+        "heading2": {"heading": 2},
+        "heading3": {"heading": 3},
+        "body": {"style": None},
+        "bullet": {"style": "List Bullet"},
+        "table": {"style": "Table Grid"}
+    }
+}
+
+class Element:
+    """One compiled layout element"""
+
+    __slots__ = ("type", "path", "text", "default", "format", "item", "columns", "label", "children", "style")
+
+    def __init__(self, spec: Dict[str, Any], variant: str, fmt: str):
+        self.type = spec["type"]
+        self.path: Optional[CompiledPath] = compile_path(spec["path"]) if "path" in spec else None
+        self.text = spec.get("text")
+        self.default = spec.get("default")
+        self.format = spec.get("format")
+        self.item = compile_path(spec["item"]) if "item" in spec else None
+        self.columns = tuple((label, compile_path(path)) for label, path in spec.get("columns", []))
+        self.label = spec.get("label", "")
+        self.children = _compile_elements(spec.get("children", []), variant, fmt)
+
+        style_name = {
+            "title": "title",
+            "heading": f"heading{spec.get('level', 1)}",
+            "bullets": "bullet",
+            "table": "table",
+            "matrix": "table"
+        }.get(self.type, "body")
+        self.style = STYLES[fmt][style_name]
+
+def _compile_elements(specs: List[Dict[str, Any]], variant: str, fmt: str) -> Tuple[Element, ...]:
+    return tuple(Element(spec, variant, fmt) for spec in specs if variant in spec.get("only", [variant]))
+
+@lru_cache(maxsize=64)
+def compile_layout(layout: str, variant: str = "detailed", fmt: str = "pdf") -> Tuple[Element, ...]:
+    """Compiled, cached element tree for a layout"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+    if fmt not in STYLES:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return _compile_elements(LAYOUTS[layout], variant, fmt)
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.1f}".rstrip("0").rstrip(".")
+    return str(value)
+
+def _humanize(key: str) -> str:
+    return str(key).replace("_", " ").strip().capitalize()
+
+# Blocks: (kind, payload, style) with kind heading/paragraph/bullets/table
+Block = Tuple[str, Any, Dict[str, Any]]
+
+def iter_blocks(elements: Iterable[Element], data: Any) -> Iterator[Block]:
+    """Walk data through compiled elements, yielding renderable blocks"""
+    for element in elements:
+        value = element.path.get(data) if element.path else None
+
+        if element.type == "section":
+            for item in value if isinstance(value, list) else ([value] if value else []):
+                yield from iter_blocks(element.children, item)
+        elif element.type in ("title", "heading"):
+            text = element.text or _text(value) or element.default
+            if text:
+                yield "heading", text, element.style
+        elif element.type == "paragraph":
+            if value not in (None, "", [], {}):
+                yield "paragraph", element.format.format(_text(value)) if element.format else _text(value), element.style
+        elif element.type == "bullets":
+            items = [_text(element.item.get(i) if element.item and isinstance(i, dict) else i)
+                     for i in (value or [])]
+            if items:
+                yield "bullets", items, element.style
+        elif element.type == "fields":
+            for key, field in (value or {}).items():
+                yield "paragraph", f"{_humanize(key)}: {_text(field)}", element.style
+        elif element.type == "table":
+            rows = value or []
+            if rows:
+                header = [label for label, _ in element.columns]
+                yield "table", (header, ([_text(path.get(row)) for _, path in element.columns] for row in rows)), element.style
+        elif element.type == "matrix":
+            matrix = value or {}
+            levels = list(dict.fromkeys(level for row in matrix.values() for level in row))
+            if matrix:
+                header = [element.label] + [_humanize(level) for level in levels]
+                rows = ([_humanize(name)] + [_text(row.get(level)) for level in levels] for name, row in matrix.items())
+                yield "table", (header, rows), element.style
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+_BOLD_FACTOR = 1.08
+
+def text_width(text: str, font: str, size: float) -> float:
+    units = sum(_HELVETICA[ord(c) - 32] if 32 <= ord(c) < 127 else 556 for c in text)
+    if font == "F2":
+        units *= _BOLD_FACTOR
+    return units * size / 1000
+
+def wrap_text(text: str, font: str, size: float, width: float) -> List[str]:
+    """Greedy word wrap; words longer than a line are broken"""
+    lines = []
+    for paragraph in str(text).split("\n"):
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, font, size) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while text_width(word, font, size) > width:
+                cut = max(1, int(len(word) * width / text_width(word, font, size)))
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class PdfWriter:
+    """Streaming PDF writer using the standard Helvetica fonts
+
+    Objects are emitted as soon as a page is complete; only the current
+    page's content and the xref offsets are held in memory.
+    """
+
+    PAGE_SIZE = (612, 792)  # US Letter in points
+    MARGIN = 54
+    CATALOG, PAGES, FONT_REGULAR, FONT_BOLD = 1, 2, 3, 4
+
+    def __init__(self, title: str = ""):
+        self.title = title
+        self.width, self.height = self.PAGE_SIZE
+        self.content_width = self.width - 2 * self.MARGIN
+        self._offset = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_id = 5
+        self._pages: List[int] = []
+        self._ops: List[bytes] = []
+        self._out: List[bytes] = []
+        self._y = 0.0
+
+    def _emit(self, data: bytes):
+        self._out.append(data)
+        self._offset += len(data)
+
+    def _object(self, obj_id: int, body: bytes):
+        self._offsets[obj_id] = self._offset
+        self._emit(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _start_page(self):
+        self._ops = []
+        self._y = self.height - self.MARGIN
+
+    def _finish_page(self):
+        number = len(self._pages) + 1
+        footer = b"%d" % number
+        x = (self.width - text_width(str(number), "F1", 8)) / 2
+        self._ops.append(b"BT /F1 8 Tf %.2f %.2f Td (" % (x, self.MARGIN / 2) + footer + b") Tj ET")
+
+        stream = zlib.compress(b"\n".join(self._ops))
+        content_id, page_id = self._new_id(), self._new_id()
+        self._object(content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        self._object(page_id, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+        ) % (self.PAGES, self.width, self.height, self.FONT_REGULAR, self.FONT_BOLD, content_id))
+        self._pages.append(page_id)
+        self._start_page()
+
+    def _ensure_space(self, height: float):
+        if self._y - height < self.MARGIN and self._y < self.height - self.MARGIN:
+            self._finish_page()
+
+    def _line(self, text: str, font: str, size: float, x: float, leading: float):
+        self._ensure_space(leading)
+        self._y -= leading
+        self._ops.append(b"BT /%s %.1f Tf %.2f %.2f Td " % (font.encode(), size, x, self._y) + _pdf_string(text) + b" Tj ET")
+
+    def _text_block(self, text: str, style: Dict[str, Any], indent: float = 0, prefix: str = ""):
+        font, size = style["font"], style["size"]
+        leading = size * 1.3
+        self._y -= style["before"]
+        lines = wrap_text(text, font, size, self.content_width - indent - style.get("indent", 0))
+        x = self.MARGIN + indent + style.get("indent", 0)
+        for i, line in enumerate(lines):
+            self._line(line, font, size, x, leading)
+            if prefix and i == 0:
+                self._ops.append(b"BT /%s %.1f Tf %.2f %.2f Td " % (font.encode(), size, x - 10, self._y)
+                                 + _pdf_string(prefix) + b" Tj ET")
+        self._y -= style["after"]
+
+    def _table(self, header: List[str], rows: Iterable[List[str]], style: Dict[str, Any]):
+        size, pad = style["size"], 3
+        leading = size * 1.25
+        column_width = self.content_width / max(1, len(header))
+        self._y -= style["before"]
+
+        def draw_row(cells: List[str], font: str):
+            wrapped = [wrap_text(cell, font, size, column_width - 2 * pad) for cell in cells]
+            row_height = max(len(lines) for lines in wrapped) * leading + 2 * pad
+            if self._y - row_height < self.MARGIN:
+                self._finish_page()
+                if font != style["header_font"]:
+                    draw_row(header, style["header_font"])
+            top = self._y
+            for column, lines in enumerate(wrapped):
+                x = self.MARGIN + column * column_width
+                self._ops.append(b"0.5 w %.2f %.2f %.2f %.2f re S" % (x, top - row_height, column_width, row_height))
+                for i, line in enumerate(lines):
+                    baseline = top - pad - (i + 1) * leading + (leading - size) / 2
+                    self._ops.append(
+                        b"BT /%s %.1f Tf %.2f %.2f Td " % (font.encode(), size, x + pad, baseline)
+                        + _pdf_string(line) + b" Tj ET"
+                    )
+            self._y = top - row_height
+
+        draw_row(header, style["header_font"])
+        for row in rows:
+            draw_row(row, style["font"])
+            if self._out:
+                # Flush pages completed mid-table
+                yield self._drain()
+        self._y -= style["after"]
+
+    def _drain(self) -> bytes:
+        chunk = b"".join(self._out)
+        self._out = []
+        return chunk
+
+    def render(self, blocks: Iterable[Block]) -> Iterator[bytes]:
+        """Lay out blocks, yielding the file as each page completes"""
+        self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for obj_id, font in ((self.FONT_REGULAR, b"Helvetica"), (self.FONT_BOLD, b"Helvetica-Bold")):
+            self._object(obj_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + font + b" /Encoding /WinAnsiEncoding >>")
+        self._start_page()
+
+        for kind, payload, style in blocks:
+            if kind == "heading":
+                self._ensure_space(style["before"] + style["size"] * 3)
+                self._text_block(payload, style)
+            elif kind == "paragraph":
+                self._text_block(payload, style)
+            elif kind == "bullets":
+                for item in payload:
+                    self._text_block(item, style, prefix="\x95")
+            elif kind == "table":
+                yield from (chunk for chunk in self._table(*payload, style) if chunk)
+            if self._out:
+                yield self._drain()
+
+        self._finish_page()
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._object(self.PAGES, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self._pages))
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        info_id = self._new_id()
+        self._object(info_id, b"<< /Title " + _pdf_string(self.title) + b" /Producer (EdweavePack) >>")
+
+        xref_offset = self._offset
+        size = self._next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self._offsets[obj_id])
+        self._emit(b"".join(xref))
+        self._emit(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            size, self.CATALOG, info_id, xref_offset
+        ))
+        yield self._drain()
+
+def render_pdf(layout: str, data: Dict[str, Any], variant: str = "detailed", title: str = "") -> Iterator[bytes]:
+    """PDF bytes for ``data``, yielded page by page"""
+    return PdfWriter(title).render(iter_blocks(compile_layout(layout, variant, "pdf"), data))
+
+def render_docx(layout: str, data: Dict[str, Any], fileobj: BinaryIO, variant: str = "detailed"):
+    """Write a DOCX for ``data`` to fileobj"""
+    from docx import Document
+
+    document = Document()
+    for kind, payload, style in iter_blocks(compile_layout(layout, variant, "docx"), data):
+        if kind == "heading":
+            document.add_heading(payload, level=style["heading"])
+        elif kind == "paragraph":
+            document.add_paragraph(payload, style=style["style"])
+        elif kind == "bullets":
+            for item in payload:
+                document.add_paragraph(item, style=style["style"])
+        elif kind == "table":
+            header, rows = payload
+            table = document.add_table(rows=1, cols=len(header))
+            table.style = style["style"]
+            for cell, text in zip(table.rows[0].cells, header):
+                cell.text = text
+            for row in rows:
+                for cell, text in zip(table.add_row().cells, row):
+                    cell.text = text
+    document.save(fileobj)
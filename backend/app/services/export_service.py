@@ -1,65 +1,150 @@
-from typing import Dict, Any
-import json
-from datetime import datetime
-import io
+from typing import Dict, Any, BinaryIO, Iterator, Optional
+import asyncio
+import logging
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from app.services.document_renderer import render_pdf, render_docx
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BUCKET = os.getenv("EXPORT_BUCKET", "edweavepack-storage")
+RENDER_WORKERS = int(os.getenv("EXPORT_RENDER_WORKERS", str(min(os.cpu_count() or 2, 4))))
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+}
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Process pool for rendering, so large exports never hold up API workers"""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _render_pool
+
+def render_to_path(layout: str, data: Dict[str, Any], fmt: str, variant: str, path: str) -> int:
+    """Render into a file, page by page for PDF; runs inside the render pool"""
+    with open(path, "wb") as output:
+        if fmt == "pdf":
+            for chunk in render_pdf(layout, data, variant, title=str(data.get("title", ""))):
+                output.write(chunk)
+        elif fmt == "docx":
+            render_docx(layout, data, output, variant)
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return output.tell()
 
 class ExportService:
-    def __init__(self):
-        # Mock export service for development
-        self.mock_mode = True
-    
+    def __init__(self, s3_client=None, bucket: str = EXPORT_BUCKET):
+        self._s3_client = s3_client
+        self.bucket = bucket
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client("s3")
+        return self._s3_client
+
+    def render(self, layout: str, data: Dict[str, Any], fmt: str = "pdf", variant: str = "detailed") -> bytes:
+        """Render in-process and return the whole document"""
+        if fmt == "pdf":
+            return b"".join(render_pdf(layout, data, variant, title=str(data.get("title", ""))))
+        with tempfile.TemporaryFile() as output:
+            render_docx(layout, data, output, variant)
+            output.seek(0)
+            return output.read()
+
+    async def render_file(self, layout: str, data: Dict[str, Any], fmt: str = "pdf",
+                          variant: str = "detailed") -> str:
+        """Render in the worker pool to a temporary file; the caller removes it"""
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}", prefix="export_")
+        os.close(fd)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                get_render_pool(), render_to_path, layout, data, fmt, variant, path
+            )
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    async def stream_export(self, layout: str, data: Dict[str, Any], fmt: str = "pdf",
+                            variant: str = "detailed") -> Iterator[bytes]:
+        """Render off the event loop, then return the finished file in chunks for a StreamingResponse
+
+        Rendering errors are raised here, before any response has started.
+        """
+        path = await self.render_file(layout, data, fmt, variant)
+        try:
+            # The open handle keeps the data; nothing is left on disk if the stream is never read
+            source = open(path, "rb")
+        finally:
+            os.unlink(path)
+        return _read_chunks(source)
+
+    async def upload_export(self, layout: str, data: Dict[str, Any], key: str, fmt: str = "pdf",
+                            variant: str = "detailed") -> str:
+        """Render in the worker pool and upload from disk (multipart, never whole in memory)"""
+        path = await self.render_file(layout, data, fmt, variant)
+        try:
+            await asyncio.to_thread(
+                self.s3_client.upload_file, path, self.bucket, key,
+                ExtraArgs={"ContentType": MEDIA_TYPES[fmt]}
+            )
+        finally:
+            os.unlink(path)
+        return f"s3://{self.bucket}/{key}"
+
     def export_lesson_plan_pdf(self, curriculum_data: Dict[str, Any], format_type: str = "detailed") -> bytes:
-        """Mock PDF export - returns JSON as bytes for development"""
-        mock_pdf_content = {
-            "type": "PDF Export",
-            "title": curriculum_data.get('curriculum_overview', 'Curriculum Plan'),
-            "format": format_type,
-            "generated_at": datetime.now().isoformat(),
-            "content": "Mock PDF content - would be actual PDF in production"
-        }
-        return json.dumps(mock_pdf_content, indent=2).encode('utf-8')
-    
+        """Lesson plan PDF; format_type is detailed or summary"""
+        return self.render("lesson_plan", curriculum_data, "pdf", format_type)
+
     def export_lesson_plan_docx(self, curriculum_data: Dict[str, Any]) -> bytes:
-        """Mock DOCX export - returns JSON as bytes for development"""
-        mock_docx_content = {
-            "type": "DOCX Export",
-            "title": curriculum_data.get('curriculum_overview', 'Curriculum Plan'),
-            "generated_at": datetime.now().isoformat(),
-            "content": "Mock DOCX content - would be actual Word document in production"
-        }
-        return json.dumps(mock_docx_content, indent=2).encode('utf-8')
-    
+        """Lesson plan as a Word document"""
+        return self.render("lesson_plan", curriculum_data, "docx")
+
     def generate_shareable_link(self, curriculum_id: int, user_id: int) -> str:
         """Generate shareable link for curriculum"""
         # In production, this would use a proper URL shortener or token system
         import hashlib
         import time
-        
+
         # Create a simple hash-based link
         data = f"{curriculum_id}-{user_id}-{int(time.time())}"
         link_hash = hashlib.md5(data.encode()).hexdigest()[:12]
-        
+
         # Return shareable URL (would be actual domain in production)
         return f"https://edweavepack.com/shared/{link_hash}"
-    
+
     def export_project_rubric(self, project_data: Dict[str, Any]) -> bytes:
-        """Mock rubric export - returns JSON as bytes for development"""
-        mock_rubric_content = {
-            "type": "Rubric Export",
-            "title": project_data.get('title', 'Project Rubric'),
-            "generated_at": datetime.now().isoformat(),
-            "content": "Mock rubric content - would be actual PDF rubric in production"
-        }
-        return json.dumps(mock_rubric_content, indent=2).encode('utf-8')
-    
+        """Project steps and rubric as PDF"""
+        return self.render("project_rubric", project_data)
+
     def export_assessment_report(self, assessment_data: Dict[str, Any], student_results: list) -> bytes:
-        """Mock assessment report export - returns JSON as bytes for development"""
-        mock_report_content = {
-            "type": "Assessment Report",
-            "title": assessment_data.get('title', 'Assessment Report'),
-            "generated_at": datetime.now().isoformat(),
-            "student_count": len(student_results),
-            "content": "Mock assessment report - would be actual PDF report in production"
-        }
-        return json.dumps(mock_report_content, indent=2).encode('utf-8')
\ No newline at end of file
+        """Assessment summary and per-student results as PDF"""
+        return self.render("assessment_report", self.assessment_report_data(assessment_data, student_results))
+
+    @staticmethod
+    def assessment_report_data(assessment_data: Dict[str, Any], student_results: list) -> Dict[str, Any]:
+        percentages = [r["percentage"] for r in student_results if isinstance(r.get("percentage"), (int, float))]
+        summary = {"students": len(student_results)}
+        if percentages:
+            summary.update({
+                "average_percentage": round(sum(percentages) / len(percentages), 1),
+                "highest_percentage": max(percentages),
+                "lowest_percentage": min(percentages)
+            })
+        return {**assessment_data, "summary": summary, "student_results": student_results}
+
+def _read_chunks(source: BinaryIO) -> Iterator[bytes]:
+    with source:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
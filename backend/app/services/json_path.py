@@ -0,0 +1,226 @@
+"""
+Compiled paths into nested curriculum JSON
+Paths are parsed once into cached accessors: JSON Pointer ("/modules/0/title"),
+dotted ("modules.0.title" or "modules[0].title") or a list of segments.
+Canonical array indices ("0", "7", not "007") index lists; on dicts every
+segment is used as a string key, so "007" and "7" stay distinct keys.
+"""
+import copy
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+PathSegment = Union[str, int]
+PathLike = Union[str, List[PathSegment], Tuple[PathSegment, ...], None]
+
+MISSING = object()
+
+_BRACKET_INDEX = re.compile(r"\[(\d+)\]")
+# RFC 6901 array index: no leading zeros, ASCII digits only
+_ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+def _segment(raw: Any) -> PathSegment:
+    # Only a segment that can be a list index is held as an int; anything else
+    # keeps its exact text for dict lookups
+    return int(raw) if isinstance(raw, str) and _ARRAY_INDEX.fullmatch(raw) else raw
+
+def _list_index(container: list, segment: PathSegment) -> Optional[int]:
+    """``segment`` as a position in ``container``, or None if it does not name one"""
+    if isinstance(segment, str) and _ARRAY_INDEX.fullmatch(segment):
+        segment = int(segment)
+    if isinstance(segment, int) and not isinstance(segment, bool) and 0 <= segment < len(container):
+        return segment
+    return None
+
+@lru_cache(maxsize=2048)
+def _compile(path: Union[str, Tuple[PathSegment, ...]]) -> "CompiledPath":
+    if isinstance(path, tuple):
+        return CompiledPath(tuple(_segment(s) for s in path))
+    if path == "" or path == "/":
+        return CompiledPath(())
+    if path.startswith("/"):
+        # RFC 6901: ~1 is '/', ~0 is '~'
+        raw = [s.replace("~1", "/").replace("~0", "~") for s in path[1:].split("/")]
+    else:
+        raw = _BRACKET_INDEX.sub(r".\1", path).split(".")
+    return CompiledPath(tuple(_segment(s) for s in raw if s != ""))
+
+def compile_path(path: PathLike) -> "CompiledPath":
+    """Parsed, cached accessor for ``path``"""
+    if isinstance(path, CompiledPath):
+        return path
+    if path is None:
+        return _compile("")
+    if isinstance(path, list):
+        path = tuple(path)
+    return _compile(path)
+
+def _step(container: Any, segment: PathSegment) -> Any:
+    if isinstance(container, list):
+        index = _list_index(container, segment)
+        return MISSING if index is None else container[index]
+    if isinstance(container, dict):
+        return container.get(str(segment), MISSING)
+    return MISSING
+
+class CompiledPath:
+    """Accessor for one path; all operations mutate the document in place"""
+
+    __slots__ = ("segments", "parent_segments", "leaf")
+
+    def __init__(self, segments: Tuple[PathSegment, ...]):
+        self.segments = segments
+        self.parent_segments = segments[:-1]
+        self.leaf = segments[-1] if segments else None
+
+    def __repr__(self) -> str:
+        return f"CompiledPath({'.'.join(str(s) for s in self.segments)!r})"
+
+    def resolve(self, document: Any, segments: Tuple[PathSegment, ...] = None) -> Any:
+        current = document
+        for segment in self.segments if segments is None else segments:
+            current = _step(current, segment)
+            if current is MISSING:
+                break
+        return current
+
+    def get(self, document: Any, default: Any = None) -> Any:
+        value = self.resolve(document)
+        return default if value is MISSING else value
+
+    def exists(self, document: Any) -> bool:
+        return self.resolve(document) is not MISSING
+
+    def _parent(self, document: Any, create: bool) -> Any:
+        current = document
+        for segment in self.parent_segments:
+            child = _step(current, segment)
+            if child is MISSING:
+                if not (create and isinstance(current, dict)):
+                    return MISSING
+                child = current[str(segment)] = {}
+            current = child
+        return current
+
+    def set(self, document: Any, value: Any, create: bool = True) -> bool:
+        """Assign at the path, creating missing intermediate objects if ``create``"""
+        if not self.segments:
+            return False
+        return _assign(self._parent(document, create), self.leaf, value)
+
+    def insert(self, document: Any, value: Any, index: Optional[int] = None) -> Optional[int]:
+        """Insert into the list at the path (append if index is None); returns the index used"""
+        target = self.resolve(document)
+        if not isinstance(target, list):
+            return None
+        index = len(target) if index is None else max(0, min(index, len(target)))
+        target.insert(index, value)
+        return index
+
+    def remove(self, document: Any, index: Optional[int] = None) -> Any:
+        """Remove ``index`` from the list at the path, or the path's own key/element"""
+        if index is not None:
+            container, key = self.resolve(document), index
+        elif self.segments:
+            container, key = self._parent(document, False), self.leaf
+        else:
+            return MISSING
+
+        if isinstance(container, list):
+            index = _list_index(container, key)
+            return MISSING if index is None else container.pop(index)
+        if isinstance(container, dict) and str(key) in container:
+            return container.pop(str(key))
+        return MISSING
+
+def _assign(container: Any, key: PathSegment, value: Any) -> bool:
+    if isinstance(container, list):
+        index = _list_index(container, key)
+        if index is None:
+            return False
+        container[index] = value
+        return True
+    if isinstance(container, dict):
+        container[str(key)] = value
+        return True
+    return False
+
+def get_path(document: Any, path: PathLike, default: Any = None) -> Any:
+    return compile_path(path).get(document, default)
+
+def set_path(document: Any, path: PathLike, value: Any, create: bool = True) -> bool:
+    return compile_path(path).set(document, value, create)
+
+def apply_patches(document: Any, patches: List[Dict[str, Any]], copy_values: bool = False) -> List[bool]:
+    """Apply set/insert/remove patches in order, in one pass over the batch
+
+    Containers resolved for one patch are reused by later patches that share
+    a parent; a structural change drops the cached container at its path and
+    everything underneath it.
+    Returns whether each patch applied.
+    """
+    containers: Dict[Tuple[PathSegment, ...], Any] = {(): document}
+    results = []
+
+    def container_at(segments: Tuple[PathSegment, ...], create: bool) -> Any:
+        if segments in containers:
+            return containers[segments]
+        parent = container_at(segments[:-1], create)
+        child = _step(parent, segments[-1]) if parent is not MISSING else MISSING
+        if child is MISSING and create and isinstance(parent, dict):
+            child = parent[str(segments[-1])] = {}
+        if child is not MISSING:
+            containers[segments] = child
+        return child
+
+    def invalidate(prefix: Tuple[PathSegment, ...]):
+        depth = len(prefix)
+        # The root is the document itself and never goes stale
+        for key in [k for k in containers if k and len(k) >= depth and k[:depth] == prefix]:
+            del containers[key]
+
+    for patch in patches:
+        compiled = compile_path(patch.get("path"))
+        op = patch.get("op", "set")
+        value = copy.deepcopy(patch.get("value")) if copy_values else patch.get("value")
+
+        if op == "set":
+            if not compiled.segments:
+                results.append(False)
+                continue
+            parent = container_at(compiled.parent_segments, patch.get("create", True))
+            applied = parent is not MISSING and _assign(parent, compiled.leaf, value)
+            if applied:
+                invalidate(compiled.segments)
+        elif op == "insert":
+            target = container_at(compiled.segments, False)
+            applied = isinstance(target, list)
+            if applied:
+                index = patch.get("index")
+                target.insert(len(target) if index is None else max(0, min(index, len(target))), value)
+                invalidate(compiled.segments)
+        elif op == "remove":
+            index = patch.get("index")
+            if index is None:
+                container, key = container_at(compiled.parent_segments, False), compiled.leaf
+                prefix = compiled.parent_segments
+            else:
+                container, key = container_at(compiled.segments, False), index
+                prefix = compiled.segments
+            applied = False
+            if isinstance(container, list):
+                position = _list_index(container, key)
+                if position is not None:
+                    container.pop(position)
+                    applied = True
+            elif isinstance(container, dict) and str(key) in container:
+                container.pop(str(key))
+                applied = True
+            if applied:
+                invalidate(prefix)
+        else:
+            raise ValueError(f"Unsupported patch op: {op}")
+
+        results.append(applied)
+
+    return results
@@ -0,0 +1,175 @@
+"""
+Incrementally maintained learning-path analytics
+Running totals live in the path's ai_data["analytics"] and are updated in
+O(1) when a milestone is completed, so analytics reads never walk the
+milestone list. recompute() rebuilds them from the milestones when a
+completion arrives out of time order; backfill() stores them once for
+paths that have none, as a separate step rather than on read.
+Completion times are stored as timezone-aware UTC ISO strings; naive
+values are taken to be UTC.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Union
+
+ANALYTICS_KEY = "analytics"
+STREAK_THRESHOLD = 0.7  # performance score that keeps a streak going
+RECENT_WINDOW = 3
+
+def empty_stats(total_milestones: int = 0) -> Dict[str, Any]:
+    return {
+        "total_milestones": total_milestones,
+        "completed": 0,
+        "score_sum": 0.0,
+        "score_min": None,
+        "score_max": None,
+        "recent_scores": [],
+        "recent_ids": [],  # milestone ids behind recent_scores, oldest first
+        "time_spent": 0,
+        "streak": 0,
+        "first_completion": None,
+        "last_completion": None,
+        "scores": {}  # milestone id -> score, to undo a re-completion
+    }
+
+def _parse_time(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """``value`` as an aware UTC datetime; None if missing or unparseable"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _completion_order(milestone: Dict[str, Any]):
+    # Undated completions first, then in time order
+    completed_at = _parse_time(milestone.get("completion_time"))
+    return completed_at is not None, completed_at or datetime.min.replace(tzinfo=timezone.utc)
+
+def _score(milestone: Dict[str, Any]) -> float:
+    return milestone.get("performance_score") or 0.0
+
+def record_completion(stats: Dict[str, Any], milestone: Dict[str, Any], total_milestones: int) -> Dict[str, Any]:
+    """Fold one completed milestone into ``stats`` in place; returns stats
+
+    Returns None when the completion predates the latest one recorded, in
+    which case the streak depends on ordering and the caller should
+    recompute from the milestones.
+    """
+    completed_at = _parse_time(milestone.get("completion_time"))
+    last_completion = _parse_time(stats["last_completion"])
+    if completed_at and last_completion and completed_at < last_completion:
+        return None
+
+    score = _score(milestone)
+    milestone_id = str(milestone.get("id"))
+    previous = stats["scores"].get(milestone_id)
+
+    stats["total_milestones"] = total_milestones
+    if previous is None:
+        stats["completed"] += 1
+        stats["time_spent"] += milestone.get("time_spent", 0) or 0
+    else:
+        # Re-completion replaces the earlier score
+        stats["score_sum"] -= previous
+    stats["scores"][milestone_id] = score
+    stats["score_sum"] += score
+    if previous is None:
+        stats["score_min"] = score if stats["score_min"] is None else min(stats["score_min"], score)
+        stats["score_max"] = score if stats["score_max"] is None else max(stats["score_max"], score)
+    else:
+        # The replaced score may have been the extreme
+        stats["score_min"] = min(stats["scores"].values())
+        stats["score_max"] = max(stats["scores"].values())
+
+    recent_ids = [i for i in stats["recent_ids"] if i != milestone_id] + [milestone_id]
+    stats["recent_ids"] = recent_ids[-RECENT_WINDOW:]
+    stats["recent_scores"] = [stats["scores"][i] for i in stats["recent_ids"]]
+    stats["streak"] = stats["streak"] + 1 if score >= STREAK_THRESHOLD else 0
+
+    if completed_at:
+        stats["first_completion"] = stats["first_completion"] or completed_at.isoformat()
+        stats["last_completion"] = completed_at.isoformat()
+    return stats
+
+def recompute(milestones: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild stats from the full milestone list (backfill and repair)"""
+    stats = empty_stats(len(milestones))
+    completed = [m for m in milestones if m.get("completed", False)]
+    completed.sort(key=_completion_order)
+    for milestone in completed:
+        record_completion(stats, milestone, len(milestones))
+    return stats
+
+def backfill(db, batch_size: int = 500) -> int:
+    """Store recomputed stats on learning paths that have none; returns paths updated"""
+    from app.models.learning_path import LearningPath
+
+    updated = 0
+    last_id = 0
+    while True:
+        # Row locks make a concurrent milestone completion wait for this batch
+        # instead of being overwritten by it
+        paths = db.query(LearningPath).filter(LearningPath.id > last_id).order_by(
+            LearningPath.id
+        ).limit(batch_size).with_for_update().all()
+        if not paths:
+            return updated
+        for path in paths:
+            ai_data = path.ai_data or {}
+            if ANALYTICS_KEY not in ai_data:
+                path.ai_data = {**ai_data, ANALYTICS_KEY: recompute(path.milestones or [])}
+                updated += 1
+        last_id = paths[-1].id
+        db.commit()
+        db.expunge_all()
+
+def summarize(stats: Dict[str, Any], adaptation_count: int = 0) -> Dict[str, Any]:
+    """Analytics response from stored stats; constant time"""
+    completed = stats["completed"]
+    total = stats["total_milestones"]
+    overall = stats["score_sum"] / completed if completed else 0
+
+    if not completed:
+        progression = {"trend": "no_data"}
+    elif completed < 2:
+        progression = {"trend": "insufficient_data", "average_score": overall}
+    else:
+        recent = sum(stats["recent_scores"]) / len(stats["recent_scores"])
+        if recent > overall + 0.1:
+            trend = "improving"
+        elif recent < overall - 0.1:
+            trend = "declining"
+        else:
+            trend = "stable"
+        progression = {
+            "trend": trend,
+            "recent_average": recent,
+            "overall_average": overall,
+            "score_variance": stats["score_max"] - stats["score_min"]
+        }
+
+    return {
+        "completion_rate": completed / total * 100 if total else 0,
+        "average_performance": overall,
+        "time_spent": stats["time_spent"],
+        "milestones_completed": completed,
+        "total_milestones": total,
+        "current_streak": stats["streak"],
+        "difficulty_progression": progression,
+        "learning_velocity": _velocity(stats),
+        "adaptation_count": adaptation_count
+    }
+
+def _velocity(stats: Dict[str, Any]) -> float:
+    """Milestones per week between the first and latest completion"""
+    if stats["completed"] < 2 or not stats["first_completion"]:
+        return 0.0
+    span = _parse_time(stats["last_completion"]) - _parse_time(stats["first_completion"])
+    weeks = span.days / 7.0
+    if weeks == 0:
+        return float(stats["completed"])  # All completed in same week
+    return stats["completed"] / weeks
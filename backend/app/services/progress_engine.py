@@ -0,0 +1,142 @@
+"""
+Set-based student progress analysis
+One statement computes completion, quiz averages and current study streaks
+for every student (or a given subset): assessment attempts are read once and
+collapsed to one row per student and day, which feeds both the totals and a
+gaps-and-islands window over active days. Snapshots are bulk-inserted in
+batches while the result streams, so a nightly run over the whole school is
+a handful of round trips instead of several queries per student.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterator, Optional, Sequence
+from sqlalchemy import Date, text, bindparam, insert
+from sqlalchemy.orm import Session
+from app.models.student import ProgressSnapshot
+from app.services.study_streaks import DAY_SQL, ISLAND_SQL, dialect_name
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+_PROGRESS_SQL = """
+    WITH daily AS (
+        SELECT student_id, {day} AS day,
+               count(*) AS submitted,
+               count(total_score) AS graded,
+               sum(CASE WHEN max_score > 0 THEN total_score * 100.0 / max_score END) AS score_sum
+        FROM assessment_attempts
+        WHERE submitted_at IS NOT NULL AND submitted_at < :as_of {attempt_filter}
+        GROUP BY student_id, {day}
+    ),
+    totals AS (
+        SELECT student_id, sum(submitted) AS submitted, sum(graded) AS graded, sum(score_sum) AS score_sum
+        FROM daily
+        GROUP BY student_id
+    ),
+    islands AS (
+        SELECT student_id, day, {island} AS island
+        FROM daily
+    ),
+    streaks AS (
+        SELECT student_id, count(*) AS length, max(day) AS last_day,
+               row_number() OVER (PARTITION BY student_id ORDER BY max(day) DESC) AS recency
+        FROM islands
+        GROUP BY student_id, island
+    ),
+    paths AS (
+        SELECT student_id, avg(progress_percentage) AS progress
+        FROM learning_paths
+        WHERE student_id IS NOT NULL {path_filter}
+        GROUP BY student_id
+    )
+    SELECT s.id AS student_id,
+           coalesce(p.progress, 0) AS overall_progress,
+           coalesce(t.submitted, 0) AS tasks_completed,
+           coalesce(t.graded, 0) AS quizzes_taken,
+           t.score_sum / nullif(t.graded, 0) AS average_score,
+           CASE WHEN k.last_day >= :streak_since THEN k.length ELSE 0 END AS study_streak
+    FROM students s
+    LEFT JOIN paths p ON p.student_id = s.id
+    LEFT JOIN totals t ON t.student_id = s.id
+    LEFT JOIN streaks k ON k.student_id = s.id AND k.recency = 1
+    {student_filter}
+    ORDER BY s.id
+"""
+
+def generate_recommendations(completion_rate: float, average_score: Optional[float]) -> List[Dict[str, str]]:
+    """Rule-based recommendations from completion rate and average quiz score"""
+    recommendations = []
+    avg_score = average_score or 0
+
+    if completion_rate < 50:
+        recommendations.append({
+            "type": "focus",
+            "title": "Increase Study Consistency",
+            "description": "You've completed less than 50% of tasks. Try setting daily study reminders.",
+            "priority": "high"
+        })
+
+    if avg_score < 70:
+        recommendations.append({
+            "type": "review",
+            "title": "Review Fundamental Concepts",
+            "description": "Your quiz scores suggest reviewing basic concepts before advancing.",
+            "priority": "high"
+        })
+
+    if avg_score > 85:
+        recommendations.append({
+            "type": "advance",
+            "title": "Ready for Advanced Topics",
+            "description": "Excellent performance! Consider moving to more challenging material.",
+            "priority": "medium"
+        })
+
+    return recommendations
+
+def progress_rows(db: Session, student_ids: Optional[Sequence[int]] = None,
+                  as_of: Optional[datetime] = None, batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Progress metrics per student, in student id order, streamed in batches
+
+    Streaks follow app.services.study_streaks: the latest run of active
+    days, counted only while it ends on the as_of day or the day before.
+    """
+    dialect = dialect_name(db)
+    as_of = as_of or datetime.utcnow()
+    filters = {"attempt_filter": "", "path_filter": "", "student_filter": ""}
+    params = {"as_of": as_of, "streak_since": as_of.date() - timedelta(days=1)}
+    if student_ids is not None:
+        filters = {
+            "attempt_filter": "AND student_id IN :student_ids",
+            "path_filter": "AND student_id IN :student_ids",
+            "student_filter": "WHERE s.id IN :student_ids"
+        }
+        params["student_ids"] = list(student_ids)
+
+    statement = text(_PROGRESS_SQL.format(day=DAY_SQL[dialect], island=ISLAND_SQL[dialect], **filters))
+    statement = statement.bindparams(bindparam("streak_since", type_=Date))
+    if student_ids is not None:
+        statement = statement.bindparams(bindparam("student_ids", expanding=True))
+
+    result = db.execute(statement, params, execution_options={"stream_results": True})
+    for partition in result.mappings().partitions(batch_size):
+        for row in partition:
+            yield dict(row)
+
+def snapshot_all(db: Session, student_ids: Optional[Sequence[int]] = None,
+                 as_of: Optional[datetime] = None, batch_size: int = SNAPSHOT_BATCH_SIZE) -> int:
+    """Write one ProgressSnapshot per student; returns the number written"""
+    written = 0
+    batch = []
+    for row in progress_rows(db, student_ids, as_of, batch_size):
+        row["recommendations"] = generate_recommendations(row["overall_progress"], row["average_score"])
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += _insert(db, batch)
+            batch = []
+    if batch:
+        written += _insert(db, batch)
+    db.commit()
+    return written
+
+def _insert(db: Session, rows: List[Dict[str, Any]]) -> int:
+    db.execute(insert(ProgressSnapshot.__table__), rows)
+    return len(rows)
@@ -0,0 +1,102 @@
+"""
+Readability metrics for curriculum content
+Text is tokenized once into words and sentence terminators; syllables are
+counted once per distinct word through a bounded cache shared by every call,
+so scoring many chunks of the same material mostly hits the cache.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Any, Iterable
+
+_TOKEN = re.compile(r"([a-z]+(?:['’][a-z]+)*)|([.!?]+)")
+_VOWEL_GROUP = re.compile(r"[aeiouy]+")
+
+SYLLABLE_CACHE_SIZE = 50000
+COMPLEX_WORD_SYLLABLES = 3
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def count_syllables(word: str) -> int:
+    """Vowel groups, less a silent final e; at least one. Expects lower case."""
+    count = len(_VOWEL_GROUP.findall(word))
+    if word.endswith("e"):
+        count -= 1
+    return max(1, count)
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "flesch_score": 0,
+        "flesch_kincaid_grade": 0,
+        "grade_level": 12,
+        "gunning_fog": 0,
+        "coleman_liau_index": 0,
+        "smog_index": 0,
+        "words": 0,
+        "sentences": 0,
+        "syllables": 0,
+        "complex_words": 0,
+        "characters": 0
+    }
+
+def analyze(text: str) -> Dict[str, Any]:
+    """Flesch reading ease, grade-level indices and the counts behind them"""
+    words: Counter = Counter()
+    sentences = 0
+    for word, terminator in _TOKEN.findall(text.lower()):
+        if word:
+            words[word] += 1
+        else:
+            sentences += 1
+
+    total_words = sum(words.values())
+    if not total_words:
+        return _empty()
+    # Text without terminal punctuation (headings, list items) is one sentence
+    sentences = max(1, sentences)
+
+    syllables = complex_words = characters = 0
+    for word, n in words.items():
+        s = count_syllables(word)
+        syllables += s * n
+        characters += len(word) * n
+        if s >= COMPLEX_WORD_SYLLABLES:
+            complex_words += n
+
+    words_per_sentence = total_words / sentences
+    syllables_per_word = syllables / total_words
+    fk_grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+
+    return {
+        "flesch_score": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2),
+        "flesch_kincaid_grade": round(fk_grade, 2),
+        "grade_level": max(1, min(12, round(fk_grade))),
+        "gunning_fog": round(0.4 * (words_per_sentence + 100 * complex_words / total_words), 2),
+        "coleman_liau_index": round(
+            0.0588 * (100 * characters / total_words) - 0.296 * (100 * sentences / total_words) - 15.8, 2
+        ),
+        "smog_index": round(1.043 * math.sqrt(complex_words * 30 / sentences) + 3.1291, 2),
+        "words": total_words,
+        "sentences": sentences,
+        "syllables": syllables,
+        "complex_words": complex_words,
+        "characters": characters
+    }
+
+def analyze_batch(texts: Iterable[str]) -> List[Dict[str, Any]]:
+    """Score many documents or chunks in one call, sharing the syllable cache"""
+    return [analyze(text) for text in texts]
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Word-weighted averages over scored chunks, e.g. for a whole resource"""
+    total_words = sum(r["words"] for r in results)
+    if not total_words:
+        return _empty()
+    summary = {
+        key: round(sum(r[key] * r["words"] for r in results) / total_words, 2)
+        for key in ("flesch_score", "flesch_kincaid_grade", "gunning_fog", "coleman_liau_index", "smog_index")
+    }
+    summary["grade_level"] = max(1, min(12, round(summary["flesch_kincaid_grade"])))
+    for key in ("words", "sentences", "syllables", "complex_words", "characters"):
+        summary[key] = sum(r[key] for r in results)
+    return summary
@@ -0,0 +1,125 @@
+"""
+Full-text search across a teacher's curricula, modules, files and learning paths
+Queries hit the search_documents index (tsvector + GIN on PostgreSQL, FTS5 on
+SQLite), which is kept current on write by the model events in
+app.models.search. Snippets are only built for the rows on the returned page.
+"""
+import re
+from typing import Dict, Any, Optional, Sequence
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import Session
+from app.models.search import INDEXED_TABLES, upsert_search_document
+
+ENTITY_TYPES = tuple(entity_type for entity_type, _ in INDEXED_TABLES.values())
+MAX_PAGE_SIZE = 50
+REINDEX_BATCH_SIZE = 500
+
+_FTS_TERM = re.compile(r"\w+", re.UNICODE)
+
+_POSTGRES_SEARCH = """
+    SELECT page.entity_type, page.entity_id, page.title, page.rank,
+           ts_headline('english', d.body, websearch_to_tsquery('english', :query),
+                       'MaxFragments=2, MinWords=5, MaxWords=20') AS snippet
+    FROM (
+        SELECT id, entity_type, entity_id, title,
+               ts_rank_cd(search_vector, websearch_to_tsquery('english', :query)) AS rank
+        FROM search_documents
+        WHERE owner_id = :owner_id
+          AND search_vector @@ websearch_to_tsquery('english', :query)
+          {type_filter}
+        ORDER BY rank DESC, id
+        LIMIT :limit OFFSET :offset
+    ) page
+    JOIN search_documents d ON d.id = page.id
+    ORDER BY page.rank DESC, page.id
+"""
+
+# bm25() is lower-is-better; title matches weigh more than body matches
+_SQLITE_SEARCH = """
+    SELECT d.entity_type, d.entity_id, d.title,
+           -bm25(search_documents_fts, 4.0, 1.0) AS rank,
+           snippet(search_documents_fts, 1, '<b>', '</b>', '...', 16) AS snippet
+    FROM search_documents_fts
+    JOIN search_documents d ON d.id = search_documents_fts.rowid
+    WHERE search_documents_fts MATCH :query
+      AND d.owner_id = :owner_id
+      {type_filter}
+    ORDER BY bm25(search_documents_fts, 4.0, 1.0), d.id
+    LIMIT :limit OFFSET :offset
+"""
+
+def fts5_query(query: str) -> str:
+    """Quote each term so user input is never parsed as FTS5 syntax; terms are ANDed"""
+    return " ".join(f'"{term}"' for term in _FTS_TERM.findall(query))
+
+def search(db: Session, owner_id: int, query: str, entity_types: Optional[Sequence[str]] = None,
+           page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """Ranked hits for one teacher, best first
+
+    One extra row is fetched to report has_more instead of counting every
+    match, which would cost as much as the search itself on large accounts.
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    empty = {"query": query, "page": page, "page_size": page_size, "results": [], "has_more": False}
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        sql, match = _SQLITE_SEARCH, fts5_query(query)
+    else:
+        sql, match = _POSTGRES_SEARCH, query.strip()
+    if not match:
+        return empty
+
+    params = {"query": match, "owner_id": owner_id, "limit": page_size + 1, "offset": (page - 1) * page_size}
+    type_filter = ""
+    if entity_types:
+        unknown = set(entity_types) - set(ENTITY_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown search types: {', '.join(sorted(unknown))}")
+        type_filter = "AND entity_type IN :entity_types" if dialect != "sqlite" else "AND d.entity_type IN :entity_types"
+        params["entity_types"] = list(entity_types)
+
+    statement = text(sql.format(type_filter=type_filter))
+    if entity_types:
+        statement = statement.bindparams(bindparam("entity_types", expanding=True))
+    rows = db.execute(statement, params).all()
+
+    return {
+        **empty,
+        "results": [
+            {
+                "type": row.entity_type,
+                "id": row.entity_id,
+                "title": row.title,
+                "snippet": row.snippet,
+                "score": round(float(row.rank), 4)
+            } for row in rows[:page_size]
+        ],
+        "has_more": len(rows) > page_size
+    }
+
+def reindex(db: Session, batch_size: int = REINDEX_BATCH_SIZE) -> Dict[str, int]:
+    """Rebuild search documents for existing rows, e.g. after the index migration"""
+    from app.models.curriculum import Curriculum
+    from app.models.files import File, Module
+    from app.models.student import LearningPath
+
+    counts = {}
+    connection = db.connection()
+    for model in (Curriculum, Module, File, LearningPath):
+        entity_type = INDEXED_TABLES[model.__tablename__][0]
+        counts[entity_type] = 0
+        last_id = 0
+        while True:
+            rows = db.query(model).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                upsert_search_document(connection, entity_type, row)
+            counts[entity_type] += len(rows)
+            last_id = rows[-1].id
+            db.commit()
+            db.expunge_all()
+            connection = db.connection()
+    return counts
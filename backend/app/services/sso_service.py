@@ -1,8 +1,8 @@
 from typing import Dict, Any, Optional
-import httpx
 import jwt
 import os
 from datetime import datetime, timedelta
+from app.core.http_client import http_clients
 
 class SSOService:
     def __init__(self):
@@ -60,10 +60,9 @@ class SSOService:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.post(token_url, profile="sso", data=data)
+        response.raise_for_status()
+        return response.json()
     
     async def exchange_microsoft_code(self, code: str) -> Dict[str, Any]:
         """Exchange Microsoft authorization code for tokens"""
@@ -78,30 +77,27 @@ class SSOService:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.post(token_url, profile="sso", data=data)
+        response.raise_for_status()
+        return response.json()
     
     async def get_google_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user information from Google"""
         user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(user_info_url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.get(user_info_url, profile="sso", headers=headers)
+        response.raise_for_status()
+        return response.json()
     
     async def get_microsoft_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user information from Microsoft"""
         user_info_url = "https://graph.microsoft.com/v1.0/me"
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(user_info_url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.get(user_info_url, profile="sso", headers=headers)
+        response.raise_for_status()
+        return response.json()
     
     def verify_google_token(self, id_token: str) -> Optional[Dict[str, Any]]:
         """Verify Google ID token"""
@@ -159,10 +155,9 @@ class SSOService:
             "grant_type": "refresh_token"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.post(token_url, profile="sso", data=data)
+        response.raise_for_status()
+        return response.json()
     
     async def refresh_microsoft_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh Microsoft access token"""
@@ -176,7 +171,6 @@ class SSOService:
             "grant_type": "refresh_token"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
-            return response.json()
\ No newline at end of file
+        response = await http_clients.post(token_url, profile="sso", data=data)
+        response.raise_for_status()
+        return response.json()
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Study streaks from submission history
+A student's active days are the distinct days with a submitted assessment
+attempt; consecutive days form one run (gaps-and-islands: day number minus
+row number is constant within a run). Current and longest runs for one
+student or a whole class come from a single window query, and results are
+cached in Redis until the student's next submission.
+
+Each student has a version counter that every change to their submitted
+attempts bumps; a cache entry is used only while it carries the current
+version, so a result computed before a submission can't outlive it. The
+counter is bumped after any commit that adds, changes or removes a
+submitted attempt through the ORM.
+"""
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, text, bindparam
+from sqlalchemy.orm import Session
+from app.core.redis_client import get_sync_redis
+from app.models.student import AssessmentAttempt
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 24 * 3600  # backstop; submissions invalidate through the version
+# Outlives any entry, so a counter never expires back under a cached version
+VERSION_TTL = 2 * CACHE_TTL
+QUERY_CHUNK = 1000
+
+# Per-dialect day bucket, and a run key that is constant across consecutive days
+DAY_SQL = {
+    "sqlite": "date(submitted_at)",
+    "postgresql": "CAST(submitted_at AS date)"
+}
+ISLAND_SQL = {
+    "sqlite": "julianday(day) - row_number() OVER (PARTITION BY student_id ORDER BY day)",
+    "postgresql": "day - CAST(row_number() OVER (PARTITION BY student_id ORDER BY day) AS integer)"
+}
+
+_STREAKS_SQL = """
+    WITH days AS (
+        SELECT DISTINCT student_id, {day} AS day
+        FROM assessment_attempts
+        WHERE submitted_at IS NOT NULL AND student_id IN :student_ids
+    ),
+    islands AS (
+        SELECT student_id, day, {island} AS island
+        FROM days
+    ),
+    runs AS (
+        SELECT student_id, count(*) AS length, max(day) AS last_day
+        FROM islands
+        GROUP BY student_id, island
+    ),
+    ranked AS (
+        SELECT student_id, length, last_day,
+               max(length) OVER (PARTITION BY student_id) AS longest,
+               row_number() OVER (PARTITION BY student_id ORDER BY last_day DESC) AS recency
+        FROM runs
+    )
+    SELECT student_id, length AS latest_run, last_day, longest
+    FROM ranked
+    WHERE recency = 1
+"""
+
+def dialect_name(db: Session) -> str:
+    name = db.get_bind().dialect.name
+    return name if name in DAY_SQL else "postgresql"
+
+def _empty() -> Dict[str, Any]:
+    return {"latest_run": 0, "last_active": None, "longest": 0}
+
+def compute(db: Session, student_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Uncached runs per student: latest run length, its last day, longest run"""
+    dialect = dialect_name(db)
+    statement = text(_STREAKS_SQL.format(day=DAY_SQL[dialect], island=ISLAND_SQL[dialect])).bindparams(
+        bindparam("student_ids", expanding=True)
+    )
+    student_ids = list(student_ids)
+    runs = {student_id: _empty() for student_id in student_ids}
+    for start in range(0, len(student_ids), QUERY_CHUNK):
+        chunk = student_ids[start:start + QUERY_CHUNK]
+        for row in db.execute(statement, {"student_ids": chunk}):
+            last_day = row.last_day
+            runs[row.student_id] = {
+                "latest_run": row.latest_run,
+                "last_active": last_day.isoformat() if isinstance(last_day, date) else str(last_day),
+                "longest": row.longest
+            }
+    return runs
+
+def current_length(runs: Dict[str, Any], today: Optional[date] = None) -> int:
+    """The latest run counts as current while it ends today or yesterday"""
+    if not runs["last_active"]:
+        return 0
+    today = today or datetime.utcnow().date()
+    last_active = date.fromisoformat(runs["last_active"])
+    return runs["latest_run"] if last_active >= today - timedelta(days=1) else 0
+
+def _key(student_id: int) -> str:
+    return f"streaks:{student_id}"
+
+def _version_key(student_id: int) -> str:
+    return f"streaks:version:{student_id}"
+
+def get_streaks(db: Session, student_ids: Iterable[int], today: Optional[date] = None,
+                redis_client=None) -> Dict[int, Dict[str, Any]]:
+    """Current and longest streak per student, served from cache where possible
+
+    Cached entries hold the latest run rather than the current streak, so
+    they stay valid as days pass; only a new submission changes them.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    if not student_ids:
+        return {}
+    redis_client = redis_client or get_sync_redis()
+
+    runs: Dict[int, Dict[str, Any]] = {}
+    versions: Optional[Dict[int, int]] = None
+    try:
+        values = redis_client.mget(
+            [_key(student_id) for student_id in student_ids] +
+            [_version_key(student_id) for student_id in student_ids]
+        )
+        cached, current = values[:len(student_ids)], values[len(student_ids):]
+        versions = {student_id: int(version or 0) for student_id, version in zip(student_ids, current)}
+        for student_id, value in zip(student_ids, cached):
+            entry = json.loads(value) if value else None
+            if entry and entry.pop("version", None) == versions[student_id]:
+                runs[student_id] = entry
+    except RedisError as e:
+        logger.warning(f"Streak cache unavailable: {e}")
+
+    missing = [student_id for student_id in student_ids if student_id not in runs]
+    if missing:
+        computed = compute(db, missing)
+        runs.update(computed)
+        if versions is not None:
+            try:
+                # Tagged with the version read before computing: a submission
+                # committed meanwhile bumps it, and this entry is never used
+                with redis_client.pipeline(transaction=False) as pipe:
+                    for student_id, value in computed.items():
+                        entry = {**value, "version": versions[student_id]}
+                        pipe.set(_key(student_id), json.dumps(entry), ex=CACHE_TTL)
+                    pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Failed to cache streaks: {e}")
+
+    return {
+        student_id: {
+            "current_streak": current_length(runs[student_id], today),
+            "longest_streak": runs[student_id]["longest"],
+            "last_active": runs[student_id]["last_active"]
+        } for student_id in student_ids
+    }
+
+def current_streak(db: Session, student_id: int, today: Optional[date] = None, redis_client=None) -> int:
+    return get_streaks(db, [student_id], today, redis_client)[student_id]["current_streak"]
+
+def invalidate(student_ids: Iterable[int], redis_client=None):
+    """Retire cached streaks; runs after a commit that changed the students' submissions"""
+    student_ids = list(dict.fromkeys(student_ids))
+    if not student_ids:
+        return
+    try:
+        with (redis_client or get_sync_redis()).pipeline(transaction=False) as pipe:
+            for student_id in student_ids:
+                pipe.incr(_version_key(student_id))
+                pipe.expire(_version_key(student_id), VERSION_TTL)
+            pipe.delete(*[_key(student_id) for student_id in student_ids])
+            pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate streaks: {e}")
+
+# Students whose submitted attempts changed in a session, invalidated once it commits
+_PENDING = "study_streaks.pending"
+
+def _submission_changed(target: AssessmentAttempt, deleted: bool = False) -> bool:
+    if deleted:
+        return target.submitted_at is not None
+    state = inspect(target)
+    if not state.has_identity or state.pending:
+        return target.submitted_at is not None
+    return any(state.attrs[name].history.has_changes() for name in ("submitted_at", "student_id"))
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_students(session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING, set())
+    for target in list(session.new) + list(session.dirty):
+        if isinstance(target, AssessmentAttempt) and _submission_changed(target):
+            pending.add(target.student_id)
+            # A moved attempt changes the previous student's streak too
+            previous = inspect(target).attrs["student_id"].history.deleted
+            pending.update(student_id for student_id in previous if student_id is not None)
+    for target in session.deleted:
+        if isinstance(target, AssessmentAttempt) and _submission_changed(target, deleted=True):
+            pending.add(target.student_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_students(session):
+    invalidate(session.info.pop(_PENDING, ()))
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_students(session):
+    session.info.pop(_PENDING, None)
@@ -1,36 +1,31 @@
-from celery import current_task
-from app.core.celery_app import celery_app
+from celery import group
+from app.core.celery_app import celery_app, PRIORITY_LOW
+from app.core.async_tasks import AsyncTask
 from app.core.database import SessionLocal
 from app.models.curriculum import Assessment, Question
-from app.models.student import AssessmentAttempt, StudentResponse
+from app.models.student import AssessmentAttempt
+from app.models.files import StudentResponse
 from app.services.ai_service import AIService
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-@celery_app.task(bind=True)
-def assessment_generation(self, curriculum_id: int, assessment_type: str = "mixed"):
-    """Generate assessment questions using AI"""
+def _curriculum_metadata(curriculum_id: int):
     db = SessionLocal()
-    
     try:
-        current_task.update_state(state='PROGRESS', meta={'progress': 10})
-        
         from app.models.curriculum import Curriculum
         
-        # Get curriculum
         curriculum = db.query(Curriculum).filter(Curriculum.id == curriculum_id).first()
         if not curriculum:
             raise Exception(f"Curriculum {curriculum_id} not found")
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 30})
-        
-        # Generate assessment using AI
-        ai_service = AIService()
-        assessment_data = await ai_service.generate_assessments(curriculum.metadata, assessment_type)
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 60})
-        
+        return curriculum.metadata
+    finally:
+        db.close()
+
+def _save_assessment(curriculum_id: int, assessment_type: str, assessment_data: dict):
+    db = SessionLocal()
+    try:
         # Create assessment record
         assessment = Assessment(
             title=assessment_data.get("title", f"AI-Generated {assessment_type.title()} Assessment"),
@@ -61,32 +56,49 @@ def assessment_generation(self, curriculum_id: int, assessment_type: str = "mixe
             questions_created += 1
         
         db.commit()
+        return assessment.id, assessment.total_points, questions_created
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, base=AsyncTask)
+async def assessment_generation(self, curriculum_id: int, assessment_type: str = "mixed"):
+    """Generate assessment questions using AI"""
+    try:
+        await self.update_state_async(state='PROGRESS', meta={'progress': 10})
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 100})
+        # Get curriculum
+        curriculum_metadata = await asyncio.to_thread(_curriculum_metadata, curriculum_id)
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 30})
+        
+        # Generate assessment using AI
+        ai_service = await asyncio.to_thread(AIService)
+        assessment_data = await ai_service.generate_assessments(curriculum_metadata, assessment_type)
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 60})
+        
+        assessment_id, total_points, questions_created = await asyncio.to_thread(
+            _save_assessment, curriculum_id, assessment_type, assessment_data
+        )
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 100})
         
         return {
-            "assessment_id": assessment.id,
+            "assessment_id": assessment_id,
             "curriculum_id": curriculum_id,
             "status": "completed",
             "questions_created": questions_created,
-            "total_points": assessment.total_points
+            "total_points": total_points
         }
         
     except Exception as e:
         logger.error(f"Assessment generation failed for curriculum {curriculum_id}: {str(e)}")
         raise Exception(f"Assessment generation failed: {str(e)}")
-        
-    finally:
-        db.close()
 
-@celery_app.task(bind=True)
-def grading(self, assessment_attempt_id: int):
-    """Grade student assessment responses using AI"""
+def _grading_inputs(assessment_attempt_id: int):
+    """The attempt's student and answers, and its questions as plain data for the AI"""
     db = SessionLocal()
-    
     try:
-        current_task.update_state(state='PROGRESS', meta={'progress': 10})
-        
         # Get assessment attempt
         attempt = db.query(AssessmentAttempt).filter(
             AssessmentAttempt.id == assessment_attempt_id
@@ -95,63 +107,87 @@ def grading(self, assessment_attempt_id: int):
         if not attempt:
             raise Exception(f"Assessment attempt {assessment_attempt_id} not found")
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 30})
-        
         # Get all questions for this assessment
         questions = db.query(Question).filter(
             Question.assessment_id == attempt.assessment_id
         ).all()
         
-        ai_service = AIService()
+        # Prepare question data for AI grading
+        question_data = [(question.id, {
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "points": question.points,
+            "correct_answer": question.correct_answer,
+            "options": question.options
+        }) for question in questions]
+        return attempt.student_id, attempt.answers or {}, question_data
+    finally:
+        db.close()
+
+def _save_grades(assessment_attempt_id: int, student_id: int, answers: dict, results: dict,
+                 total_earned: float, total_possible: float):
+    db = SessionLocal()
+    try:
+        # Create student response records
+        for question_id, grading_result in results.items():
+            db.add(StudentResponse(
+                student_id=student_id,
+                question_id=int(question_id),
+                assessment_attempt_id=assessment_attempt_id,
+                response_text=answers.get(question_id, ""),
+                is_correct="correct" if grading_result.get("is_correct", False) else "incorrect",
+                points_earned=grading_result["score"],
+                ai_feedback=grading_result.get("feedback", "")
+            ))
+        
+        # Update assessment attempt with final scores
+        attempt = db.query(AssessmentAttempt).filter(
+            AssessmentAttempt.id == assessment_attempt_id
+        ).first()
+        attempt.total_score = total_earned
+        attempt.max_score = total_possible
+        attempt.feedback = results
+        
+        db.commit()
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, base=AsyncTask)
+async def grading(self, assessment_attempt_id: int):
+    """Grade student assessment responses using AI"""
+    try:
+        await self.update_state_async(state='PROGRESS', meta={'progress': 10})
+        
+        student_id, answers, questions = await asyncio.to_thread(_grading_inputs, assessment_attempt_id)
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 30})
+        
+        ai_service = await asyncio.to_thread(AIService)
         total_earned = 0
         total_possible = 0
         detailed_feedback = {}
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 50})
+        await self.update_state_async(state='PROGRESS', meta={'progress': 50})
         
         # Grade each response
-        for question in questions:
-            total_possible += question.points
-            user_answer = attempt.answers.get(str(question.id), "")
-            
-            # Prepare question data for AI grading
-            question_data = {
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "points": question.points,
-                "correct_answer": question.correct_answer,
-                "options": question.options
-            }
+        for question_id, question_data in questions:
+            total_possible += question_data["points"]
+            user_answer = answers.get(str(question_id), "")
             
             # Auto-grade using AI service
             grading_result = await ai_service.auto_grade_response(question_data, user_answer)
             
-            # Create student response record
-            student_response = StudentResponse(
-                student_id=attempt.student_id,
-                question_id=question.id,
-                assessment_attempt_id=assessment_attempt_id,
-                response_text=user_answer,
-                is_correct="correct" if grading_result.get("is_correct", False) else "incorrect",
-                points_earned=grading_result["score"],
-                ai_feedback=grading_result.get("feedback", "")
-            )
-            
-            db.add(student_response)
-            
             total_earned += grading_result["score"]
-            detailed_feedback[str(question.id)] = grading_result
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 80})
+            detailed_feedback[str(question_id)] = grading_result
         
-        # Update assessment attempt with final scores
-        attempt.total_score = total_earned
-        attempt.max_score = total_possible
-        attempt.feedback = detailed_feedback
+        await self.update_state_async(state='PROGRESS', meta={'progress': 80})
         
-        db.commit()
+        await asyncio.to_thread(
+            _save_grades, assessment_attempt_id, student_id, answers, detailed_feedback,
+            total_earned, total_possible
+        )
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 100})
+        await self.update_state_async(state='PROGRESS', meta={'progress': 100})
         
         percentage = (total_earned / total_possible * 100) if total_possible > 0 else 0
         
@@ -167,9 +203,6 @@ def grading(self, assessment_attempt_id: int):
     except Exception as e:
         logger.error(f"Grading failed for attempt {assessment_attempt_id}: {str(e)}")
         raise Exception(f"Grading failed: {str(e)}")
-        
-    finally:
-        db.close()
 
 @celery_app.task(bind=True)
 def batch_grade_assessments(self, assessment_id: int):
@@ -183,21 +216,18 @@ def batch_grade_assessments(self, assessment_id: int):
             AssessmentAttempt.total_score.is_(None)
         ).all()
         
-        results = []
-        for i, attempt in enumerate(pending_attempts):
-            current_task.update_state(
-                state='PROGRESS', 
-                meta={'progress': int((i / len(pending_attempts)) * 100)}
-            )
-            
-            # Grade individual attempt
-            result = grading.delay(attempt.id)
-            results.append(result.get())
+        # Fan out at low priority so single gradings a student waits on go first;
+        # waiting on the results here would hold a worker for the whole batch
+        job = group(
+            grading.s(attempt.id).set(priority=PRIORITY_LOW) for attempt in pending_attempts
+        ).apply_async()
+        job.save()
         
         return {
             "assessment_id": assessment_id,
-            "attempts_graded": len(results),
-            "status": "completed"
+            "attempts_queued": len(pending_attempts),
+            "group_id": job.id,
+            "status": "queued"
         }
         
     except Exception as e:
@@ -1,41 +1,31 @@
-from celery import current_task
 from app.core.celery_app import celery_app
+from app.core.async_tasks import AsyncTask
 from app.core.database import SessionLocal
 from app.models.curriculum import Curriculum
 from app.models.files import Module
 from app.services.ai_service import AIService
 from agents.orchestrator import AgentOrchestrator
+import asyncio
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-@celery_app.task(bind=True)
-def curriculum_generation(self, curriculum_id: int):
-    """Generate curriculum content using AI"""
+def _curriculum_source(curriculum_id: int):
     db = SessionLocal()
-    
     try:
-        current_task.update_state(state='PROGRESS', meta={'progress': 10})
-        
-        # Get curriculum record
         curriculum = db.query(Curriculum).filter(Curriculum.id == curriculum_id).first()
         if not curriculum:
             raise Exception(f"Curriculum {curriculum_id} not found")
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 30})
-        
-        # Generate curriculum using Agent Orchestrator
-        orchestrator = AgentOrchestrator()
-        curriculum_data = await orchestrator.create_complete_curriculum(
-            curriculum.source_content,
-            curriculum.grade_level,
-            curriculum.subject
-        )
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 60})
-        
+        return curriculum.source_content, curriculum.grade_level, curriculum.subject
+    finally:
+        db.close()
+
+def _save_curriculum(curriculum_id: int, curriculum_data: dict):
+    db = SessionLocal()
+    try:
         # Update curriculum metadata
+        curriculum = db.query(Curriculum).filter(Curriculum.id == curriculum_id).first()
         curriculum.curriculum_metadata = curriculum_data
         db.commit()
         
@@ -57,8 +47,33 @@ def curriculum_generation(self, curriculum_id: int):
                 db.add(module)
         
         db.commit()
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, base=AsyncTask)
+async def curriculum_generation(self, curriculum_id: int):
+    """Generate curriculum content using AI"""
+    try:
+        await self.update_state_async(state='PROGRESS', meta={'progress': 10})
+        
+        # Get curriculum record
+        source_content, grade_level, subject = await asyncio.to_thread(_curriculum_source, curriculum_id)
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 100})
+        await self.update_state_async(state='PROGRESS', meta={'progress': 30})
+        
+        # Generate curriculum using Agent Orchestrator
+        orchestrator = await asyncio.to_thread(AgentOrchestrator)
+        curriculum_data = await orchestrator.create_complete_curriculum(
+            source_content,
+            grade_level,
+            subject
+        )
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 60})
+        
+        await asyncio.to_thread(_save_curriculum, curriculum_id, curriculum_data)
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 100})
         
         return {
             "curriculum_id": curriculum_id,
@@ -70,20 +85,12 @@ def curriculum_generation(self, curriculum_id: int):
     except Exception as e:
         logger.error(f"Curriculum generation failed for {curriculum_id}: {str(e)}")
         raise Exception(f"Curriculum generation failed: {str(e)}")
-        
-    finally:
-        db.close()
 
-@celery_app.task(bind=True)
-def generate_learning_path(self, student_id: int, curriculum_id: int):
-    """Generate personalized learning path for student"""
+def _learning_path_inputs(student_id: int, curriculum_id: int):
+    """The student's profile and the curriculum metadata the AI personalises from"""
     db = SessionLocal()
-    
     try:
-        current_task.update_state(state='PROGRESS', meta={'progress': 20})
-        
-        from app.models.student import Student, PersonalizedPath
-        from app.models.curriculum import Curriculum
+        from app.models.student import Student
         
         # Get student and curriculum
         student = db.query(Student).filter(Student.id == student_id).first()
@@ -92,21 +99,19 @@ def generate_learning_path(self, student_id: int, curriculum_id: int):
         if not student or not curriculum:
             raise Exception("Student or curriculum not found")
         
-        current_task.update_state(state='PROGRESS', meta={'progress': 50})
-        
-        # Generate personalized path using AI
-        ai_service = AIService()
         student_profile = {
             "age": student.age,
             "learning_style": student.learning_style,
             "interests": student.interests or []
         }
-        
-        path_data = await ai_service.generate_personalized_path(
-            student_profile, curriculum.metadata
-        )
-        
-        current_task.update_state(state='PROGRESS', meta={'progress': 80})
+        return student_profile, curriculum.metadata
+    finally:
+        db.close()
+
+def _save_learning_path(student_id: int, curriculum_id: int, path_data: dict):
+    db = SessionLocal()
+    try:
+        from app.models.student import PersonalizedPath
         
         # Save or update personalized path
         existing_path = db.query(PersonalizedPath).filter(
@@ -126,6 +131,30 @@ def generate_learning_path(self, student_id: int, curriculum_id: int):
             db.add(new_path)
         
         db.commit()
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, base=AsyncTask)
+async def generate_learning_path(self, student_id: int, curriculum_id: int):
+    """Generate personalized learning path for student"""
+    try:
+        await self.update_state_async(state='PROGRESS', meta={'progress': 20})
+        
+        student_profile, curriculum_metadata = await asyncio.to_thread(
+            _learning_path_inputs, student_id, curriculum_id
+        )
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 50})
+        
+        # Generate personalized path using AI
+        ai_service = await asyncio.to_thread(AIService)
+        path_data = await ai_service.generate_personalized_path(
+            student_profile, curriculum_metadata
+        )
+        
+        await self.update_state_async(state='PROGRESS', meta={'progress': 80})
+        
+        await asyncio.to_thread(_save_learning_path, student_id, curriculum_id, path_data)
         
         return {
             "student_id": student_id,
@@ -137,6 +166,3 @@ def generate_learning_path(self, student_id: int, curriculum_id: int):
     except Exception as e:
         logger.error(f"Learning path generation failed: {str(e)}")
         raise Exception(f"Learning path generation failed: {str(e)}")
-        
-    finally:
-        db.close()
\ No newline at end of file
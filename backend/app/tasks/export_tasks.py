@@ -0,0 +1,39 @@
+from celery import current_task
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.class_report_export import ClassReportExport
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(bind=True)
+def export_class_reports(self, assessment_id: int):
+    """Export every graded attempt of an assessment as one ZIP in S3"""
+    db = SessionLocal()
+
+    def progress(processed: int, total: int):
+        current_task.update_state(state='PROGRESS', meta={
+            'progress': int(processed / total * 95) if total else 95,
+            'status': f'Rendered {processed} of {total} reports',
+            'processed': processed,
+            'total': total
+        })
+
+    try:
+        current_task.update_state(state='PROGRESS', meta={'progress': 0, 'status': 'Starting export'})
+
+        key = f"exports/assessments/{assessment_id}/class_reports_{int(time.time())}.zip"
+        exporter = ClassReportExport(db, progress=progress)
+        result = exporter.run(assessment_id, key)
+        result["download_url"] = exporter.s3_client.generate_presigned_url(
+            "get_object", Params={"Bucket": result["bucket"], "Key": key}, ExpiresIn=24 * 3600
+        )
+        return result
+
+    except Exception as e:
+        logger.error(f"Class report export failed for assessment {assessment_id}: {str(e)}")
+        raise Exception(f"Class report export failed: {str(e)}")
+
+    finally:
+        db.close()
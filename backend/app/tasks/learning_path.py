@@ -1,10 +1,8 @@
-from celery import Celery
-from app.database import SessionLocal
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
 from app.models.user import User
 from app.agents.learning_path_agent import LearningPathAgent
 
-celery_app = Celery('edweave')
-
 @celery_app.task
 def generate_learning_path(user_id: int):
     db = SessionLocal()
@@ -0,0 +1,32 @@
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services import progress_engine, path_analytics
+import logging
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task
+def analyze_all_student_progress():
+    """Nightly progress snapshots for every student in one set-based pass"""
+    db = SessionLocal()
+
+    try:
+        written = progress_engine.snapshot_all(db)
+        logger.info(f"Wrote {written} progress snapshots")
+        return {"snapshots": written, "status": "analyzed"}
+
+    finally:
+        db.close()
+
+@celery_app.task
+def backfill_path_analytics():
+    """Store analytics totals on learning paths that predate them; run once after deploying"""
+    db = SessionLocal()
+
+    try:
+        updated = path_analytics.backfill(db)
+        logger.info(f"Backfilled analytics for {updated} learning paths")
+        return {"paths": updated, "status": "backfilled"}
+
+    finally:
+        db.close()
@@ -1,14 +1,13 @@
-from celery import Celery
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import json
 
-from ..database import get_db
+from ..core.celery_app import celery_app
+from ..core.database import get_db
 from ..models.student import Student, StudentGoal, LearningPath, WeeklyPlan, DailyTask, StudentQuiz, ProgressSnapshot
 from ..agents.learning_path_agent import LearningPathAgent
 from ..agents.quiz_generator_agent import QuizGeneratorAgent
-
-celery_app = Celery('student_tasks')
+from ..services import progress_engine, study_streaks
 
 @celery_app.task
 def generate_learning_path(student_id: int, goal_id: int):
@@ -145,112 +144,13 @@ def analyze_student_progress(student_id: int):
     if not student:
         return {"error": "Student not found"}
     
-    # Calculate progress metrics
-    learning_path = db.query(LearningPath).filter(
-        LearningPath.student_id == student_id,
-        LearningPath.is_active == True
-    ).first()
-    
-    if not learning_path:
-        return {"error": "No active learning path"}
-    
-    # Get completed tasks
-    completed_tasks = db.query(DailyTask).join(WeeklyPlan).filter(
-        WeeklyPlan.learning_path_id == learning_path.id,
-        DailyTask.is_completed == True
-    ).count()
-    
-    total_tasks = db.query(DailyTask).join(WeeklyPlan).filter(
-        WeeklyPlan.learning_path_id == learning_path.id
-    ).count()
-    
-    # Get quiz performance
-    from sqlalchemy import func
-    quiz_stats = db.query(
-        func.avg(StudentQuizResult.score_percentage).label('avg_score'),
-        func.count(StudentQuizResult.id).label('quiz_count')
-    ).filter(StudentQuizResult.student_id == student_id).first()
-    
-    # Calculate subject mastery
-    subject_mastery = {}
-    for subject in student.goals[0].subject_focus if student.goals else []:
-        # Mock calculation - in real implementation, analyze quiz results by subject
-        subject_mastery[subject] = min(85, (completed_tasks / max(total_tasks, 1)) * 100 + 10)
-    
-    # Generate AI recommendations
-    recommendations = generate_recommendations(student, completed_tasks, total_tasks, quiz_stats)
-    
-    # Create progress snapshot
-    progress = ProgressSnapshot(
-        student_id=student_id,
-        overall_progress=(completed_tasks / max(total_tasks, 1)) * 100,
-        subject_mastery=subject_mastery,
-        tasks_completed=completed_tasks,
-        quizzes_taken=quiz_stats.quiz_count or 0,
-        average_score=quiz_stats.avg_score or 0,
-        study_streak=calculate_study_streak(student_id, db),
-        recommendations=recommendations
-    )
-    db.add(progress)
-    db.commit()
+    progress_engine.snapshot_all(db, student_ids=[student_id])
+    progress = db.query(ProgressSnapshot).filter(
+        ProgressSnapshot.student_id == student_id
+    ).order_by(ProgressSnapshot.id.desc()).first()
     
     return {"progress_id": progress.id, "status": "analyzed"}
 
-def generate_recommendations(student, completed_tasks, total_tasks, quiz_stats):
-    """Generate AI-powered recommendations"""
-    recommendations = []
-    
-    completion_rate = (completed_tasks / max(total_tasks, 1)) * 100
-    avg_score = quiz_stats.avg_score or 0
-    
-    if completion_rate < 50:
-        recommendations.append({
-            "type": "focus",
-            "title": "Increase Study Consistency",
-            "description": "You've completed less than 50% of tasks. Try setting daily study reminders.",
-            "priority": "high"
-        })
-    
-    if avg_score < 70:
-        recommendations.append({
-            "type": "review",
-            "title": "Review Fundamental Concepts",
-            "description": "Your quiz scores suggest reviewing basic concepts before advancing.",
-            "priority": "high"
-        })
-    
-    if avg_score > 85:
-        recommendations.append({
-            "type": "advance",
-            "title": "Ready for Advanced Topics",
-            "description": "Excellent performance! Consider moving to more challenging material.",
-            "priority": "medium"
-        })
-    
-    return recommendations
-
 def calculate_study_streak(student_id: int, db: Session) -> int:
     """Calculate consecutive days of study activity"""
-    # Get recent task completions
-    recent_completions = db.query(DailyTask.completed_at).join(WeeklyPlan).join(LearningPath).filter(
-        LearningPath.student_id == student_id,
-        DailyTask.is_completed == True,
-        DailyTask.completed_at >= datetime.now() - timedelta(days=30)
-    ).order_by(DailyTask.completed_at.desc()).all()
-    
-    if not recent_completions:
-        return 0
-    
-    # Calculate streak
-    streak = 1
-    current_date = recent_completions[0].completed_at.date()
-    
-    for completion in recent_completions[1:]:
-        completion_date = completion.completed_at.date()
-        if (current_date - completion_date).days == 1:
-            streak += 1
-            current_date = completion_date
-        else:
-            break
-    
-    return streak
\ No newline at end of file
+    return study_streaks.current_streak(db, student_id)
@@ -0,0 +1,11 @@
+"""
+Start a Celery worker for one queue with that queue's pool and concurrency
+Usage: python -m app.worker <interactive|llm-io|cpu|db-bulk> [extra celery worker options]
+"""
+import sys
+from app.core.celery_app import celery_app, worker_argv
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__.strip())
+    celery_app.worker_main(worker_argv(sys.argv[1]) + sys.argv[2:])
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, Form
+from fastapi import FastAPI, HTTPException, Depends, Form, WebSocket, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
@@ -9,7 +9,14 @@ import hashlib
 import time
 import boto3
 import json
+import bisect
+import itertools
 from typing import Optional, Dict, Any
+from app.core.pagination import encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.http_client import http_clients
+from app.core.redis_client import close_redis
+from app.services.collaboration_hub import get_collaboration_hub, POLICY_VIOLATION
+from app.api import search
 
 app = FastAPI(title="EdweavePack API", version="3.0.0")
 
@@ -21,6 +28,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+
 # Security
 security = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -36,8 +45,12 @@ translate = boto3.client('translate', region_name='us-east-1')
 # In-memory user storage (for demo)
 users_db = {}
 curricula_db = {}
+curriculum_seq = []  # numeric curriculum ids in ascending order, for keyset paging
+curriculum_ids = itertools.count(1)
 assessments_db = {}
 
+CURRICULUM_LIST_FIELDS = ("id", "title", "subject", "grade_level", "created_at", "aws_ai_enhanced")
+
 # Models
 class UserRegister(BaseModel):
     email: EmailStr
@@ -49,6 +62,9 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class CollaborationSessionCreate(BaseModel):
+    curriculum_id: str
+
 class User(BaseModel):
     id: str
     email: str
@@ -68,6 +84,19 @@ def create_token(user_data: dict) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
+@app.on_event("startup")
+async def open_http_clients():
+    await http_clients.start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.aclose()
+
+@app.on_event("shutdown")
+async def close_collaboration():
+    await get_collaboration_hub().aclose()
+    await close_redis()
+
 @app.get("/health")
 async def health():
     return {"status": "healthy", "service": "EdweavePack", "version": "3.0.0"}
@@ -80,6 +109,11 @@ async def root():
 async def api_health():
     return {"status": "healthy", "api": "ready"}
 
+@app.get("/api/health/http-clients")
+async def http_client_metrics():
+    """Outbound connection pool reuse statistics"""
+    return http_clients.metrics()
+
 @app.post("/api/auth/register")
 async def register(user_data: UserRegister):
     # Check if user exists
@@ -223,12 +257,28 @@ async def analyze_text_comprehend(text: str) -> Dict[str, Any]:
 
 # Enhanced Curriculum API with AWS AI
 @app.get("/api/curriculum/")
-async def get_curricula(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    return {"curricula": list(curricula_db.values()), "count": len(curricula_db)}
+async def get_curricula(cursor: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                        credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Newest first, keyset-paged; the generated content is left out of the listing"""
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    end = len(curriculum_seq) if after is None else bisect.bisect_left(curriculum_seq, after)
+    start = max(0, end - limit)
+    page = [curricula_db[f"curr_{seq}"] for seq in reversed(curriculum_seq[start:end])]
+    return {
+        "curricula": [{key: c[key] for key in CURRICULUM_LIST_FIELDS if key in c} for c in page],
+        "count": len(curricula_db),
+        "next_cursor": encode_cursor(curriculum_seq[start]) if start > 0 else None
+    }
 
 @app.post("/api/curriculum/")
 async def create_curriculum(curriculum_data: dict, credentials: HTTPAuthorizationCredentials = Depends(security)):
-    curriculum_id = f"curr_{len(curricula_db) + 1}"
+    user = await get_current_user(credentials)
+    # Taken before the Bedrock await, so concurrent requests never share an id
+    seq = next(curriculum_ids)
+    curriculum_id = f"curr_{seq}"
     
     # Generate AI-enhanced curriculum using Bedrock
     ai_prompt = f"""
@@ -255,6 +305,7 @@ async def create_curriculum(curriculum_data: dict, credentials: HTTPAuthorizatio
         "grade_level": curriculum_data.get('grade_level', 'K-12'),
         "ai_generated_content": ai_content,
         "created_at": time.time(),
+        "created_by": user["id"],
         "aws_ai_enhanced": True,
         "hackathon_features": {
             "bedrock_generated": True,
@@ -264,6 +315,8 @@ async def create_curriculum(curriculum_data: dict, credentials: HTTPAuthorizatio
     }
     
     curricula_db[curriculum_id] = curriculum
+    # Requests can finish out of order; the listing bisects, so keep it sorted
+    bisect.insort(curriculum_seq, seq)
     return curriculum
 
 @app.post("/api/curriculum/upload")
@@ -445,6 +498,60 @@ async def agent_generate_learning_path(data: dict, credentials: HTTPAuthorizatio
         "adaptive_features": True
     }
 
+# Real-time collaboration
+def can_collaborate(user: dict, access: Dict[str, Any]) -> bool:
+    """Session creator, an existing participant, or the owner of the session's curriculum"""
+    user_id = str(user["id"])
+    if user_id == str(access["created_by"]) or user_id in access["participants"]:
+        return True
+    curriculum = curricula_db.get(f"curr_{access['curriculum_id']}")
+    return curriculum is not None and curriculum.get("created_by") == user["id"]
+
+@app.post("/api/collaboration/sessions")
+async def create_collaboration_session(data: CollaborationSessionCreate,
+                                       credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Open a session on one of the caller's curricula; clients connect to the returned socket_url"""
+    user = await get_current_user(credentials)
+    curriculum = curricula_db.get(data.curriculum_id)
+    if curriculum is None:
+        raise HTTPException(status_code=404, detail="Curriculum not found")
+    # Same owner rule as can_collaborate, which looks the curriculum up by this number
+    if curriculum.get("created_by") != user["id"]:
+        raise HTTPException(status_code=403, detail="Not allowed to collaborate on this curriculum")
+
+    seq = int(data.curriculum_id.removeprefix("curr_"))
+    session_id = await get_collaboration_hub().service.create_collaboration_session(
+        seq, user["id"], user["full_name"]
+    )
+    return {
+        "session_id": session_id,
+        "curriculum_id": data.curriculum_id,
+        "socket_url": f"/api/collaboration/{session_id}/ws"
+    }
+
+@app.websocket("/api/collaboration/{session_id}/ws")
+async def collaboration_socket(websocket: WebSocket, session_id: str, token: str, since: Optional[int] = None):
+    """Collaboration channel; browsers can't set headers on sockets, so the token comes in the query"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        user = users_db[payload.get("email")]
+    except (jwt.InvalidTokenError, KeyError):
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+
+    access = await get_collaboration_hub().service.session_access(session_id)
+    if access is None or not can_collaborate(user, access):
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await get_collaboration_hub().serve(session_id, user["id"], user["full_name"], websocket, since)
+
+@app.get("/api/health/collaboration")
+async def collaboration_metrics():
+    """Connected collaboration sockets in this worker"""
+    return get_collaboration_hub().metrics()
+
 # File upload endpoints
 @app.post("/api/files/simple-upload")
 async def upload_file(credentials: HTTPAuthorizationCredentials = Depends(security)):
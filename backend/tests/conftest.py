@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.core.database import Base, get_db
 from app.models.user import User
 from app.models.curriculum import Curriculum, Assessment, Question
@@ -31,6 +32,20 @@ def client():
     yield client
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def db():
+    """Fresh in-memory database with every model's tables
+
+    The engine keeps a single connection, so sessions made from
+    ``db.get_bind()`` see the same data, from any thread.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
 @pytest.fixture
 def db_session():
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from celery import Celery
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.core import async_tasks
+from app.core.async_tasks import AsyncRuntime, AsyncTask
+from app.models.curriculum import Question
+from app.models.files import StudentResponse
+from app.models.student import AssessmentAttempt
+
+@pytest.fixture
+def runtime(monkeypatch):
+    runtime = AsyncRuntime(max_in_flight=5)
+    monkeypatch.setattr(async_tasks, "_runtime", runtime)
+    monkeypatch.setattr(async_tasks, "_runtime_pid", async_tasks.os.getpid())
+    yield runtime
+    runtime.shutdown()
+
+@pytest.fixture
+def app():
+    app = Celery("test", broker="memory://", backend="cache+memory://")
+    app.conf.task_soft_time_limit = 5
+    return app
+
+def test_coroutines_share_one_loop_within_the_limit(runtime):
+    in_flight = peak = 0
+
+    async def call(n):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return n
+
+    started = time.monotonic()
+    futures = [runtime.submit(call(n)) for n in range(20)]
+    assert [f.result() for f in futures] == list(range(20))
+    assert peak == 5
+    assert time.monotonic() - started < 0.5  # 4 waves, not 20 sequential calls
+
+def test_timeout_frees_the_slot(runtime):
+    with pytest.raises(asyncio.TimeoutError):
+        runtime.run(asyncio.sleep(1), timeout=0.05)
+    assert runtime.run(asyncio.sleep(0, result="ok")) == "ok"
+
+def test_async_tasks_run_concurrently_from_pool_threads(runtime, app):
+    @app.task(bind=True, base=AsyncTask)
+    async def fetch(self, n):
+        await self.update_state_async(state="PROGRESS", meta={"n": n})
+        await asyncio.sleep(0.1)
+        return n * 2
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda n: fetch.apply(args=(n,)), range(10)))
+
+    assert [r.get() for r in results] == [n * 2 for n in range(10)]
+    assert time.monotonic() - started < 0.6
+    # Progress from the loop thread lands on each task's own id
+    assert [app.backend.get_task_meta(r.id)["result"] for r in results] == [{"n": n} for n in range(10)]
+
+def test_sync_tasks_are_untouched(app):
+    @app.task(base=AsyncTask)
+    def add(a, b):
+        return a + b
+
+    assert add.apply(args=(2, 3)).get() == 5
+    assert add(2, 3) == 5
+
+def test_grading_keeps_blocking_work_off_the_loop(runtime, db, monkeypatch):
+    from app.tasks import assessment_tasks
+
+    db.add_all([
+        Question(id=1, assessment_id=1, question_text="2 + 2?", question_type="short_answer", points=5),
+        Question(id=2, assessment_id=1, question_text="3 + 3?", question_type="short_answer", points=5),
+        AssessmentAttempt(id=1, student_id=1, assessment_id=1, answers={"1": "4", "2": "5"})
+    ])
+    db.commit()
+
+    blocking_threads = set()
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda *args: blocking_threads.add(threading.current_thread()))
+
+    class FakeAIService:
+        def __init__(self):
+            blocking_threads.add(threading.current_thread())
+
+        async def auto_grade_response(self, question_data, answer):
+            assert threading.current_thread() is runtime._thread
+            correct = answer == {"2 + 2?": "4", "3 + 3?": "6"}[question_data["question_text"]]
+            return {"score": question_data["points"] if correct else 0, "is_correct": correct}
+
+    progress = []
+    monkeypatch.setattr(assessment_tasks, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(assessment_tasks, "AIService", FakeAIService)
+    monkeypatch.setattr(AsyncTask, "update_state", lambda self, task_id=None, state=None, meta=None:
+                        (blocking_threads.add(threading.current_thread()), progress.append(meta["progress"])))
+
+    result = assessment_tasks.grading.apply(args=(1,)).get()
+
+    assert result["total_score"] == 5 and result["max_score"] == 10 and not result["passed"]
+    assert progress == [10, 30, 50, 80, 100]
+    assert blocking_threads and runtime._thread not in blocking_threads
+    db.expire_all()
+    assert db.get(AssessmentAttempt, 1).total_score == 5
+    assert {r.question_id: r.is_correct for r in db.query(StudentResponse)} == {1: "correct", 2: "incorrect"}
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.models.user import User
+from app.models.curriculum import Curriculum, Assessment
+from agents.backend_gateway import BackendGateway, InProcessBackendGateway
+
+@pytest.fixture
+def session_factory(db):
+    # Every gateway call opens its own session on the shared connection
+    db.add(User(id=1, email="t@example.com", name="T", hashed_password="x", role="teacher"))
+    db.commit()
+    return sessionmaker(bind=db.get_bind())
+
+@pytest.fixture
+def gateway(session_factory):
+    return InProcessBackendGateway(session_factory)
+
+def test_base_gateway_is_abstract():
+    with pytest.raises(TypeError):
+        BackendGateway()
+
+@pytest.mark.asyncio
+async def test_uploaded_resource_round_trips(gateway):
+    chunks = [{"chunk_id": "c0", "text": "Plants make sugar"}, {"chunk_id": "c1", "text": "using light"}]
+    resource_id = await gateway.upload_resource({
+        "source_file": "biology.PDF", "chunks": chunks, "metadata": {"processing_agent": "IngestAgent"}
+    })
+
+    resource = await gateway.fetch_resource(resource_id)
+    assert resource == {"resource_id": resource_id, "chunks": chunks, "metadata": {"processing_agent": "IngestAgent"}}
+    assert await gateway.fetch_resource("missing") is None
+
+@pytest.mark.asyncio
+async def test_curriculum_is_owned_by_the_teacher(gateway, session_factory):
+    curriculum_id = await gateway.create_curriculum({
+        "teacher_id": 1, "title": "Photosynthesis",
+        "curriculum_metadata": {"module_ids": ["m1"], "modules": [{"title": "Light reactions"}]}
+    })
+
+    session = session_factory()
+    curriculum = session.get(Curriculum, int(curriculum_id))
+    assert curriculum.created_by == 1
+    session.close()
+    assert await gateway.fetch_module(curriculum_id, "m1") == {"module_id": "m1", "title": "Light reactions"}
+    assert await gateway.fetch_module(curriculum_id, "m2") is None
+
+@pytest.mark.asyncio
+async def test_curriculum_without_teacher_is_rejected(gateway, session_factory):
+    with pytest.raises(ValueError):
+        await gateway.create_curriculum({"title": "Orphan"})
+
+    session = session_factory()
+    assert session.query(Curriculum).count() == 0
+    session.close()
+
+@pytest.mark.asyncio
+async def test_assessment_is_attached_to_the_curriculum(gateway, session_factory):
+    curriculum_id = await gateway.create_curriculum({"teacher_id": 1, "title": "Photosynthesis"})
+    assessment_id = await gateway.create_assessment(curriculum_id, {
+        "title": "Quiz", "questions": [{"question": "What is chlorophyll?"}], "total_points": 10
+    })
+
+    session = session_factory()
+    assessment = session.get(Assessment, int(assessment_id))
+    assert assessment.curriculum_id == int(curriculum_id)
+    assert assessment.assessment_data["questions"] == [{"question": "What is chlorophyll?"}]
+    session.close()
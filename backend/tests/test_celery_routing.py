@@ -0,0 +1,49 @@
+import ast
+import importlib
+from pathlib import Path
+import pytest
+from app.core.celery_app import (
+    celery_app, worker_argv, TASK_ROUTES, WORKER_PROFILES, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+)
+
+TASKS_DIR = Path(__file__).resolve().parent.parent / "app" / "tasks"
+
+def declared_tasks():
+    """Names of every @celery_app.task function under app/tasks, found without importing"""
+    for path in sorted(TASKS_DIR.glob("*.py")):
+        for node in ast.parse(path.read_text()).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and any(
+                "celery_app.task" in ast.unparse(decorator) for decorator in node.decorator_list
+            ):
+                yield f"app.tasks.{path.stem}.{node.name}"
+
+def route(name, **options):
+    return celery_app.amqp.router.route(options, name)
+
+def test_every_task_is_routed_to_a_known_queue():
+    tasks = list(declared_tasks())
+    assert tasks
+    assert sorted(set(tasks) - set(TASK_ROUTES)) == []
+    assert {r["queue"] for r in TASK_ROUTES.values()} <= set(WORKER_PROFILES)
+    assert {q.name for q in celery_app.conf.task_queues} == set(WORKER_PROFILES)
+
+def test_routes_and_priorities():
+    assert route("app.tasks.curriculum_tasks.curriculum_generation")["queue"].name == "llm-io"
+    assert route("app.tasks.content_tasks.extract_job")["queue"].name == "cpu"
+    assert route("app.tasks.assessment_tasks.grading")["priority"] == PRIORITY_HIGH
+    # Explicit options, e.g. batch fan-out, override the route's priority
+    assert route("app.tasks.assessment_tasks.grading", priority=PRIORITY_LOW)["priority"] == PRIORITY_LOW
+    assert celery_app.conf.task_default_priority == PRIORITY_NORMAL
+
+def test_worker_profiles():
+    assert worker_argv("llm-io")[2:] == ["--queues=llm-io", "--hostname=llm-io@%h", "--pool=threads", "--concurrency=100"]
+    assert "--pool=prefork" in worker_argv("cpu")
+    with pytest.raises(ValueError):
+        worker_argv("default")
+
+def test_nightly_progress_is_scheduled_on_an_importable_task():
+    entry = celery_app.conf.beat_schedule["nightly-student-progress"]
+    module, name = entry["task"].rsplit(".", 1)
+    assert module in celery_app.conf.include
+    assert callable(getattr(importlib.import_module(module), name))
+    assert route(entry["task"])["queue"].name == "db-bulk"
@@ -0,0 +1,109 @@
+import csv
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import pytest
+from PyPDF2 import PdfReader
+from app.models.user import User
+from app.models.curriculum import Curriculum, Assessment, Question
+from app.models.student import Student, AssessmentAttempt
+from app.services.class_report_export import ClassReportExport, S3MultipartWriter, iter_attempt_batches
+
+class FakeS3:
+    def __init__(self):
+        self.parts = {}
+        self.objects = {}
+        self.aborted = []
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.parts[Key] = []
+        return {"UploadId": f"upload-{Key}"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[Key].append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        assert [p["PartNumber"] for p in MultipartUpload["Parts"]] == list(range(1, len(self.parts[Key]) + 1))
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.parts.pop(Key)
+        self.aborted.append(Key)
+
+@pytest.fixture
+def db(db):
+    db.add(User(id=1, email="teacher@example.com", hashed_password="x", name="Teacher"))
+    db.add(Curriculum(id=1, title="Biology", subject="Biology", grade_level="9", created_by=1))
+    db.add(Assessment(id=1, title="Cells quiz", curriculum_id=1))
+    db.add_all([
+        Question(id=1, assessment_id=1, question_text="Name an organelle", question_type="short_answer", points=10),
+        Question(id=2, assessment_id=1, question_text="What is ATP?", question_type="short_answer", points=10)
+    ])
+    for n in range(1, 26):
+        db.add(Student(id=n, name=f"Student {n}", email=f"s{n}@example.com"))
+        db.add(AssessmentAttempt(
+            student_id=n, assessment_id=1,
+            answers={"1": "Mitochondria", "2": "Energy"},
+            # Every fifth attempt is still ungraded
+            total_score=None if n % 5 == 0 else float(n % 20),
+            max_score=20,
+            feedback={"1": {"score": 10, "feedback": "Correct"}, "2": {"score": n % 20 - 10, "feedback": "Partly"}},
+            submitted_at=datetime(2024, 3, 1, tzinfo=timezone.utc)
+        ))
+    db.commit()
+    return db
+
+def test_batches_are_keyset_paged_and_skip_ungraded(db):
+    batches = list(iter_attempt_batches(db, 1, batch_size=7))
+    assert [len(b) for b in batches] == [7, 7, 6]
+    ids = [row["id"] for batch in batches for row in batch]
+    assert ids == sorted(ids) and len(set(ids)) == 20
+    assert set(batches[0][0]) >= {"student_name", "email", "total_score", "answers"}
+
+def test_export_writes_one_zip_with_reports_summary_and_csv(db):
+    s3 = FakeS3()
+    progress = []
+    with ThreadPoolExecutor(2) as pool:
+        result = ClassReportExport(db, s3, "bucket", render_pool=pool, batch_size=6,
+                                   progress=lambda done, total: progress.append((done, total))).run(1, "exports/class.zip")
+
+    assert progress == [(6, 20), (12, 20), (18, 20), (20, 20)]
+    assert result["reports"] == 20
+    assert result["size_bytes"] == len(s3.objects["exports/class.zip"])
+
+    archive = zipfile.ZipFile(io.BytesIO(s3.objects["exports/class.zip"]))
+    reports = [n for n in archive.namelist() if n.startswith("students/")]
+    assert len(reports) == 20 and "students/1_Student_1.pdf" in reports
+    assert archive.getinfo("students/1_Student_1.pdf").compress_type == zipfile.ZIP_STORED
+
+    text = PdfReader(io.BytesIO(archive.read("students/3_Student_3.pdf"))).pages[0].extract_text()
+    assert "Student 3" in text and "What is ATP?" in text and "Mitochondria" in text
+
+    rows = list(csv.DictReader(io.StringIO(archive.read("results.csv").decode())))
+    assert len(rows) == 20 and rows[0]["percentage"] == "5.0" and rows[0]["grade"] == "F"
+
+    summary = "".join(p.extract_text() for p in PdfReader(io.BytesIO(archive.read("summary.pdf"))).pages)
+    assert "class summary" in summary and "Student 24" in summary
+    assert result["summary"]["students"] == 20
+    assert result["summary"]["A grades"] + result["summary"]["F grades"] <= 20
+
+def test_failed_export_aborts_the_upload(db):
+    s3 = FakeS3()
+    exporter = ClassReportExport(db, s3, "bucket", render_pool=ThreadPoolExecutor(1))
+    exporter.progress = lambda done, total: (_ for _ in ()).throw(RuntimeError("cancelled"))
+
+    with pytest.raises(RuntimeError):
+        exporter.run(1, "exports/broken.zip")
+    assert s3.aborted == ["exports/broken.zip"] and "exports/broken.zip" not in s3.objects
+
+def test_multipart_writer_splits_into_parts():
+    s3 = FakeS3()
+    writer = S3MultipartWriter(s3, "bucket", "big.bin", part_size=10)
+    writer.write(b"a" * 25)
+    writer.write(b"b" * 5)
+    writer.close()
+
+    assert s3.objects["big.bin"] == b"a" * 25 + b"b" * 5
+    assert writer.tell() == 30
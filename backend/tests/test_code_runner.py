@@ -0,0 +1,96 @@
+import asyncio
+from agents.code_runner import SandboxPool, detect_function_name
+
+SOLUTION = """
+def add(a, b):
+    print("working...")
+    return a + b
+"""
+
+def _run(code, cases, **limits):
+    async def run():
+        pool = SandboxPool({"workers": 2, "timeout_seconds": 1, **limits})
+        try:
+            return await pool.run_tests(code, cases)
+        finally:
+            await pool.aclose()
+    return asyncio.run(run())
+
+def test_results_are_exact_per_case():
+    result = _run(SOLUTION, [
+        {"input": "(1, 2)", "expected_output": "3"},
+        {"args": [2, 2], "expected_output": 5},
+        {"input": "(0, 0)", "expected_output": 0}
+    ])
+
+    assert result["function"] == "add"
+    assert result["tests_passed"] == 2
+    assert [c["status"] for c in result["cases"]] == ["passed", "failed", "passed"]
+    assert result["cases"][1]["actual"] == "4"
+
+def test_infinite_loop_times_out():
+    looping = "def f(x):\n    while True:\n        pass\n"
+    result = _run(looping, [{"input": "1", "expected_output": "1"}] * 3)
+    assert [c["status"] for c in result["cases"]] == ["timeout"] * 3
+
+def test_process_control_is_blocked():
+    code = "import os\ndef f(x):\n    return os.system('true')\n"
+    result = _run(code, [{"input": "1", "expected_output": "0"}])
+    assert result["cases"][0]["status"] == "error"
+    assert "PermissionError" in result["cases"][0]["error"]
+
+def test_script_submissions_read_stdin():
+    result = _run("n = int(input())\nprint(n * 2)\n", [{"input": "21", "expected_output": "42"}])
+    assert result["function"] is None
+    assert result["tests_passed"] == 1
+
+def test_forged_reports_cannot_pass_a_case():
+    forging = (
+        "import os\n"
+        "def add(a, b):\n"
+        "    for fd in range(3, 64):\n"
+        "        try:\n"
+        "            os.write(fd, b'{\"status\": \"passed\", \"actual\": \"3\"}\\n')\n"
+        "        except OSError:\n"
+        "            pass\n"
+        "    return 0\n"
+    )
+    result = _run(forging, [{"input": "(1, 2)", "expected_output": "3"}], workers=1)
+    assert result["cases"][0]["status"] != "passed"
+
+    # The same zygote keeps answering in step afterwards
+    assert _run(SOLUTION, [{"input": "(1, 2)", "expected_output": "3"}], workers=1)["tests_passed"] == 1
+
+def test_state_does_not_leak_between_submissions():
+    tampering = (
+        "import builtins, sys, resource\n"
+        "builtins.print = None\n"
+        "sys.modules['math'] = None\n"
+        "def f(x):\n"
+        "    try:\n"
+        "        resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))\n"
+        "    except (ValueError, OSError):\n"
+        "        pass\n"
+        "    return x\n"
+    )
+    honest = "import math\ndef f(x):\n    print('ok')\n    return math.sqrt(x)\n"
+
+    async def run():
+        pool = SandboxPool({"workers": 1, "timeout_seconds": 1})
+        try:
+            first = await pool.run_tests(tampering, [{"input": "1", "expected_output": "1"}])
+            second = await pool.run_tests(honest, [{"input": "16", "expected_output": "4.0"}])
+            looping = await pool.run_tests("def f(x):\n    while True:\n        pass\n",
+                                           [{"input": "1", "expected_output": "1"}])
+            return first, second, looping
+        finally:
+            await pool.aclose()
+
+    first, second, looping = asyncio.run(run())
+    assert first["tests_passed"] == 1
+    assert second["tests_passed"] == 1
+    assert second["cases"][0]["stdout"] == "ok\n"
+    assert looping["cases"][0]["status"] in ("timeout", "resource_limit")
+
+def test_detect_function_name():
+    assert detect_function_name("import math\n\ndef solve(n):\n    return n\n") == "solve"
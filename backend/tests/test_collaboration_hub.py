@@ -0,0 +1,190 @@
+import asyncio
+import json
+import pytest
+import fakeredis.aioredis
+from app.services.collaboration_service import CollaborationService
+from app.services.collaboration_hub import CollaborationHub
+
+class FakeSocket:
+    def __init__(self, delay: float = 0):
+        self.sent = []
+        self.delay = delay
+        self.closed_with = None
+
+    async def send_text(self, data):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+def _hub(server, **kwargs):
+    service = CollaborationService(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    return CollaborationHub(service, **kwargs)
+
+def test_cursor_moves_are_coalesced_per_tick(server):
+    async def run():
+        hub = _hub(server, tick_seconds=0.05)
+        session_id = await hub.service.create_collaboration_session(3, "user_0", "Host")
+        sockets = [FakeSocket() for _ in range(30)]
+        connections = [await hub.connect(session_id, f"user_{i}", f"U{i}", s) for i, s in enumerate(sockets)]
+        await asyncio.sleep(0.05)
+
+        # Every participant moves their cursor 20 times within one tick
+        for step in range(20):
+            for connection in connections:
+                await hub.handle_message(session_id, connection, {"type": "cursor", "position": {"offset": step}})
+        await asyncio.sleep(0.2)
+
+        state = await hub.service.get_session_state(session_id)
+        await hub.aclose()
+        return sockets, state
+
+    sockets, state = asyncio.run(run())
+    frames = [f for f in sockets[0].sent if f.get("presence")]
+    assert 1 <= len(frames) <= 2
+    latest = {}
+    for frame in frames:
+        latest.update(frame["presence"])
+    assert len(latest) == 29 and all(p == {"offset": 19} for p in latest.values())
+    assert state["participants"]["user_5"]["cursor_position"] == {"offset": 19}
+
+def test_deltas_are_batched_and_acknowledged(server):
+    async def run():
+        hub = _hub(server, tick_seconds=0.1)
+        session_id = await hub.service.create_collaboration_session(3, "a", "Ada")
+        editor, viewer = FakeSocket(), FakeSocket()
+        writer = await hub.connect(session_id, "a", "Ada", editor)
+        await hub.connect(session_id, "b", "Grace", viewer)
+        await asyncio.sleep(0.05)
+
+        for i in range(5):
+            await hub.handle_message(session_id, writer, {
+                "type": "change", "change": {"type": "text_edit", "field_path": f"f{i}", "value": i, "client_seq": i + 1}
+            })
+        await asyncio.sleep(0.25)
+        await hub.aclose()
+        return editor, viewer
+
+    editor, viewer = asyncio.run(run())
+    assert viewer.sent[0]["type"] == "state"
+    delta_frames = [f for f in viewer.sent if f.get("deltas")]
+    assert len(delta_frames) <= 2
+    assert [d["version"] for f in delta_frames for d in f["deltas"]] == [1, 2, 3, 4, 5]
+    acks = [f for f in editor.sent if f["type"] == "ack"]
+    assert [a["client_seq"] for a in acks] == [1, 2, 3, 4, 5] and all(a["applied"] for a in acks)
+
+def test_slow_consumer_is_told_to_resync_then_dropped(server):
+    async def run():
+        hub = _hub(server, tick_seconds=0.01, max_pending_frames=2, max_lagging_ticks=5)
+        session_id = await hub.service.create_collaboration_session(3, "a", "Ada")
+        fast, slow = FakeSocket(), FakeSocket(delay=10)
+        writer = await hub.connect(session_id, "a", "Ada", fast)
+        lagging = await hub.connect(session_id, "b", "Grace", slow)
+        await asyncio.sleep(0.02)
+
+        for i in range(30):
+            await hub.handle_message(session_id, writer, {
+                "type": "change", "change": {"type": "text_edit", "field_path": "title", "value": i}
+            })
+            await asyncio.sleep(0.015)
+        await asyncio.sleep(0.1)
+        remaining = set(hub.rooms[session_id].connections)
+        await hub.aclose()
+        return lagging, remaining
+
+    lagging, remaining = asyncio.run(run())
+    assert lagging not in remaining
+    assert lagging.websocket.closed_with == 1013
+    assert lagging.dropped_frames > 0
+
+def test_changes_published_right_after_joining_are_delivered(server):
+    async def run():
+        hub = _hub(server, tick_seconds=0.02)
+        session_id = await hub.service.create_collaboration_session(3, "a", "Ada")
+        socket = FakeSocket()
+        await hub.connect(session_id, "b", "Grace", socket)
+        # Another worker writes as soon as the join has returned
+        other = CollaborationService(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        await other.apply_change(session_id, "a", {"type": "text_edit", "field_path": "title", "value": "x"})
+        await asyncio.sleep(0.1)
+        await hub.aclose()
+        return socket
+
+    socket = asyncio.run(run())
+    assert [d["version"] for f in socket.sent if f.get("deltas") for d in f["deltas"]] == [1]
+
+def test_malformed_frames_get_an_error_reply(server):
+    async def run():
+        hub = _hub(server, tick_seconds=0.02)
+        session_id = await hub.service.create_collaboration_session(3, "a", "Ada")
+        socket = FakeSocket()
+
+        messages = [
+            ["not", "an", "object"],
+            {"type": "change", "change": {"type": "text_edit", "field_path": ["modules", ["0"]], "value": 1}},
+            {"type": "change", "change": {"type": "text_insert", "field_path": "title", "position": [1]}},
+            {"type": "lock", "field_path": {"a": 1}},
+            {"type": "resync", "version": "latest"}
+        ]
+        received = asyncio.Queue()
+        socket.receive_text = lambda: received.get()
+        for message in messages:
+            received.put_nowait(json.dumps(message))
+
+        serving = asyncio.create_task(hub.serve(session_id, "a", "Ada", socket))
+        await asyncio.sleep(0.1)
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        await hub.aclose()
+        return socket
+
+    socket = asyncio.run(run())
+    errors = [f for f in socket.sent if f["type"] == "error"]
+    assert len(errors) == 5
+
+def test_session_access_lists_creator_and_participants(server):
+    async def run():
+        service = CollaborationService(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        session_id = await service.create_collaboration_session(3, "a", "Ada")
+        await service.join_session(session_id, "b", "Grace")
+        return await service.session_access(session_id), await service.session_access("missing")
+
+    access, missing = asyncio.run(run())
+    assert access == {"curriculum_id": 3, "created_by": "a", "participants": {"a", "b"}}
+    assert missing is None
+
+def test_owner_creates_a_session_over_http_then_connects(server, monkeypatch):
+    import jwt
+    from fastapi.testclient import TestClient
+    import main
+
+    hub = _hub(server, tick_seconds=0.02)
+    users = {
+        email: {"id": user_id, "email": email, "full_name": name, "role": "teacher"}
+        for user_id, email, name in [("user_1", "ada@example.com", "Ada"), ("user_2", "grace@example.com", "Grace")]
+    }
+    monkeypatch.setattr(main, "users_db", users)
+    monkeypatch.setattr(main, "curricula_db", {"curr_7": {"id": "curr_7", "created_by": "user_1"}})
+    monkeypatch.setattr(main, "get_collaboration_hub", lambda: hub)
+    token = {email: jwt.encode({"email": email}, main.JWT_SECRET, algorithm="HS256") for email in users}
+
+    with TestClient(main.app) as client:
+        def create(email, curriculum_id):
+            return client.post("/api/collaboration/sessions", json={"curriculum_id": curriculum_id},
+                               headers={"Authorization": f"Bearer {token[email]}"})
+
+        assert create("grace@example.com", "curr_7").status_code == 403
+        assert create("ada@example.com", "curr_8").status_code == 404
+        response = create("ada@example.com", "curr_7")
+        assert response.status_code == 200
+        socket_url = response.json()["socket_url"]
+
+        with client.websocket_connect(f"{socket_url}?token={token['ada@example.com']}") as websocket:
+            frame = websocket.receive_json()
+            assert frame["type"] == "state"
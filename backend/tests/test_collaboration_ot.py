@@ -0,0 +1,49 @@
+from app.services.collaboration_ot import normalize_change, transform, transform_against, apply_op
+
+def _apply_all(document, ops):
+    return [apply_op(document, op) for op in ops]
+
+def test_concurrent_inserts_and_deletes_keep_intent():
+    document = {"modules": [{"title": "a"}, {"title": "b"}, {"title": "c"}]}
+    insert = normalize_change({"type": "add_item", "array_path": "modules", "index": 0, "item": {"title": "intro"}})
+    rename = normalize_change({"type": "text_edit", "field_path": "modules.2.title", "value": "C"})
+    apply_op(document, insert)
+
+    assert transform(rename, insert) == [{"op": "set", "path": ["modules", 3, "title"], "value": "C"}]
+    _apply_all(document, transform(rename, insert))
+    assert [m["title"] for m in document["modules"]] == ["intro", "a", "b", "C"]
+
+    delete = normalize_change({"type": "remove_item", "array_path": "modules", "item_index": 1})
+    nested = normalize_change({"type": "text_edit", "field_path": "modules.1.title", "value": "A"})
+    same = normalize_change({"type": "remove_item", "array_path": "modules", "item_index": 1})
+    assert transform(nested, delete) == []
+    assert transform(same, delete) == []
+
+def test_text_ops_converge():
+    base = {"body": "hello world"}
+    ours = normalize_change({"type": "text_insert", "field_path": "body", "position": 5, "text": ","})
+    theirs = normalize_change({"type": "text_delete", "field_path": "body", "position": 0, "length": 6})
+
+    left, right = {**base}, {**base}
+    _apply_all(left, [ours] + transform_against([theirs], [ours]))
+    _apply_all(right, [theirs] + transform_against([ours], [theirs]))
+    assert left == right == {"body": ",world"}
+
+def test_delete_around_concurrent_insert_is_split():
+    document = {"body": "abcdef"}
+    typed = normalize_change({"type": "text_insert", "field_path": "body", "position": 3, "text": "XY"})
+    removed = normalize_change({"type": "text_delete", "field_path": "body", "position": 1, "length": 4})
+    apply_op(document, typed)
+
+    _apply_all(document, transform(removed, typed))
+    assert document == {"body": "aXYf"}
+
+def test_set_replaces_nested_edits_and_appends_get_an_index():
+    document = {"unit": {"items": []}}
+    replace = normalize_change({"type": "set", "field_path": "unit", "value": {"items": ["x"]}})
+    append = normalize_change({"type": "add_item", "array_path": "unit.items", "item": "y"})
+    assert transform(append, replace) == []
+
+    apply_op(document, replace)
+    assert apply_op(document, append)["index"] == 1
+    assert apply_op(document, normalize_change({"type": "remove_item", "array_path": "unit.items", "item_index": 9})) is None
@@ -0,0 +1,198 @@
+import asyncio
+import gzip
+import json
+import pytest
+import fakeredis.aioredis
+from app.services.collaboration_service import CollaborationService
+from app.services.collaboration_ot import apply_op
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+def _service(server, **kwargs):
+    # Each instance stands in for a separate uvicorn worker sharing one Redis
+    return CollaborationService(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), **kwargs)
+
+def test_workers_share_session_state(server):
+    async def run():
+        worker_a, worker_b = _service(server), _service(server)
+        session_id = await worker_a.create_collaboration_session(3, 1, "Ada")
+        joined = await worker_b.join_session(session_id, 2, "Grace")
+
+        await worker_a.apply_change(session_id, 1, {"type": "text_edit", "field_path": "title", "value": "Algebra"})
+        result = await worker_b.apply_change(session_id, 2, {"type": "text_edit", "field_path": "unit.goal", "value": "Solve"})
+
+        state = await worker_a.get_session_state(session_id)
+        history = await worker_a.get_change_history(session_id)
+        return joined, result, state, history
+
+    joined, result, state, history = asyncio.run(run())
+    assert set(joined["participants"]) == {"1", "2"}
+    assert result["version"] == 2
+    assert state["document_state"] == {"title": "Algebra", "unit": {"goal": "Solve"}}
+    assert [c["version"] for c in history] == [1, 2]
+
+def test_concurrent_changes_are_all_applied(server):
+    async def run():
+        workers = [_service(server) for _ in range(4)]
+        session_id = await workers[0].create_collaboration_session(3, 1, "Ada")
+        await asyncio.gather(*(
+            workers[i % 4].apply_change(session_id, i, {"type": "text_edit", "field_path": f"field_{i}", "value": i})
+            for i in range(20)
+        ))
+        return await workers[1].get_session_state(session_id)
+
+    state = asyncio.run(run())
+    assert state["version"] == 20
+    assert len(state["document_state"]) == 20
+
+def test_locked_edits_conflict_and_stale_edits_merge(server):
+    async def run():
+        service = _service(server)
+        session_id = await service.create_collaboration_session(3, 1, "Ada")
+        await service.join_session(session_id, 2, "Grace")
+
+        assert await service.lock_field(session_id, 1, "title")
+        assert not await service.lock_field(session_id, 2, "title")
+        locked = await service.apply_change(session_id, 2, {"type": "text_edit", "field_path": "title", "value": "x"})
+        await service.unlock_field(session_id, 1, "title")
+
+        await service.apply_change(session_id, 1, {"type": "set", "field_path": "modules", "value": ["a", "b"]})
+        # Both edits were made against version 1
+        await service.apply_change(
+            session_id, 1, {"type": "add_item", "array_path": "modules", "index": 0, "item": "intro", "base_version": 1}
+        )
+        stale = await service.apply_change(
+            session_id, 2, {"type": "remove_item", "array_path": "modules", "item_index": 1, "base_version": 1}
+        )
+        return locked, stale, await service.get_session_state(session_id)
+
+    locked, stale, state = asyncio.run(run())
+    assert not locked["applied"] and locked["conflict"]["type"] == "field_locked"
+    assert stale["applied"] and stale["conflict"] is None
+    assert stale["ops"] == [{"op": "delete", "path": ["modules"], "index": 2}]
+    assert state["document_state"] == {"modules": ["intro", "a"]}
+
+def test_duplicates_and_trimmed_history(server):
+    async def run():
+        service = _service(server, max_history=2)
+        session_id = await service.create_collaboration_session(3, 1, "Ada")
+        change = {"type": "text_edit", "field_path": "title", "value": "Algebra", "client_seq": 1}
+        first = await service.apply_change(session_id, 1, change)
+        retry = await service.apply_change(session_id, 1, change)
+        for i in range(5):
+            await service.apply_change(session_id, 2, {"type": "text_edit", "field_path": "title", "value": i})
+        behind = await service.apply_change(
+            session_id, 1, {"type": "text_edit", "field_path": "title", "value": "x", "base_version": 1}
+        )
+        return first, retry, behind
+
+    first, retry, behind = asyncio.run(run())
+    assert first["applied"] and first["vector"] == {"1": 1}
+    assert not retry["applied"] and retry["conflict"]["type"] == "duplicate"
+    assert not behind["applied"] and behind["conflict"]["type"] == "resync_required"
+
+def test_change_log_is_capped_and_events_fan_out(server):
+    async def run():
+        service = _service(server, max_history=5)
+        listener = _service(server)
+        session_id = await service.create_collaboration_session(3, 1, "Ada")
+
+        events = []
+        ready = asyncio.Event()
+
+        async def listen():
+            stream = listener.subscribe(session_id)
+            ready.set()
+            async for event in stream:
+                events.append(event)
+                if len(events) == 3:
+                    break
+
+        task = asyncio.create_task(listen())
+        await ready.wait()
+        await asyncio.sleep(0.05)
+        for i in range(3):
+            await service.apply_change(session_id, 1, {"type": "text_edit", "field_path": "title", "value": i})
+        await asyncio.wait_for(task, timeout=2)
+
+        for i in range(20):
+            await service.apply_change(session_id, 1, {"type": "text_edit", "field_path": "title", "value": i})
+        return events, await service.redis.xlen(service._changes_key(session_id))
+
+    events, history_length = asyncio.run(run())
+    assert [e["ops"][0]["value"] for e in events] == [0, 1, 2]
+    assert all(e["type"] == "delta" and "document_state" not in e for e in events)
+    assert history_length <= 10
+
+def test_snapshots_compact_the_log_and_joiners_catch_up(server):
+    async def run():
+        service = _service(server, snapshot_interval=10, retained_segments=2)
+        session_id = await service.create_collaboration_session(3, 1, "Ada")
+        for i in range(35):
+            await service.apply_change(session_id, 1, {"type": "text_edit", "field_path": f"f{i % 7}", "value": i})
+
+        retained = await service.redis.xlen(service._changes_key(session_id))
+        tail = await service.get_change_history(session_id, limit=3)
+        page = await service.get_change_history(session_id, limit=3, before_version=tail[0]["version"])
+        recent = await service.join_session(session_id, 2, "Grace", since_version=33)
+        fresh = await service.join_session(session_id, 3, "Alan")
+        state = await service.get_session_state(session_id)
+        return retained, tail, page, recent, fresh, state
+
+    retained, tail, page, recent, fresh, state = asyncio.run(run())
+    assert retained == 15
+    assert [c["version"] for c in tail] == [33, 34, 35]
+    assert [c["version"] for c in page] == [30, 31, 32]
+    assert recent["base_version"] == 33 and len(recent["ops"]) == 2 and "snapshot" not in recent
+
+    assert fresh["base_version"] == 30 and len(fresh["ops"]) == 5
+    document = fresh["snapshot"]
+    for op in fresh["ops"]:
+        apply_op(document, op)
+    assert document == state["document_state"]
+
+class FakeArchive:
+    def __init__(self, available=True):
+        self.uploads = {}
+        self.available = available
+
+    def upload_file(self, content, key, content_type):
+        self.uploads[key] = json.loads(gzip.decompress(content))
+        return f"s3://bucket/{key}"
+
+def test_idle_sessions_are_evicted_to_cold_storage(server):
+    async def run():
+        archive = FakeArchive()
+        service = _service(server, archive=archive)
+        idle = await service.create_collaboration_session(3, 1, "Ada")
+        busy = await service.create_collaboration_session(4, 2, "Grace")
+        await service.apply_change(idle, 1, {"type": "text_edit", "field_path": "title", "value": "Algebra"})
+        await service.leave_session(idle, 1)
+
+        evicted = await service.cleanup_inactive_sessions(max_age_hours=-1)
+        return archive, idle, busy, evicted, await service.redis.exists(service._session_key(idle))
+
+    archive, idle, busy, evicted, remaining = asyncio.run(run())
+    assert evicted == [idle] and not remaining
+    record = archive.uploads[f"collaboration-archive/3/{idle}.json.gz"]
+    assert record["document_state"] == {"title": "Algebra"} and record["version"] == 1
+    assert [c["version"] for c in record["changes"]] == [1]
+
+class FailingArchive(FakeArchive):
+    def upload_file(self, content, key, content_type):
+        return None
+
+@pytest.mark.parametrize("archive", [FakeArchive(available=False), FailingArchive()])
+def test_sessions_are_kept_without_a_confirmed_upload(server, archive):
+    async def run():
+        service = _service(server, archive=archive)
+        idle = await service.create_collaboration_session(3, 1, "Ada")
+        await service.leave_session(idle, 1)
+
+        evicted = await service.cleanup_inactive_sessions(max_age_hours=-1)
+        return evicted, await service.redis.exists(service._session_key(idle))
+
+    evicted, remaining = asyncio.run(run())
+    assert evicted == [] and remaining
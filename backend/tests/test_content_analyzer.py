@@ -0,0 +1,52 @@
+import io
+import docx
+from app.services.content_extractor import ContentExtractor, ContentAnalyzer
+
+TEXT = (
+    "Photosynthesis converts light energy into chemical energy. Chlorophyll absorbs light "
+    "in the chloroplasts, and photosynthesis produces glucose. Scientists test each hypothesis "
+    "with a careful experiment.\n"
+) * 40
+
+def chunks(text, size):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+def test_whole_text_analysis():
+    result = ContentExtractor().analyze_content(TEXT)
+
+    assert result["word_count"] == len(TEXT.split())
+    assert result["character_count"] == len(TEXT)
+    assert result["content_type"] == "science"
+    assert result["complexity_level"] == "advanced"
+    assert result["key_topics"][:2] == ["photosynthesis", "light"]
+
+def test_chunked_input_matches_whole_text_at_any_boundary():
+    expected = ContentExtractor().analyze_content(TEXT)
+    for size in (1, 7, 64, 1000):
+        assert ContentExtractor().analyze_content(chunks(TEXT, size)) == expected
+
+def test_keyword_split_across_chunks_is_detected():
+    analyzer = ContentAnalyzer()
+    for chunk in ["Write the algo", "rithm down"]:
+        analyzer.feed(chunk)
+    result = analyzer.result()
+    assert result["content_type"] == "computer_science"
+    assert result["word_count"] == 4
+
+def test_empty_input():
+    result = ContentExtractor().analyze_content(iter([]))
+    assert result["word_count"] == 0 and result["key_topics"] == []
+    assert result["content_type"] == "general_education" and result["complexity_level"] == "elementary"
+
+def test_docx_paragraphs_stream_into_the_analyzer():
+    document = docx.Document()
+    for paragraph in TEXT.splitlines():
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    extractor = ContentExtractor()
+    streamed = extractor.analyze_content(extractor.iter_docx_text(buffer.getvalue()))
+    assert streamed["word_count"] == len(TEXT.split())
+    assert streamed["key_topics"] == extractor.analyze_content(TEXT)["key_topics"]
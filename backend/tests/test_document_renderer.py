@@ -0,0 +1,69 @@
+import asyncio
+import io
+import docx
+import pytest
+from PyPDF2 import PdfReader
+from app.services.document_renderer import compile_layout, render_pdf, wrap_text, text_width
+from app.services.export_service import ExportService
+
+CURRICULUM = {
+    "curriculum_overview": "Biology for grade 9",
+    "learning_objectives": ["Explain photosynthesis", "Describe cell respiration"],
+    "weekly_modules": [
+        {
+            "title": f"Week {week}: Cells",
+            "learning_outcomes": ["Identify organelles"],
+            "content_blocks": [{"title": "Lab", "description": "Microscope work " * 40,
+                                "estimated_duration": 90, "activities": [{"title": "Slide prep"}]}],
+            "summative_assessment": {"title": f"Week {week} quiz"}
+        } for week in range(1, 9)
+    ],
+    "assessment_strategy": {"formative_frequency": "Weekly"}
+}
+
+def test_layouts_are_compiled_once_per_format():
+    assert compile_layout("lesson_plan", "detailed", "pdf") is compile_layout("lesson_plan", "detailed", "pdf")
+    assert compile_layout("lesson_plan", "detailed", "docx") is not compile_layout("lesson_plan", "detailed", "pdf")
+
+def test_wrapped_lines_fit_the_width():
+    lines = wrap_text("Photosynthesis " * 30 + "x" * 200, "F1", 10, 200)
+    assert len(lines) > 5
+    assert all(text_width(line, "F1", 10) <= 200 for line in lines)
+
+def test_pdf_is_streamed_page_by_page():
+    chunks = list(render_pdf("lesson_plan", CURRICULUM))
+    reader = PdfReader(io.BytesIO(b"".join(chunks)))
+
+    assert len(reader.pages) > 1
+    assert len(chunks) >= len(reader.pages)
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert "Biology for grade 9" in text and "Week 8 quiz" in text and "Formative frequency: Weekly" in text
+
+def test_summary_variant_and_report_tables():
+    service = ExportService(s3_client=object())
+    detailed = PdfReader(io.BytesIO(service.export_lesson_plan_pdf(CURRICULUM)))
+    summary = PdfReader(io.BytesIO(service.export_lesson_plan_pdf(CURRICULUM, "summary")))
+    assert len(summary.pages) < len(detailed.pages)
+
+    results = [{"student_name": f"Student {i}", "score": i, "percentage": i, "grade": "A"} for i in range(300)]
+    report = PdfReader(io.BytesIO(service.export_assessment_report({"title": "Unit 1"}, results)))
+    assert len(report.pages) > 3
+    assert "Average percentage: 149.5" in report.pages[0].extract_text()
+    assert "Student 299" in report.pages[-1].extract_text()
+
+def test_docx_export_renders_in_the_worker_pool():
+    async def run():
+        service = ExportService(s3_client=object())
+        return b"".join(await service.stream_export("lesson_plan", CURRICULUM, "docx"))
+
+    document = docx.Document(io.BytesIO(asyncio.run(run())))
+    texts = [p.text for p in document.paragraphs]
+    assert texts[0] == "Biology for grade 9"
+    assert "Week 8: Cells" in texts
+
+def test_stream_export_raises_before_streaming():
+    async def run():
+        await ExportService(s3_client=object()).stream_export("lesson_plan", CURRICULUM, "txt")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
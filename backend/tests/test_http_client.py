@@ -0,0 +1,99 @@
+import asyncio
+import httpx
+import pytest
+from app.core.http_client import HTTPClientRegistry
+
+def make_registry(handler):
+    registry = HTTPClientRegistry(profiles={
+        "default": {
+            "max_connections": 5,
+            "max_keepalive_connections": 5,
+            "keepalive_expiry": 5.0,
+            "connect_timeout": 1.0,
+            "read_timeout": 1.0,
+            "retries": 2,
+            "backoff_seconds": 0
+        }
+    })
+    registry._build_client = lambda key: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return registry
+
+def test_same_host_shares_client():
+    registry = make_registry(lambda request: httpx.Response(200))
+    first = registry.client("https://oauth2.googleapis.com/token")
+    second = registry.client("https://oauth2.googleapis.com/other")
+    other_host = registry.client("https://graph.microsoft.com/v1.0/me")
+    assert first is second
+    assert first is not other_host
+    asyncio.run(registry.aclose())
+
+def test_idempotent_request_retries_on_503():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503 if len(calls) < 3 else 200)
+
+    registry = make_registry(handler)
+    response = asyncio.run(registry.get("https://example.com/userinfo"))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert registry.metrics()["clients"]["default:https://example.com"]["retries"] == 2
+
+def test_post_is_not_retried_on_status():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    registry = make_registry(handler)
+    response = asyncio.run(registry.post("https://example.com/token", data={"code": "abc"}))
+    assert response.status_code == 503
+    assert calls == ["POST"]
+
+def test_aclose_closes_clients():
+    registry = make_registry(lambda request: httpx.Response(200))
+    client = registry.client("https://example.com")
+    asyncio.run(registry.aclose())
+    assert client.is_closed
+    assert registry.client("https://example.com") is not client
+
+def test_post_is_not_replayed_after_a_read_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        raise httpx.ReadTimeout("no response", request=request)
+
+    registry = make_registry(handler)
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(registry.post("https://example.com/token", data={"code": "abc"}))
+    assert calls == ["POST"]
+
+def test_post_is_retried_when_the_connection_fails():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) < 2:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    registry = make_registry(handler)
+    response = asyncio.run(registry.post("https://example.com/token", data={"code": "abc"}))
+    assert response.status_code == 200
+    assert calls == ["POST", "POST"]
+
+def test_get_is_retried_after_a_read_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) < 2:
+            raise httpx.ReadError("reset", request=request)
+        return httpx.Response(200)
+
+    registry = make_registry(handler)
+    assert asyncio.run(registry.get("https://example.com/userinfo")).status_code == 200
+    assert calls == ["GET", "GET"]
@@ -0,0 +1,68 @@
+from app.services.json_path import compile_path, get_path, set_path, apply_patches, MISSING
+
+def test_path_syntaxes_compile_to_the_same_cached_accessor():
+    dotted = compile_path("modules.0.title")
+    assert compile_path("modules.0.title") is dotted
+    assert compile_path("modules[0].title").segments == ("modules", 0, "title")
+    assert compile_path("/modules/0/title").segments == ("modules", 0, "title")
+    assert compile_path(["modules", "0", "title"]).segments == ("modules", 0, "title")
+    assert compile_path("/a~1b/c~0d").segments == ("a/b", "c~d")
+    assert compile_path(None).segments == compile_path("").segments == ()
+
+def test_get_set_insert_remove_on_dicts_and_lists():
+    document = {"modules": [{"title": "Intro", "blocks": []}], "meta": {"2024": "x"}}
+
+    assert get_path(document, "modules.0.title") == "Intro"
+    assert get_path(document, "meta.2024") == "x"
+    assert get_path(document, "modules.3.title", "missing") == "missing"
+
+    assert set_path(document, "modules.0.summary.text", "hi")
+    assert document["modules"][0]["summary"] == {"text": "hi"}
+    assert not set_path(document, "modules.5.title", "nope")
+    assert not set_path(document, "settings.theme", "dark", create=False)
+
+    blocks = compile_path("modules.0.blocks")
+    assert blocks.insert(document, "b") == 0
+    assert blocks.insert(document, "a", index=0) == 0
+    assert blocks.insert(document, "c", index=99) == 2
+    assert document["modules"][0]["blocks"] == ["a", "b", "c"]
+    assert blocks.remove(document, 1) == "b"
+    assert compile_path("modules.0.summary").remove(document) == {"text": "hi"}
+    assert compile_path("modules.0.nothing").remove(document) is MISSING
+
+def test_patch_batches_reuse_containers_and_respect_structural_changes():
+    document = {"modules": [{"title": "a"}, {"title": "b"}, {"title": "c"}]}
+    results = apply_patches(document, [
+        {"path": "modules.1.title", "value": "B"},
+        {"path": "modules.1.done", "value": True},
+        {"op": "remove", "path": "modules", "index": 0},
+        {"path": "modules.1.title", "value": "C"},
+        {"op": "insert", "path": "modules", "index": 0, "value": {"title": "intro"}},
+        {"op": "remove", "path": "modules.1.done"},
+        {"path": "modules.9.title", "value": "x"}
+    ])
+
+    assert results == [True, True, True, True, True, True, False]
+    assert document == {"modules": [{"title": "intro"}, {"title": "B"}, {"title": "C"}]}
+
+def test_zero_padded_segments_stay_dict_keys():
+    document = {"codes": {"007": "bond", "7": "seven"}, "items": ["a", "b"]}
+
+    assert compile_path("codes.007").segments == ("codes", "007")
+    assert get_path(document, "codes.007") == "bond"
+    assert get_path(document, "/codes/7") == "seven"
+    assert set_path(document, "codes.007", "james")
+    assert document["codes"] == {"007": "james", "7": "seven"}
+    assert get_path(document, "items.01") is None
+    assert get_path(document, ("items", "1")) == "b"
+
+def test_replacing_a_container_drops_its_cached_entry():
+    document = {"a": {"b": {"c": 1}}}
+    results = apply_patches(document, [
+        {"path": "a.b.c", "value": 2},
+        {"path": "a.b", "value": {"fresh": True}},
+        {"path": "a.b.x", "value": 3}
+    ])
+
+    assert results == [True, True, True]
+    assert document == {"a": {"b": {"fresh": True, "x": 3}}}
@@ -0,0 +1,86 @@
+import asyncio
+import itertools
+import pytest
+from sqlalchemy import event
+from app.core.pagination import keyset_page, encode_cursor, decode_cursor, MAX_PAGE_SIZE
+from app.models.user import User
+from app.models.curriculum import Curriculum
+
+@pytest.fixture
+def db(db):
+    db.add(User(id=1, email="a@example.com", name="A", hashed_password="x"))
+    db.add_all([
+        Curriculum(id=n, title=f"Unit {n}", subject="Biology", grade_level="9", created_by=1,
+                   content_data={"weekly_modules": ["x" * 1000]})
+        for n in range(1, 26)
+    ])
+    db.commit()
+    return db
+
+def test_pages_walk_every_row_once_newest_first(db):
+    query = db.query(Curriculum.id, Curriculum.title)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(query, Curriculum.id, cursor, limit=10)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+def test_new_rows_do_not_shift_later_pages(db):
+    query = db.query(Curriculum.id)
+    first, cursor = keyset_page(query, Curriculum.id, None, limit=10)
+    db.add(Curriculum(id=26, title="New", subject="Biology", grade_level="9", created_by=1))
+    db.commit()
+    second, _ = keyset_page(query, Curriculum.id, cursor, limit=10)
+    assert [r.id for r in second] == list(range(15, 5, -1))
+
+def test_projection_skips_heavy_columns_and_later_pages_seek(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    _, cursor = keyset_page(db.query(Curriculum.id, Curriculum.title), Curriculum.id, None, limit=5)
+    keyset_page(db.query(Curriculum.id, Curriculum.title), Curriculum.id, cursor, limit=5)
+
+    assert all("content_data" not in s for s in statements)
+    assert "WHERE curricula.id < ?" in statements[-1]
+
+def test_orm_rows_and_page_size_clamp(db):
+    rows, cursor = keyset_page(db.query(Curriculum), Curriculum.id, None, limit=1000)
+    assert len(rows) == min(25, MAX_PAGE_SIZE) and cursor is None
+    rows, cursor = keyset_page(db.query(Curriculum), Curriculum.id, None, limit=24)
+    assert decode_cursor(cursor) == rows[-1].id == 2
+
+def test_malformed_cursors_are_rejected():
+    assert decode_cursor(encode_cursor(42)) == 42
+    for cursor in ("not-base64!", encode_cursor("42"), "eyJ4IjoxfQ"):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+def test_concurrent_curriculum_creation_gets_unique_ids_in_listing_order(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "curricula_db", {})
+    monkeypatch.setattr(main, "curriculum_seq", [])
+    monkeypatch.setattr(main, "curriculum_ids", itertools.count(1))
+
+    async def current_user(credentials):
+        return {"id": "user_1"}
+
+    async def generate(prompt):
+        # Later requests finish first
+        await asyncio.sleep(0.01 * (5 - len(main.curricula_db)))
+        return "content"
+
+    monkeypatch.setattr(main, "get_current_user", current_user)
+    monkeypatch.setattr(main, "generate_with_bedrock", generate)
+
+    async def run():
+        created = await asyncio.gather(*(main.create_curriculum({"title": f"T{n}"}, None) for n in range(5)))
+        first = await main.get_curricula(None, 3, None)
+        second = await main.get_curricula(first["next_cursor"], 3, None)
+        return created, first, second
+
+    created, first, second = asyncio.run(run())
+    assert sorted(c["id"] for c in created) == [f"curr_{n}" for n in range(1, 6)]
+    listed = [c["id"] for c in first["curricula"] + second["curricula"]]
+    assert listed == [f"curr_{n}" for n in range(5, 0, -1)] and second["next_cursor"] is None
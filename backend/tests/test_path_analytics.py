@@ -0,0 +1,94 @@
+import sys
+import types
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, JSON, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from app.services.path_analytics import empty_stats, record_completion, recompute, summarize, backfill
+
+START = datetime(2024, 1, 1)
+
+def milestone(id, score, day, time_spent=30):
+    return {"id": id, "completed": True, "performance_score": score,
+            "completion_time": (START + timedelta(days=day)).isoformat(), "time_spent": time_spent}
+
+def test_incremental_stats_match_recompute():
+    milestones = [milestone(1, 0.9, 0), milestone(2, 0.5, 3), milestone(3, 0.8, 7), milestone(4, 0.95, 14),
+                  {"id": 5, "completed": False}]
+    stats = empty_stats(len(milestones))
+    for m in milestones[:4]:
+        record_completion(stats, m, len(milestones))
+
+    assert stats == recompute(milestones)
+    assert stats["completed"] == 4 and stats["streak"] == 2 and stats["time_spent"] == 120
+
+def test_out_of_order_completion_asks_for_recompute():
+    stats = recompute([milestone(1, 0.9, 5)])
+    assert record_completion(stats, milestone(2, 0.9, 1), 2) is None
+
+def test_recompletion_replaces_the_earlier_score():
+    stats = recompute([milestone(1, 0.4, 0), milestone(2, 0.8, 1)])
+    record_completion(stats, milestone(1, 1.0, 2), 2)
+
+    assert stats["completed"] == 2
+    assert abs(stats["score_sum"] - 1.8) < 1e-9
+    assert stats["time_spent"] == 60
+
+def test_summary_from_stored_stats():
+    stats = recompute([milestone(1, 0.3, 0), milestone(2, 0.6, 7), milestone(3, 0.9, 14), milestone(4, 1.0, 14)])
+    stats["total_milestones"] = 8
+    analytics = summarize(stats, adaptation_count=2)
+
+    assert analytics["completion_rate"] == 50
+    assert analytics["current_streak"] == 2
+    assert analytics["learning_velocity"] == 2.0  # 4 milestones over 2 weeks
+    assert analytics["difficulty_progression"]["trend"] == "improving"
+    assert analytics["adaptation_count"] == 2
+
+def test_empty_path_summary():
+    analytics = summarize(recompute([]))
+    assert analytics["completion_rate"] == 0 and analytics["difficulty_progression"] == {"trend": "no_data"}
+
+def test_naive_and_aware_completion_times_are_compared_as_utc():
+    stats = recompute([
+        milestone(1, 0.8, 0),
+        {"id": 2, "completed": True, "performance_score": 0.9, "completion_time": "2024-01-08T02:00:00+02:00"}
+    ])
+    assert stats["last_completion"] == "2024-01-08T00:00:00+00:00"
+    # 01:00 UTC is after the stored 00:00 UTC, though "2024-01-08T01:00:00" < "...T02:00:00+02:00" as text
+    assert record_completion(stats, {**milestone(3, 0.9, 7), "completion_time": "2024-01-08T01:00:00"}, 3) is stats
+    assert summarize(stats)["learning_velocity"] == 3.0
+
+def test_recompletion_updates_extremes_and_recent_scores():
+    stats = recompute([milestone(1, 0.2, 0), milestone(2, 0.6, 1), milestone(3, 0.7, 2)])
+    record_completion(stats, milestone(1, 0.9, 3), 3)
+
+    assert stats["score_min"] == 0.6 and stats["score_max"] == 0.9
+    assert stats["recent_scores"] == [0.6, 0.7, 0.9]
+
+def test_backfill_fills_only_paths_without_stats(monkeypatch):
+    # The router's app.models.learning_path is not in this tree; stand one in
+    Base = declarative_base()
+
+    class LearningPath(Base):
+        __tablename__ = "learning_paths"
+        id = Column(Integer, primary_key=True)
+        milestones = Column(JSON)
+        ai_data = Column(JSON)
+
+    monkeypatch.setitem(sys.modules, "app.models.learning_path", types.SimpleNamespace(LearningPath=LearningPath))
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    kept = recompute([milestone(1, 0.2, 0)])
+    db.add_all([
+        LearningPath(id=1, milestones=[milestone(1, 0.9, 0), milestone(2, 0.5, 1)], ai_data={"adaptations": []}),
+        LearningPath(id=2, milestones=[milestone(1, 0.9, 0)], ai_data={"analytics": kept}),
+        LearningPath(id=3, milestones=None, ai_data=None)
+    ])
+    db.commit()
+
+    assert backfill(db, batch_size=2) == 2
+    paths = {path.id: path.ai_data for path in db.query(LearningPath)}
+    assert paths[1]["analytics"]["completed"] == 2 and paths[1]["adaptations"] == []
+    assert paths[2]["analytics"] == kept
+    assert paths[3]["analytics"] == empty_stats()
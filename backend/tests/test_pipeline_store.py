@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models.user import User
+from app.models.ai_models import PipelineRun
+from agents.pipeline_store import PipelineStateStore, pipeline_id_for
+
+@pytest.fixture
+def store():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, PipelineRun.__table__])
+    return PipelineStateStore(session_factory=sessionmaker(bind=engine))
+
+def test_start_run_creates_pending_stages(store):
+    run = store.start_run("pipeline_a", "lesson.pdf", 1, {"difficulty": "intermediate"})
+    assert run["status"] == "running"
+    assert run["attempts"] == 1
+    assert all(stage["status"] == "pending" for stage in run["stages"].values())
+
+def test_completed_stage_survives_resume(store):
+    store.start_run("pipeline_a", "lesson.pdf", 1, {})
+    store.complete_stage("pipeline_a", "ingest", {"success": True, "resource_id": "r1"})
+    store.fail_stage("pipeline_a", "curriculum", "Bedrock throttled")
+    store.finish_run("pipeline_a", "failed", errors=["Bedrock throttled"])
+
+    run = store.start_run("pipeline_a", "lesson.pdf", 1, {}, resume=True)
+    assert run["attempts"] == 2
+    assert run["completed_stages"] == ["ingest"]
+    assert store.get_stage_output("pipeline_a", "ingest")["resource_id"] == "r1"
+    assert store.get_stage_output("pipeline_a", "curriculum") is None
+
+def test_restart_without_resume_clears_stages(store):
+    store.start_run("pipeline_a", "lesson.pdf", 1, {})
+    store.complete_stage("pipeline_a", "ingest", {"success": True, "resource_id": "r1"})
+
+    run = store.start_run("pipeline_a", "lesson.pdf", 1, {}, resume=False)
+    assert run["completed_stages"] == []
+
+def test_finish_run_reports_progress(store):
+    store.start_run("pipeline_a", "lesson.pdf", 1, {})
+    for stage in ["ingest", "curriculum", "assessments"]:
+        store.complete_stage("pipeline_a", stage, {"success": True})
+    store.finish_run("pipeline_a", "completed", final_outputs={"curriculum_id": 7})
+
+    run = store.get_run("pipeline_a")
+    assert run["status"] == "completed"
+    assert run["progress"] == 100
+    assert run["current_stage"] is None
+    assert run["final_outputs"] == {"curriculum_id": 7}
+
+def test_unknown_pipeline(store):
+    assert store.get_run("missing") is None
+
+def test_schema_change_discards_completed_stages(store):
+    store.start_run("pipeline_a", "lesson.pdf", 1, {"difficulty": "intermediate"})
+    store.complete_stage("pipeline_a", "ingest", {"success": True, "resource_id": "r1"})
+
+    run = store.start_run("pipeline_a", "lesson.pdf", 1, {"difficulty": "advanced"}, resume=True)
+    assert run["completed_stages"] == []
+    assert run["generation_schema"] == {"difficulty": "advanced"}
+
+def test_pipeline_id_depends_on_schema_not_key_order():
+    a = pipeline_id_for("lesson.pdf", 1, {"difficulty": "intermediate", "duration_weeks": 4})
+    assert a == pipeline_id_for("lesson.pdf", 1, {"duration_weeks": 4, "difficulty": "intermediate"})
+    assert a != pipeline_id_for("lesson.pdf", 1, {"difficulty": "advanced", "duration_weeks": 4})
@@ -0,0 +1,72 @@
+import random
+from agents.plagiarism import PlagiarismEngine, code_tokens
+
+ESSAY = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "Chlorophyll in the chloroplasts absorbs mostly red and blue light, and the "
+    "light reactions split water to release oxygen while producing ATP and NADPH. "
+    "The Calvin cycle then fixes carbon dioxide into sugars using that energy."
+)
+
+def _random_text(seed: int, words: int = 80) -> str:
+    rng = random.Random(seed)
+    vocabulary = ["cell", "energy", "water", "plant", "light", "carbon", "sugar", "leaf",
+                  "root", "oxygen", "growth", "soil", "sun", "green", "seed", "stem"]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+def test_copied_submission_is_flagged_with_matched_section():
+    engine = PlagiarismEngine()
+    submissions = {
+        "alice": ESSAY,
+        "bob": ESSAY.replace("mostly", "primarily"),
+        **{f"student_{i}": _random_text(i) for i in range(20)}
+    }
+
+    pairs = engine.find_similar_pairs(submissions)
+
+    assert [(p["submission_a"], p["submission_b"]) for p in pairs] == [("alice", "bob")]
+    assert pairs[0]["similarity"] >= 0.7
+    assert any("Calvin cycle" in section for section in pairs[0]["matched_sections"])
+
+def test_renamed_identifiers_still_match_code():
+    original = """
+def total(values):
+    result = 0
+    for value in values:
+        if value > 0:
+            result += value  # only positives
+    return result
+"""
+    renamed = """
+def add_up(numbers):
+    acc = 0
+    for n in numbers:
+        if n > 0:
+            acc += n
+    return acc
+"""
+    engine = PlagiarismEngine({"threshold": 0.9})
+    matches = engine.compare_to_references(original, {"ref_1": renamed}, kind="code")
+
+    assert matches and matches[0]["reference_id"] == "ref_1"
+    assert matches[0]["similarity"] == 1.0
+    assert "ID" in code_tokens(original)[0] and "#" not in code_tokens(original)[1]
+
+def test_unrelated_submissions_are_not_flagged():
+    engine = PlagiarismEngine()
+    matches = engine.compare_to_references(ESSAY, {f"ref_{i}": _random_text(i) for i in range(5)})
+    assert matches == []
+
+def test_references_are_only_compared_when_they_share_a_band_with_the_submission(monkeypatch):
+    engine = PlagiarismEngine()
+    compared = []
+    compare = engine.compare
+    monkeypatch.setattr(engine, "compare", lambda left, right: compared.append(right.doc_id) or compare(left, right))
+
+    # Identical references share every band with each other but not with the essay
+    references = {f"dup_{i}": _random_text(99) for i in range(20)}
+    references["copy"] = ESSAY + " It happens in the leaves."
+    matches = engine.compare_to_references(ESSAY, references)
+
+    assert [m["reference_id"] for m in matches] == ["copy"]
+    assert compared == ["copy"]
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.models.student import Student, LearningPath, AssessmentAttempt, ProgressSnapshot
+from app.services.progress_engine import progress_rows, snapshot_all
+
+NOW = datetime(2024, 3, 10, 12, 0)
+
+def attempt(student_id, days_ago, score=None, hour=9):
+    return AssessmentAttempt(
+        student_id=student_id, assessment_id=1, total_score=score, max_score=10 if score is not None else None,
+        submitted_at=NOW - timedelta(days=days_ago) + timedelta(hours=hour - 12)
+    )
+
+@pytest.fixture
+def school(db):
+    db.add_all([Student(id=i, name=f"Student {i}", email=f"s{i}@example.com") for i in (1, 2, 3)])
+    db.add_all([
+        LearningPath(student_id=1, progress_percentage=40.0),
+        LearningPath(student_id=1, progress_percentage=80.0),
+        LearningPath(student_id=2, progress_percentage=10.0),
+        # Student 1: active today (twice), yesterday, two days ago; gap before that
+        attempt(1, 0, 9), attempt(1, 0, 7, hour=11), attempt(1, 1, 8), attempt(1, 2), attempt(1, 5, 10),
+        # Student 2: a single old submission
+        attempt(2, 20, 5),
+        # Not yet submitted
+        AssessmentAttempt(student_id=3, assessment_id=1)
+    ])
+    db.commit()
+    return db
+
+def test_rows_cover_every_student(school):
+    rows = {row["student_id"]: row for row in progress_rows(school, as_of=NOW + timedelta(hours=1))}
+
+    assert rows[1]["overall_progress"] == 60.0
+    assert rows[1]["tasks_completed"] == 5 and rows[1]["quizzes_taken"] == 4
+    assert rows[1]["average_score"] == pytest.approx(85.0)
+    assert rows[1]["study_streak"] == 3  # two submissions today count once
+
+    assert rows[2]["study_streak"] == 0 and rows[2]["average_score"] == pytest.approx(50.0)
+    assert rows[3] == {"student_id": 3, "overall_progress": 0, "tasks_completed": 0,
+                       "quizzes_taken": 0, "average_score": None, "study_streak": 0}
+
+def test_as_of_excludes_later_submissions(school):
+    rows = {row["student_id"]: row for row in progress_rows(school, as_of=NOW - timedelta(days=1))}
+    assert rows[1]["tasks_completed"] == 3 and rows[1]["study_streak"] == 2
+
+def test_snapshots_are_bulk_written_with_few_statements(school):
+    statements = []
+    engine = school.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert snapshot_all(school, as_of=NOW + timedelta(hours=1), batch_size=2) == 3
+    assert len([s for s in statements if s.lstrip().upper().startswith(("WITH", "INSERT"))]) == 3
+
+    snapshots = {s.student_id: s for s in school.query(ProgressSnapshot)}
+    assert snapshots[1].study_streak == 3
+    assert [r["type"] for r in snapshots[3].recommendations] == ["focus", "review"]
+    assert [r["type"] for r in snapshots[1].recommendations] == []
+
+def test_snapshot_for_selected_students(school):
+    assert snapshot_all(school, student_ids=[2], as_of=NOW) == 1
+    assert [s.student_id for s in school.query(ProgressSnapshot)] == [2]
+
+def test_lapsed_run_is_not_a_current_streak(school):
+    # Student 1's latest run ends on NOW's day: still current the day after, over two days later
+    rows = {row["student_id"]: row for row in progress_rows(school, as_of=NOW + timedelta(days=1))}
+    assert rows[1]["study_streak"] == 3
+    rows = {row["student_id"]: row for row in progress_rows(school, as_of=NOW + timedelta(days=2))}
+    assert rows[1]["study_streak"] == 0
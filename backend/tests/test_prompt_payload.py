@@ -0,0 +1,71 @@
+import json
+from agents.prompt_payload import PromptPayload, project, compact_prompt, PROMPT_FIELDS
+
+ASSESSMENT = {
+    "id": 7,
+    "title": "Fractions quiz",
+    "created_at": "2024-01-01T00:00:00",
+    "generation_metadata": {"model": "claude", "trace": ["x"] * 50},
+    "questions": [
+        {
+            "id": i,
+            "question_text": f"What is {i}/2?",
+            "question_type": "mcq",
+            "points": 5,
+            "options": ["a", "b", "c", "d"],
+            "correct_answer": "a",
+            "explanation": "long explanation " * 20,
+            "bloom_level": "Apply"
+        }
+        for i in range(10)
+    ]
+}
+
+def test_project_keeps_only_listed_fields():
+    projected = project(ASSESSMENT, PROMPT_FIELDS["assessment"])
+    assert set(projected) == {"id", "title", "questions"}
+    assert set(projected["questions"][0]) == {"id", "question_text", "question_type", "points", "options", "correct_answer"}
+
+def test_payload_is_compact_and_reports_savings():
+    payload = PromptPayload().add("assessment", ASSESSMENT, kind="assessment")
+    stats = payload.stats()
+
+    assert "\n" not in payload["assessment"]
+    assert ": " not in payload["assessment"]
+    assert json.loads(payload["assessment"])["id"] == 7
+    assert stats["tokens"] < stats["original_tokens"] / 2
+    assert stats["saved_ratio"] > 0.5
+
+def test_compact_prompt_strips_template_indentation():
+    prompt = """
+        Grade this.
+
+            Assessment: {}
+        """
+    assert compact_prompt(prompt) == "Grade this.\nAssessment: {}"
+
+def test_projection_keeps_grading_fields():
+    assessment = {
+        "id": 1,
+        "scoring_rubric": {"grading_scale": {"A": "90-100"}},
+        "questions": [{"question": "Explain osmosis", "type": "short_answer", "sample_answer": "Water moves",
+                       "rubric": {"excellent": "mentions membrane"}}]
+    }
+    projected = project(assessment, PROMPT_FIELDS["assessment"])
+    assert projected["scoring_rubric"] == assessment["scoring_rubric"]
+    assert projected["questions"] == assessment["questions"]
+
+    module = {"title": "Cells", "learning_outcomes": ["describe osmosis"], "content_blocks": ["x"]}
+    assert project(module, PROMPT_FIELDS["module"]) == {"title": "Cells", "learning_outcomes": ["describe osmosis"]}
+
+def test_render_keeps_data_whitespace():
+    code = "def f(x):\n    if x:\n        return 1\n\n    return 0"
+    payload = PromptPayload().add("code", code).add("rubric", {"style": 10})
+    prompt = payload.render("""
+        Review this.
+
+            Code:
+            {code}
+            Rubric: {rubric} for {student}
+        """, student="s1")
+    assert prompt == f'Review this.\nCode:\n{code}\nRubric: {{"style":10}} for s1'
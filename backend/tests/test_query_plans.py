@@ -0,0 +1,84 @@
+"""
+Query-plan regression tests for hot list/report queries
+The SQL that real code paths execute is captured and EXPLAINed; the driving
+table must be searched through a secondary index, without a separate sort. Set TEST_POSTGRES_URL to also check plans on PostgreSQL, with
+sequential scans disabled so only index-servable queries pass.
+"""
+import os
+import re
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.pagination import keyset_page
+from app.models import Base
+from app.models.curriculum import Curriculum, Assessment, Question
+from app.models.files import File, Module
+from app.models.student import Student, LearningPath, AssessmentAttempt
+from app.services.class_report_export import iter_attempt_batches
+
+def hot_queries(db):
+    """Run each hot access path once; yields (name, table that must not be scanned)"""
+    keyset_page(db.query(Curriculum.id, Curriculum.title).filter(Curriculum.created_by == 1), Curriculum.id, limit=20)
+    yield "teacher curricula page", "curricula"
+    keyset_page(db.query(File.id, File.original_filename).filter(File.user_id == 1), File.id, limit=20)
+    yield "user files page", "files"
+    db.query(Assessment.id).filter(Assessment.curriculum_id == 1).all()
+    yield "curriculum assessments", "assessments"
+    db.query(Question.id, Question.points).filter(Question.assessment_id == 1).order_by(Question.id).all()
+    yield "assessment questions", "questions"
+    list(iter_attempt_batches(db, 1, batch_size=50))
+    yield "graded attempts batch", "assessment_attempts"
+    db.query(AssessmentAttempt.id).filter(AssessmentAttempt.student_id == 1).order_by(AssessmentAttempt.submitted_at).all()
+    yield "student attempts", "assessment_attempts"
+    db.query(LearningPath.id).filter(LearningPath.student_id == 1).all()
+    yield "student learning paths", "learning_paths"
+    db.query(LearningPath.id).filter(LearningPath.curriculum_id == 1).all()
+    yield "curriculum learning paths", "learning_paths"
+    db.query(Student.id).filter(Student.created_by == 1).all()
+    yield "teacher students", "students"
+    db.query(Module.id).filter(Module.curriculum_id == 1).order_by(Module.week_number, Module.sequence_order).all()
+    yield "curriculum modules", "modules"
+
+def captured_plans(engine, explain):
+    session = sessionmaker(bind=engine)()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, table in hot_queries(session):
+            statement, parameters = statements[-1]
+            statements.clear()
+            yield name, table, explain(session, statement, parameters)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        session.close()
+
+def sqlite_explain(session, statement, parameters):
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+    return [row[-1] for row in rows]
+
+def test_hot_queries_use_indexes_on_sqlite(db):
+    for name, table, plan in captured_plans(db.get_bind(), sqlite_explain):
+        # A rowid range ("USING INTEGER PRIMARY KEY (rowid>?)") is a scan too
+        assert any(re.match(rf"SEARCH {table} USING (COVERING )?INDEX ix_", step) for step in plan), f"{name}: {plan}"
+        assert not any("USE TEMP B-TREE FOR ORDER BY" in step for step in plan), f"{name}: {plan}"
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+def test_hot_queries_use_indexes_on_postgres():
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    def postgres_explain(session, statement, parameters):
+        connection = session.connection()
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()]
+
+    try:
+        for name, table, plan in captured_plans(engine, postgres_explain):
+            assert not any(f"Seq Scan on {table}" in step for step in plan), f"{name}: {plan}"
+    finally:
+        Base.metadata.drop_all(engine)
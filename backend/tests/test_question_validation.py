@@ -0,0 +1,60 @@
+import asyncio
+import json
+from agents.question_validation import local_validation, batch_prompt, parse_verdicts, validate_questions
+
+def mcq(text, options=("4", "5", "6"), answer="4"):
+    return {"question_text": text, "question_type": "multiple_choice", "options": list(options), "correct_answer": answer}
+
+def test_local_validation_drops_broken_and_duplicate_questions():
+    questions = [
+        mcq("What is two plus two?"),
+        mcq("what is two plus two"),  # duplicate after normalization
+        mcq("Short?"),
+        mcq("Which one is even here?", options=("4",)),
+        mcq("Which numbers repeat here?", options=("4", "4 ")),
+        mcq("Which answer is missing?", answer="7"),
+        mcq("Which index is valid here?", answer=2),
+        {"question_text": "Explain why the sky is blue.", "question_type": "short_answer"}
+    ]
+    kept = [q["question_text"] for q in local_validation(questions)]
+    assert kept == ["What is two plus two?", "Which index is valid here?", "Explain why the sky is blue."]
+
+def test_prompt_carries_answer_keys_for_every_question_type():
+    coding = {
+        "question_text": "Write add(a, b).", "question_type": "coding", "solution": "def add(a, b):\n    return a + b",
+        "test_cases": [{"input": "1, 2", "expected_output": "3"}], "starter_code": "def add(a, b):\n    pass"
+    }
+    short = {"question_text": "Explain osmosis.", "question_type": "short_answer", "sample_answer": "Water moves"}
+    prompt = batch_prompt([coding, short])
+    questions = json.loads(prompt.split("Questions: ", 1)[1].split("\nCheck for:", 1)[0])
+
+    assert questions[0]["solution"] == coding["solution"]
+    assert questions[0]["test_cases"] == coding["test_cases"]
+    assert "starter_code" not in questions[0]
+    assert questions[1] == {"index": 1, "question_text": "Explain osmosis.", "question_type": "short_answer",
+                            "sample_answer": "Water moves"}
+
+def test_unparseable_or_missing_verdicts_pass_by_default():
+    assert [v["is_valid"] for v in parse_verdicts("not json", 2)] == [True, True]
+    verdicts = parse_verdicts(json.dumps([{"index": 1, "is_valid": False}]), 2)
+    assert [v["is_valid"] for v in verdicts] == [True, False]
+
+def test_verdicts_filter_and_correct_each_batch():
+    questions = [mcq(f"Question number {i} about sums?") for i in range(7)]
+    prompts = []
+
+    async def generate(prompt):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return json.dumps([
+                {"index": 0, "is_valid": False},
+                {"index": 2, "is_valid": True, "corrections": {"question_text": "Corrected question?"}}
+            ])
+        raise RuntimeError("model unavailable")
+
+    validated = asyncio.run(validate_questions(generate, questions))
+    assert len(prompts) == 2
+    texts = [q["question_text"] for q in validated]
+    assert len(texts) == 6
+    assert "Question number 0 about sums?" not in texts
+    assert texts[1] == "Corrected question?"
@@ -0,0 +1,40 @@
+from app.services import readability
+from app.services.readability import analyze, analyze_batch, count_syllables, summarize
+
+def test_syllables_match_vowel_groups_and_silent_e():
+    assert count_syllables("cat") == 1
+    assert count_syllables("photosynthesis") == 5
+    assert count_syllables("make") == 1
+    assert count_syllables("rhythm") == 1
+
+def test_simple_text_scores_easier_than_technical_text():
+    simple = analyze("The cat sat on the mat. The dog ran to the cat.")
+    technical = analyze("Photosynthetic organisms metabolize atmospheric carbon dioxide. "
+                        "Mitochondrial respiration regenerates adenosine triphosphate.")
+
+    assert simple["words"] == 12 and simple["sentences"] == 2
+    assert simple["flesch_score"] > technical["flesch_score"]
+    assert simple["grade_level"] < technical["grade_level"]
+    assert technical["complex_words"] > 0 and technical["gunning_fog"] > simple["gunning_fog"]
+
+def test_text_without_punctuation_counts_as_one_sentence():
+    result = analyze("Introduction to cell biology")
+    assert result["sentences"] == 1 and result["words"] == 4
+    assert analyze("  ... 42 ")["words"] == 0
+
+def test_batch_reuses_the_syllable_cache():
+    count_syllables.cache_clear()
+    chunks = ["Cells divide by mitosis. Mitosis has phases."] * 50
+    results = analyze_batch(chunks)
+
+    assert len(results) == 50 and results[0] == results[-1]
+    info = count_syllables.cache_info()
+    assert info.misses == 6 and info.hits == 49 * 6
+
+def test_summary_weights_by_words():
+    results = analyze_batch(["One short line.", "A much longer sentence about the water cycle and evaporation."])
+    summary = summarize(results)
+    assert summary["words"] == results[0]["words"] + results[1]["words"]
+    low, high = sorted(r["flesch_score"] for r in results)
+    assert low <= summary["flesch_score"] <= high
+    assert summarize([]) == readability._empty()
@@ -0,0 +1,99 @@
+import json
+import pytest
+from app.models.user import User
+from app.models.curriculum import Curriculum
+from app.models.files import File, Module
+from app.models.student import LearningPath
+from app.models.search import SearchDocument, flatten_text
+from app.services import search_service
+
+@pytest.fixture
+def db(db):
+    db.add_all([
+        User(id=1, email="a@example.com", name="A", hashed_password="x"),
+        User(id=2, email="b@example.com", name="B", hashed_password="x")
+    ])
+    db.add(Curriculum(
+        id=1, title="Photosynthesis unit", subject="Biology", grade_level="9", created_by=1,
+        content_data={"weekly_modules": [{"title": "Light reactions", "content_blocks": [{"description": "Chlorophyll absorbs light"}]}]}
+    ))
+    db.add(Curriculum(id=2, title="Cell respiration", subject="Biology", grade_level="9", created_by=2,
+                      description="Mitochondria and photosynthesis compared"))
+    db.commit()
+    return db
+
+def ids(result):
+    return [(hit["type"], hit["id"]) for hit in result["results"]]
+
+def test_rows_are_indexed_on_insert_and_scoped_to_the_owner(db):
+    db.add(Module(id=1, title="Calvin cycle", description="Carbon fixation after photosynthesis",
+                  curriculum_id=1, week_number=2, sequence_order=1, bloom_level="understand",
+                  content_data=json.dumps({"notes": ["Rubisco enzyme"]})))
+    db.add(File(id=1, filename="f.pdf", original_filename="leaf-lab.pdf", file_path="s3://x", file_size=1,
+                content_type="application/pdf", extracted_content="Measure chlorophyll in spinach leaves", user_id=1))
+    db.add(LearningPath(id=1, student_id=None, curriculum_id=1, path_data={"title": "Catch-up path", "steps": ["Rubisco review"]}))
+    db.commit()
+
+    assert ids(search_service.search(db, 1, "photosynthesis")) == [("curriculum", 1), ("module", 1)]
+    assert ids(search_service.search(db, 1, "chlorophyll")) in ([("curriculum", 1), ("file", 1)], [("file", 1), ("curriculum", 1)])
+    assert set(ids(search_service.search(db, 1, "rubisco"))) == {("module", 1), ("learning_path", 1)}
+    assert ids(search_service.search(db, 2, "photosynthesis")) == [("curriculum", 2)]
+    assert ids(search_service.search(db, 1, "chlorophyll", entity_types=["file"])) == [("file", 1)]
+
+def test_index_follows_updates_and_deletes(db):
+    curriculum = db.get(Curriculum, 1)
+    curriculum.title = "Plant energy"
+    curriculum.content_data = {"summary": "Stomata and transpiration"}
+    db.commit()
+
+    assert ids(search_service.search(db, 1, "transpiration")) == [("curriculum", 1)]
+    assert search_service.search(db, 1, "chlorophyll")["results"] == []
+
+    db.delete(curriculum)
+    db.commit()
+    assert search_service.search(db, 1, "transpiration")["results"] == []
+    assert db.query(SearchDocument).filter(SearchDocument.entity_id == 1, SearchDocument.entity_type == "curriculum").count() == 0
+
+def test_unrelated_updates_skip_reindexing(db):
+    document = db.query(SearchDocument).filter(SearchDocument.entity_id == 1).one()
+    before = document.body
+    path = LearningPath(id=5, curriculum_id=1, path_data={"title": "Path"})
+    db.add(path)
+    db.commit()
+    path_doc_id = db.query(SearchDocument.id).filter(SearchDocument.entity_type == "learning_path").scalar()
+
+    path.progress_percentage = 40.0
+    db.commit()
+    assert db.query(SearchDocument.id).filter(SearchDocument.entity_type == "learning_path").scalar() == path_doc_id
+    assert db.query(SearchDocument).filter(SearchDocument.entity_id == 1).one().body == before
+
+def test_title_matches_rank_first_and_pages(db):
+    for n in range(3, 28):
+        db.add(Curriculum(id=n, title=f"Unit {n}", subject="Biology", grade_level="9", created_by=1,
+                          description="Includes one lesson on ecosystems"))
+    db.add(Curriculum(id=40, title="Ecosystems", subject="Biology", grade_level="9", created_by=1))
+    db.commit()
+
+    first = search_service.search(db, 1, "ecosystems", page_size=10)
+    assert first["results"][0]["id"] == 40 and first["has_more"]
+    assert "<b>" in first["results"][1]["snippet"]
+    last = search_service.search(db, 1, "ecosystems", page=3, page_size=10)
+    assert len(last["results"]) == 6 and not last["has_more"]
+
+def test_query_syntax_is_escaped(db):
+    assert search_service.fts5_query('photo* OR "light" NEAR(') == '"photo" "OR" "light" "NEAR"'
+    assert search_service.search(db, 1, "  ** ")["results"] == []
+    with pytest.raises(ValueError):
+        search_service.search(db, 1, "light", entity_types=["students"])
+
+def test_reindex_backfills_existing_rows(db):
+    db.query(SearchDocument).delete()
+    db.commit()
+    assert search_service.search(db, 1, "photosynthesis")["results"] == []
+
+    assert search_service.reindex(db, batch_size=1)["curriculum"] == 2
+    assert ids(search_service.search(db, 1, "photosynthesis")) == [("curriculum", 1)]
+
+def test_flatten_text_reads_json_strings():
+    assert list(flatten_text('{"a": ["x", {"b": "y"}], "n": 3}')) == ["x", "y"]
+    assert list(flatten_text("[1] Introduction")) == ["[1] Introduction"]
@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+from sqlalchemy import event
+from app.models.student import Student, AssessmentAttempt
+from app.services import study_streaks
+from app.services.study_streaks import compute, get_streaks, invalidate
+
+TODAY = date(2024, 3, 10)
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    # Commit hooks invalidate through the default client
+    monkeypatch.setattr(study_streaks, "get_sync_redis", lambda: client)
+    return client
+
+def submit(db, student_id, days_ago, hour=10):
+    day = TODAY - timedelta(days=days_ago)
+    db.add(AssessmentAttempt(student_id=student_id, assessment_id=1,
+                             submitted_at=datetime(day.year, day.month, day.day, hour)))
+
+@pytest.fixture
+def cohort(db):
+    db.add_all([Student(id=i, name=f"Student {i}", email=f"s{i}@example.com") for i in (1, 2, 3, 4)])
+    # Student 1: runs of 4 (days 12-9) and 3 (days 2-0), several submissions per day
+    for days_ago in (12, 11, 10, 9, 2, 1, 0):
+        submit(db, 1, days_ago)
+        submit(db, 1, days_ago, hour=20)
+    # Student 2: active until yesterday
+    for days_ago in (3, 2, 1):
+        submit(db, 2, days_ago)
+    # Student 3: lapsed
+    submit(db, 3, 5)
+    # Unsubmitted attempts don't count
+    db.add(AssessmentAttempt(student_id=4, assessment_id=1))
+    db.commit()
+    return db
+
+def test_runs_count_each_day_once(cohort):
+    runs = compute(cohort, [1, 2, 3, 4])
+
+    assert runs[1] == {"latest_run": 3, "last_active": "2024-03-10", "longest": 4}
+    assert runs[2]["latest_run"] == 3 and runs[2]["longest"] == 3
+    assert runs[4] == {"latest_run": 0, "last_active": None, "longest": 0}
+
+def test_current_streak_requires_recent_activity(cohort, redis_client):
+    streaks = get_streaks(cohort, [1, 2, 3, 4], today=TODAY, redis_client=redis_client)
+
+    assert [streaks[i]["current_streak"] for i in (1, 2, 3, 4)] == [3, 3, 0, 0]
+    assert streaks[3]["longest_streak"] == 1 and streaks[3]["last_active"] == "2024-03-05"
+    assert get_streaks(cohort, [2], today=TODAY + timedelta(days=1), redis_client=redis_client)[2]["current_streak"] == 0
+
+def test_cohort_is_one_query_then_cached_until_invalidated(cohort, redis_client):
+    statements = []
+    event.listen(cohort.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    get_streaks(cohort, [1, 2, 3, 4], today=TODAY, redis_client=redis_client)
+    assert len(statements) == 1
+    get_streaks(cohort, [1, 2, 3, 4], today=TODAY, redis_client=redis_client)
+    assert len(statements) == 1
+
+    # Committing the submission invalidates the student's entry
+    submit(cohort, 3, 0)
+    cohort.commit()
+    statements.clear()
+    streaks = get_streaks(cohort, [1, 2, 3, 4], today=TODAY, redis_client=redis_client)
+
+    assert streaks[3]["current_streak"] == 1
+    assert len(statements) == 1 and "IN (?)" in statements[0]  # only the invalidated student
+
+def test_works_without_redis(cohort):
+    class DownRedis:
+        def mget(self, keys):
+            raise ConnectionError("down")
+
+        def pipeline(self, transaction=True):
+            raise ConnectionError("down")
+
+    assert study_streaks.current_streak(cohort, 1, today=TODAY, redis_client=DownRedis()) == 3
+
+def test_result_computed_before_a_submission_is_never_served(cohort, redis_client, monkeypatch):
+    compute_runs = study_streaks.compute
+
+    def racing_compute(db, student_ids):
+        runs = compute_runs(db, student_ids)
+        # A submission commits after this read, before the result is cached
+        submit(db, 3, 0)
+        db.commit()
+        return runs
+
+    monkeypatch.setattr(study_streaks, "compute", racing_compute)
+    assert get_streaks(cohort, [3], today=TODAY, redis_client=redis_client)[3]["current_streak"] == 0
+    monkeypatch.setattr(study_streaks, "compute", compute_runs)
+
+    assert get_streaks(cohort, [3], today=TODAY, redis_client=redis_client)[3]["current_streak"] == 1
+
+def test_any_committed_change_to_submissions_invalidates(cohort, redis_client):
+    get_streaks(cohort, [1, 2], today=TODAY, redis_client=redis_client)
+
+    # Moving today's attempts from student 1 to student 2 changes both
+    for attempt in cohort.query(AssessmentAttempt).filter_by(student_id=1).all():
+        if attempt.submitted_at.date() == TODAY:
+            attempt.student_id = 2
+    cohort.commit()
+    streaks = get_streaks(cohort, [1, 2], today=TODAY, redis_client=redis_client)
+    assert streaks[1]["current_streak"] == 2 and streaks[2]["current_streak"] == 4
+
+    # Rolled-back changes leave the cache alone
+    cohort.delete(cohort.query(AssessmentAttempt).filter_by(student_id=2).first())
+    cohort.flush()
+    cohort.rollback()
+    assert redis_client.get("streaks:version:2") == "1"
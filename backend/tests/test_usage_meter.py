@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models.user import User
+from app.models.ai_models import AIInteraction
+from agents.usage_meter import MeteredAIService, BudgetExceededError, UsageBuffer, metered_run, estimate_tokens
+
+class FakeEnhancedAI:
+    async def generate_enhanced_curriculum(self, content, subject, grade_level):
+        return {"source": "enhanced"}
+
+class FakeAIService:
+    def __init__(self, completion="x" * 400):
+        self.completion = completion
+        self.enhanced_ai = FakeEnhancedAI()
+        self.max_tokens_seen = []
+
+    text_model_id = "anthropic.claude-v2"
+
+    async def generate_content_with_model(self, prompt, max_tokens=4000):
+        self.max_tokens_seen.append(max_tokens)
+        return self.completion, "anthropic.claude-3-haiku"
+
+    async def generate_curriculum(self, content, subject, grade_level, learning_objectives=None):
+        return {"source": "bedrock"}
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, AIInteraction.__table__])
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def buffer(session_factory):
+    return UsageBuffer(session_factory)
+
+def test_run_totals_are_recorded(session_factory, buffer):
+    service = MeteredAIService(FakeAIService(), "curriculum_architect")
+
+    async def run():
+        with metered_run("curriculum_architect", interaction_type="curriculum_gen", buffer=buffer) as meter:
+            await service.generate_content("p" * 800)
+            await service.generate_content("p" * 800)
+        # Nothing is written until the buffer is flushed off the loop
+        assert session_factory().query(AIInteraction).count() == 0
+        assert await buffer.aflush() == 1
+        return meter
+
+    meter = asyncio.run(run())
+    assert meter.ai_calls == 2
+    assert meter.total_tokens == 2 * (estimate_tokens("p" * 800) + estimate_tokens("x" * 400))
+
+    db = session_factory()
+    interaction = db.query(AIInteraction).one()
+    assert interaction.interaction_type == "curriculum_gen"
+    assert interaction.tokens_used == meter.total_tokens
+    assert interaction.processing_time is not None
+    assert interaction.model_used == "anthropic.claude-3-haiku"
+    assert interaction.success
+    db.close()
+
+def test_calls_outside_a_run_are_buffered(session_factory, buffer):
+    service = MeteredAIService(FakeAIService(), "curriculum_architect", buffer=buffer)
+
+    async def run():
+        await service.generate_content("prompt")
+        await service.generate_content("prompt")
+
+    asyncio.run(run())
+    assert buffer.pending == 2
+    assert buffer.flush() == 2
+    assert session_factory().query(AIInteraction).count() == 2
+
+def test_token_budget_caps_output_and_then_aborts(session_factory, buffer):
+    fake = FakeAIService(completion="x" * 16000)
+    service = MeteredAIService(fake, "assessment_generator")
+
+    async def run():
+        with metered_run("assessment_generator", buffer=buffer):
+            await service.generate_content("p" * 4000)
+            await service.generate_content("p" * 4000)
+            with pytest.raises(BudgetExceededError):
+                await service.generate_content("p" * 4000)
+
+    asyncio.run(run())
+    buffer.flush()
+    # Second call is limited to what remains of the 8000-token budget
+    assert fake.max_tokens_seen[0] == 4000
+    assert fake.max_tokens_seen[1] == 8000 - 5000 - 1000
+
+    db = session_factory()
+    interaction = db.query(AIInteraction).one()
+    assert not interaction.success
+    assert "ai_tokens" in interaction.error_message
+    db.close()
+
+def test_structured_generation_degrades_to_enhanced_fallback(buffer):
+    service = MeteredAIService(FakeAIService(completion="x" * 40000), "curriculum_architect")
+
+    async def run():
+        with metered_run("curriculum_architect", buffer=buffer) as meter:
+            await service.generate_content("prompt")
+            result = await service.generate_curriculum("content", "Math", "grade 7")
+            return meter, result
+
+    meter, result = asyncio.run(run())
+    assert result == {"source": "enhanced"}
+    assert meter.degraded_calls == 1
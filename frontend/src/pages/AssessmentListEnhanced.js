@@ -25,7 +25,7 @@ const AssessmentListEnhanced = () => {
       setLoading(true);
       const [assessmentsRes, curriculaRes] = await Promise.all([
         assessmentAPI.getAll(),
-        curriculumAPI.getCurricula()
+        curriculumAPI.getAll()
       ]);
       
       setAssessments(assessmentsRes.data.assessments || []);
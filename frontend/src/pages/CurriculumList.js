@@ -18,7 +18,7 @@ const CurriculumList = () => {
   const fetchCurricula = async () => {
     try {
       setLoading(true);
-      const response = await curriculumAPI.getCurricula();
+      const response = await curriculumAPI.getAll();
       setCurricula(response.data.curricula || []);
       toast.success('AI-enhanced curricula loaded successfully');
     } catch (error) {
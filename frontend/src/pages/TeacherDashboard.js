@@ -17,7 +17,7 @@ export const TeacherDashboard = () => {
     try {
       const [analyticsRes, curriculaRes, studentsRes] = await Promise.all([
         analyticsAPI.getDashboard(),
-        curriculumAPI.getCurricula(),
+        curriculumAPI.getAll(),
         studentsAPI.getStudents()
       ]);
       
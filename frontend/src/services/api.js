@@ -233,6 +233,9 @@ export const tasksAPI = {
   cancel: (taskId) => api.post(`/api/tasks/cancel/${taskId}`),
 };
 
+// Largest page the curriculum listing serves
+const CURRICULUM_PAGE_SIZE = 100;
+
 // Enhanced Curriculum API with AI features
 export const curriculumAPI = {
   create: (data) => {
@@ -245,8 +248,21 @@ export const curriculumAPI = {
     };
     return api.post('/api/curriculum/', enhancedData);
   },
-  getCurricula: () => api.get('/api/curriculum/'),
-  getAll: () => api.get('/api/curriculum/'),
+  // One page of the newest-first listing; pass the previous page's next_cursor for the next one
+  getCurricula: (cursor, limit = CURRICULUM_PAGE_SIZE) =>
+    api.get('/api/curriculum/', { params: cursor ? { cursor, limit } : { limit } }),
+  // Every curriculum, following next_cursor across pages
+  getAll: async () => {
+    const curricula = [];
+    let cursor = null;
+    let response;
+    do {
+      response = await curriculumAPI.getCurricula(cursor);
+      curricula.push(...(response.data?.curricula || []));
+      cursor = response.data?.next_cursor;
+    } while (cursor);
+    return { ...response, data: { ...response.data, curricula, next_cursor: null } };
+  },
   getById: (id) => api.get(`/api/curriculum/${id}`),
   getTest: (id) => api.get(`/api/curriculum/test/${id}`),
   getLearningPaths: (id) => api.get(`/api/curriculum/${id}/learning-paths`),
@@ -88,7 +88,25 @@ describe('API Services', () => {
 
       await curriculumAPI.getAll();
       
-      expect(mockedAxios.create().get).toHaveBeenCalledWith('/api/curriculum/');
+      expect(mockedAxios.create().get).toHaveBeenCalledWith('/api/curriculum/', { params: { limit: 100 } });
+    });
+
+    test('getAll follows next_cursor until the last page', async () => {
+      const get = jest.fn()
+        .mockResolvedValueOnce({ data: { curricula: [{ id: 'curr_2' }], next_cursor: 'abc' } })
+        .mockResolvedValueOnce({ data: { curricula: [{ id: 'curr_1' }], next_cursor: null } });
+      mockedAxios.create.mockReturnValue({
+        get,
+        interceptors: {
+          request: { use: jest.fn() },
+          response: { use: jest.fn() }
+        }
+      });
+
+      const response = await curriculumAPI.getAll();
+
+      expect(mockedAxios.create().get).toHaveBeenLastCalledWith('/api/curriculum/', { params: { cursor: 'abc', limit: 100 } });
+      expect(response.data.curricula.map(c => c.id)).toEqual(['curr_2', 'curr_1']);
     });
   });
 